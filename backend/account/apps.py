@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AccountConfig(AppConfig):
@@ -6,4 +7,12 @@ class AccountConfig(AppConfig):
     name = 'account'
 
     def ready(self):
-        from . import signals  # ← Importa tus señales aquí
\ No newline at end of file
+        from . import signals  # ← Importa tus señales aquí
+        # Crear estructuras de búsqueda de usuarios (trigramas / FTS5) después de migrar
+        post_migrate.connect(install_search_structures, sender=self)
+
+
+# Instalar la búsqueda de usuarios en la base de datos migrada
+def install_search_structures(sender, using='default', **kwargs):
+    from .search import install_user_search
+    install_user_search(using=using)
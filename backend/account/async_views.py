@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from backend.asyncapi import async_api_view, json_response
+from .serializers import UserProfileDetailSerializer
+
+
+"""
+Usuario por token, versión asíncrona (ASGI).
+
+- Misma respuesta que CurrentUserViewToken.
+- Perfil en JOIN y tareas en un prefetch, leídos con el ORM async: el
+  serializador no consulta la base de datos.
+"""
+@async_api_view(['GET'])
+async def current_user(request):
+    user = await (
+        User.objects
+        .select_related('profile')
+        .prefetch_related('tasks')
+        .aget(pk=request.user.pk)
+    )
+    return json_response(UserProfileDetailSerializer(user).data)
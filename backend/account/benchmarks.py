@@ -0,0 +1,265 @@
+import json
+import platform
+import statistics
+import time
+import django
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from account.models import Profile
+from account.seeders import BULK_PASSWORD, bulk_seed_users, bulk_seed_tasks
+from tasks.models import Task
+from tasks.serializers import TaskViewSerializer
+
+# Filas por página de los escenarios de serialización
+SERIALIZATION_ROWS = (10, 100, 1000)
+# Todos los campos de la tarea (el listado es compacto por defecto)
+TASK_FULL_FIELDS = 'id,title,description,completed'
+
+# Usuario del benchmark (dueño de las tareas medidas)
+BENCH_USERNAME = 'bench_user'
+BENCH_ADMIN = 'bench_admin'
+
+
+# Percentil (interpolación lineal) de una lista ordenada
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+"""
+Crea el conjunto de datos de un tamaño.
+
+- size tareas para el usuario del benchmark, más usuarios y tareas de fondo
+  (size tareas repartidas entre background_users usuarios).
+- Determinista según la semilla.
+"""
+def seed_dataset(size, seed=0, background_users=50):
+    # Base de datos vacía (TRUNCATE / DELETE sin señales por fila)
+    call_command('flush', interactive=False, verbosity=0)
+
+    bench_user = User.objects.create_user(BENCH_USERNAME, 'bench@example.com', BULK_PASSWORD)
+    Profile.objects.create(user=bench_user, nombre='Bench', apellido='User')
+    User.objects.create_user(BENCH_ADMIN, 'admin@example.com', BULK_PASSWORD, is_staff=True)
+
+    user_ids = bulk_seed_users(background_users, seed=seed, avatars=False)
+    bulk_seed_tasks(size, [bench_user.pk], seed=seed)
+    bulk_seed_tasks(size, user_ids, seed=seed + 1)
+    return bench_user
+
+
+# Métricas de una lista de duraciones (ms)
+def summarize(durations, queries, total, ok=True):
+    durations = sorted(durations)
+    return {
+        'iterations': len(durations),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p95_ms': round(percentile(durations, 95), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'throughput_rps': round(len(durations) / total, 1) if total else 0.0,
+        'queries': round(statistics.fmean(queries), 2),
+        'ok': ok,
+    }
+
+
+"""
+Ejecuta una petición varias veces y devuelve sus métricas.
+
+- request(i) hace la petición i y devuelve la respuesta.
+- Las primeras `warmup` ejecuciones no se miden.
+"""
+def measure(request, iterations, warmup=2, expected=(200,)):
+    for i in range(warmup):
+        request(i)
+
+    durations, queries, statuses = [], [], set()
+    started = time.perf_counter()
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            begin = time.perf_counter()
+            response = request(warmup + i)
+            durations.append((time.perf_counter() - begin) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses.add(response.status_code)
+    total = time.perf_counter() - started
+    return summarize(durations, queries, total, statuses <= set(expected))
+
+
+# Duraciones (ms) de una función sin argumentos
+def time_calls(func, iterations, warmup=2):
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - begin) * 1000)
+    return durations
+
+
+"""
+Serialización de una página de `rows` tareas: lectura rápida frente a DRF.
+
+- Las filas se leen antes de medir (solo CPU de serialización): instancias
+  para DRF y tuplas de values_list para la lectura rápida.
+- Métricas de la lectura rápida, más drf_p50_ms, speedup (p50 DRF / p50
+  rápida) e identical (mismo JSON byte a byte).
+"""
+def measure_serialization(bench_user, rows, iterations):
+    queryset = Task.objects.filter(user=bench_user).order_by('-created_at', '-id')[:rows]
+    instances = list(queryset)
+    fast = TaskViewSerializer(many=True)
+    plan = fast.get_fast_plan()
+    tuples = list(plan.values(queryset))
+    drf = serializers.ListSerializer(child=TaskViewSerializer())
+
+    renderer = JSONRenderer()
+    identical = renderer.render(fast.to_representation(tuples)) == renderer.render(drf.to_representation(instances))
+
+    started = time.perf_counter()
+    fast_durations = time_calls(lambda: fast.to_representation(tuples), iterations)
+    total = time.perf_counter() - started
+    drf_durations = sorted(time_calls(lambda: drf.to_representation(instances), iterations))
+
+    metrics = summarize(fast_durations, [0], total, identical)
+    metrics['drf_p50_ms'] = round(percentile(drf_durations, 50), 3)
+    metrics['speedup'] = round(metrics['drf_p50_ms'] / metrics['p50_ms'], 2) if metrics['p50_ms'] else 0.0
+    metrics['identical'] = identical
+    return metrics
+
+
+# Cliente autenticado con un token real
+def authenticated_client(username):
+    client = APIClient()
+    response = client.post('/api/token/', {'username': username, 'password': BULK_PASSWORD})
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    return client
+
+
+"""
+Escenarios del benchmark: nombre -> (función(i), iteraciones, códigos esperados).
+"""
+def build_scenarios(bench_user, iterations, token_iterations):
+    client = authenticated_client(BENCH_USERNAME)
+    admin = authenticated_client(BENCH_ADMIN)
+    anonymous = APIClient()
+
+    # Palabra existente para la búsqueda
+    word = (Task.objects.filter(user=bench_user).values_list('title', flat=True).first() or 'bench').split()[0]
+    task_ids = list(Task.objects.filter(user=bench_user).order_by('-created_at').values_list('id', flat=True)[:iterations + 10])
+
+    return {
+        'token': (
+            lambda i: anonymous.post('/api/token/', {'username': BENCH_USERNAME, 'password': BULK_PASSWORD}),
+            token_iterations, (200,),
+        ),
+        'me': (lambda i: client.get('/api/account/me/'), iterations, (200,)),
+        'users': (lambda i: admin.get('/api/account/users/'), iterations, (200,)),
+        'task_list': (lambda i: client.get('/api/task/tasks/'), iterations, (200,)),
+        'task_list_cursor': (lambda i: client.get('/api/task/tasks/', {'pagination': 'cursor'}), iterations, (200,)),
+        'task_page_10': (
+            lambda i: client.get('/api/task/tasks/', {'page_size': 10, 'fields': TASK_FULL_FIELDS}), iterations, (200,),
+        ),
+        'task_page_100': (
+            lambda i: client.get('/api/task/tasks/', {'page_size': 100, 'fields': TASK_FULL_FIELDS}), iterations, (200,),
+        ),
+        'task_search': (lambda i: client.get('/api/task/tasks/', {'search': word}), iterations, (200,)),
+        'task_create': (
+            lambda i: client.post('/api/task/tasks/', {'title': f'Bench {i}', 'description': 'benchmark'}),
+            iterations, (201,),
+        ),
+        'task_update': (
+            lambda i: client.put(
+                f'/api/task/tasks/{task_ids[i % len(task_ids)]}/',
+                {'title': f'Bench update {i}', 'description': 'benchmark', 'completed': bool(i % 2)},
+            ),
+            iterations, (200,),
+        ),
+    }
+
+
+"""
+Ejecuta el benchmark completo para cada tamaño.
+
+- Devuelve un diccionario serializable a JSON: {meta, results: {size: {escenario: métricas}}}.
+"""
+def run_benchmark(sizes, iterations=50, token_iterations=10, seed=0, scenarios=None, log=print):
+    results = {}
+    for size in sizes:
+        log(f'Preparando datos: {size} tareas...')
+        bench_user = seed_dataset(size, seed=seed)
+        available = build_scenarios(bench_user, iterations, token_iterations)
+        results[str(size)] = {}
+        for name, (request, count, expected) in available.items():
+            # ? Escenario no seleccionado
+            if scenarios and name not in scenarios:
+                continue
+            metrics = measure(request, count, expected=expected)
+            results[str(size)][name] = metrics
+            log(f"  {name:<18} p50={metrics['p50_ms']:>9.2f}ms p95={metrics['p95_ms']:>9.2f}ms "
+                f"p99={metrics['p99_ms']:>9.2f}ms {metrics['throughput_rps']:>8.1f} req/s q={metrics['queries']}")
+
+        # Serialización de páginas de 10 / 100 / 1000 filas (max_page_size limita la API a 100)
+        for rows in SERIALIZATION_ROWS:
+            name = f'serialize_{rows}'
+            # ? Escenario no seleccionado
+            if scenarios and name not in scenarios:
+                continue
+            metrics = measure_serialization(bench_user, rows, iterations)
+            results[str(size)][name] = metrics
+            log(f"  {name:<18} p50={metrics['p50_ms']:>9.3f}ms drf={metrics['drf_p50_ms']:>9.3f}ms "
+                f"x{metrics['speedup']:<6} idéntico={metrics['identical']}")
+    return {
+        'meta': {
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'sizes': list(sizes),
+            'iterations': iterations,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+"""
+Compara un resultado con una línea base.
+
+- Regresión: p95 mayor que base * (1 + tolerancia) o más consultas por petición.
+- Devuelve la lista de regresiones (textos).
+"""
+def compare_with_baseline(current, baseline, tolerance=0.2):
+    regressions = []
+    for size, scenarios in baseline.get('results', {}).items():
+        for name, base in scenarios.items():
+            metrics = current.get('results', {}).get(size, {}).get(name)
+            # ? No se midió en esta ejecución
+            if metrics is None:
+                continue
+            if metrics['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{size}/{name}: p95 {base['p95_ms']}ms -> {metrics['p95_ms']}ms")
+            if metrics['queries'] > base['queries']:
+                regressions.append(f"{size}/{name}: consultas {base['queries']} -> {metrics['queries']}")
+            if not metrics['ok']:
+                regressions.append(f"{size}/{name}: respuestas con estado inesperado")
+    return regressions
+
+
+# Guardar / leer resultados en JSON
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from backend.authentication import invalidate_cached_user
+from backend.workers import submit, submit_on_commit
+from tasks.cache import task_response_cache
+from tasks.bulk import delete_task_rows
+from tasks.models import Task
+from .models import UserDeletion
+
+logger = logging.getLogger(__name__)
+
+# Tareas eliminadas por lote (una transacción corta por lote)
+DELETION_BATCH_SIZE = getattr(settings, 'USER_DELETION_BATCH_SIZE', 5000)
+# Segundos sin progreso (updated_at, se actualiza en cada lote) tras los que una
+# eliminación pendiente o en curso se da por interrumpida
+DELETION_STALE_SECONDS = getattr(settings, 'USER_DELETION_STALE_SECONDS', 300)
+
+
+"""
+Pide la eliminación de un usuario.
+
+- Lo desactiva en el momento (no puede iniciar sesión ni usar sus tokens) y
+  crea el registro de progreso; el trabajo empieza al confirmar.
+- Si ya hay una eliminación pendiente o en curso, la devuelve.
+"""
+def request_user_deletion(user, requested_by=None):
+    with transaction.atomic():
+        active = UserDeletion.objects.filter(
+            user_id=user.pk, status__in=[UserDeletion.PENDING, UserDeletion.RUNNING],
+        ).first()
+        # ? Eliminación ya en marcha
+        if active is not None:
+            return active
+
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        # Conteo directo (no TaskStats: el progreso no debe depender de unos contadores desviados)
+        total_tasks = Task.objects.using(router.db_for_write(Task)).filter(user_id=user.pk).count()
+        deletion = UserDeletion.objects.create(
+            user_id=user.pk,
+            username=user.username,
+            requested_by_id=getattr(requested_by, 'pk', None),
+            total_tasks=total_tasks,
+        )
+        submit_on_commit(run_user_deletion, deletion.pk)
+
+    # update() no envía señales: usuario en caché todavía activo
+    invalidate_cached_user(user.pk)
+    return deletion
+
+
+# Eliminar un lote de tareas del usuario, devuelve el número de tareas eliminadas
+def delete_task_batch(deletion):
+    using = router.db_for_write(Task)
+    with transaction.atomic(using=using):
+        rows = list(
+            Task.objects.using(using).filter(user_id=deletion.user_id).select_for_update()
+            .order_by().values_list('pk', 'user_id', 'completed')[:DELETION_BATCH_SIZE]
+        )
+        # ? Sin tareas
+        if not rows:
+            return 0
+
+        # DELETE directo, sin cargar las tareas ni enviar señales por fila (sin marcas de
+        # sincronización, se eliminan con el usuario)
+        deleted = delete_task_rows(rows, tombstones=False)
+        UserDeletion.objects.using(using).filter(pk=deletion.pk).update(
+            deleted_tasks=F('deleted_tasks') + deleted, updated_at=timezone.now(),
+        )
+    return deleted
+
+
+"""
+Trabajo en segundo plano: elimina un usuario y todos sus datos.
+
+- Tareas en lotes de DELETION_BATCH_SIZE, cada uno en su transacción (sin
+  bloqueos largos); el progreso se guarda tras cada lote.
+- Al final elimina al usuario: el CASCADE ya solo recorre perfil, contadores,
+  marcas de sincronización y tokens. La imagen de perfil se elimina al
+  confirmar (señal pre_delete de Profile).
+- Se puede reanudar (comando resume_user_deletions, o solo al quedarse sin
+  progreso: resume_stale_deletions): continúa por las tareas que queden.
+"""
+def run_user_deletion(deletion_id):
+    deletion = UserDeletion.objects.filter(pk=deletion_id).exclude(status=UserDeletion.DONE).first()
+    # ? No existe o ya terminó
+    if deletion is None:
+        return
+
+    UserDeletion.objects.filter(pk=deletion.pk).update(status=UserDeletion.RUNNING, updated_at=timezone.now())
+    try:
+        # Respuestas de tareas en caché
+        task_response_cache.bump_version(deletion.user_id)
+        while delete_task_batch(deletion):
+            pass
+
+        with transaction.atomic():
+            user = User.objects.filter(pk=deletion.user_id).first()
+            # ? El usuario todavía existe
+            if user is not None:
+                user.delete()
+            UserDeletion.objects.filter(pk=deletion.pk).update(
+                status=UserDeletion.DONE, finished_at=timezone.now(), updated_at=timezone.now(),
+            )
+    except Exception as e:
+        logger.exception('Error al eliminar el usuario %s', deletion.user_id)
+        UserDeletion.objects.filter(pk=deletion.pk).update(
+            status=UserDeletion.FAILED, error=str(e), updated_at=timezone.now(),
+        )
+
+
+"""
+Reanuda las eliminaciones interrumpidas (reinicio de un proceso por max_requests,
+despliegue): pendientes o en curso sin progreso en DELETION_STALE_SECONDS.
+
+- Cada una se reclama con un UPDATE condicional de updated_at: con varios
+  procesos comprobando a la vez, solo uno la reanuda.
+- Reanudar es seguro aunque el trabajo original siguiera vivo: los lotes
+  bloquean sus filas (select_for_update) y solo cuentan lo que eliminan.
+- Devuelve los ids reanudados.
+"""
+def resume_stale_deletions():
+    using = router.db_for_write(UserDeletion)
+    active = [UserDeletion.PENDING, UserDeletion.RUNNING]
+    cutoff = timezone.now() - timedelta(seconds=DELETION_STALE_SECONDS)
+    stale = list(
+        UserDeletion.objects.using(using).filter(status__in=active, updated_at__lt=cutoff)
+        .order_by('created_at').values_list('pk', flat=True)
+    )
+    resumed = []
+    for pk in stale:
+        claimed = UserDeletion.objects.using(using).filter(
+            pk=pk, status__in=active, updated_at__lt=cutoff,
+        ).update(updated_at=timezone.now())
+        # ? Otro proceso la reclamó antes
+        if not claimed:
+            continue
+        logger.warning('Reanudando la eliminación interrumpida del usuario (registro %s)', pk)
+        submit(run_user_deletion, pk)
+        resumed.append(pk)
+    return resumed
+
+
+# Comprobar las eliminaciones interrumpidas al arrancar y cada interval segundos
+def _watch_stale_deletions(interval):
+    while True:
+        try:
+            resume_stale_deletions()
+        except Exception:
+            logger.exception('Error al reanudar las eliminaciones interrumpidas')
+        finally:
+            close_old_connections()
+        time.sleep(interval)
+
+
+"""
+Vigila las eliminaciones interrumpidas desde un proceso web (gunicorn
+post_worker_init).
+
+- Hilo daemon que comprueba al arrancar y después periódicamente: una
+  eliminación cortada por el reinicio de otro proceso se reanuda en cuanto
+  pasa DELETION_STALE_SECONDS sin progreso, sin esperar al siguiente despliegue.
+"""
+def start_stale_deletion_watcher(interval=None):
+    thread = threading.Thread(
+        target=_watch_stale_deletions, args=(interval or DELETION_STALE_SECONDS,),
+        name='stale-deletions', daemon=True,
+    )
+    thread.start()
+    return thread
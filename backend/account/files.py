@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from backend.storage import ContentAddressedStorage
+
+
+# Suma una referencia al archivo (la fila queda bloqueada hasta el final de la transacción)
+def _add_reference(name, using):
+    from .models import StoredFile
+    files = StoredFile.objects.using(using)
+    # ? Primera referencia
+    if not files.filter(name=name).update(references=F('references') + 1):
+        try:
+            with transaction.atomic(using=using):
+                files.create(name=name, references=1)
+        except IntegrityError:
+            # Creada por otra transacción concurrente
+            files.filter(name=name).update(references=F('references') + 1)
+
+
+"""
+Storage de las fotos de perfil: direccionado por contenido y con referencias.
+
+- Cada guardado suma una referencia al nombre (StoredFile), aunque el
+  contenido ya existiera; release_files la resta y elimina el archivo que se
+  queda sin referencias.
+- La comprobación de si el archivo existe y su escritura ocurren con la fila
+  del nombre bloqueada, igual que la eliminación: una subida del mismo
+  contenido que llega mientras se elimina espera y lo vuelve a escribir.
+- Se ejecuta en la transacción en curso (Profile.save): si se revierte, la
+  referencia también.
+"""
+class ProfilePhotoStorage(ContentAddressedStorage):
+
+    @contextmanager
+    def reference(self, name):
+        from .models import StoredFile
+        using = router.db_for_write(StoredFile)
+        with transaction.atomic(using=using):
+            _add_reference(name, using)
+            yield
+
+
+"""
+Resta una referencia a cada archivo y elimina los que se quedan sin ninguna.
+
+- Un nombre repetido resta una referencia por aparición (cada guardado sumó una).
+- La eliminación ocurre con la fila bloqueada (ver ProfilePhotoStorage).
+- Archivos sin registro (guardados antes de contar referencias) no se
+  eliminan; el comando rebuild_file_references los registra.
+"""
+def release_files(names, storage):
+    from .models import StoredFile
+    using = router.db_for_write(StoredFile)
+    for name in filter(None, names):
+        with transaction.atomic(using=using):
+            stored = StoredFile.objects.using(using).select_for_update().filter(name=name).first()
+            # ? Sin registro
+            if stored is None:
+                continue
+            # ? Otras filas lo usan
+            if stored.references > 1:
+                StoredFile.objects.using(using).filter(name=name).update(references=F('references') - 1)
+                continue
+            stored.delete()
+            if storage.exists(name):
+                storage.delete(name)
+
+
+# Nombres de archivo de un perfil (foto y variantes, con repeticiones)
+def profile_file_names(name, variants):
+    return [name, *(variants or {}).values()]
+
+
+"""
+Recalcula las referencias de todos los archivos desde los perfiles (archivos
+guardados antes de contar referencias, o tras restaurar una copia).
+"""
+def rebuild_file_references():
+    from .models import Profile, StoredFile
+    counts = {}
+    for name, variants in Profile.objects.values_list('foto', 'foto_variants').iterator(chunk_size=2000):
+        for file_name in filter(None, profile_file_names(name, variants)):
+            counts[file_name] = counts.get(file_name, 0) + 1
+    with transaction.atomic(using=router.db_for_write(StoredFile)):
+        StoredFile.objects.all().delete()
+        StoredFile.objects.bulk_create(
+            [StoredFile(name=name, references=references) for name, references in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+_profile_photo_storage = None
+
+
+# Storage de las fotos de perfil (callable de ImageField, se crea al primer uso)
+def profile_photo_storage():
+    global _profile_photo_storage
+    if _profile_photo_storage is None:
+        _profile_photo_storage = ProfilePhotoStorage()
+    return _profile_photo_storage
@@ -0,0 +1,82 @@
+import io
+import os
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Tamaños de las miniaturas (px, cuadradas)
+THUMBNAIL_SIZES = getattr(settings, 'PROFILE_THUMBNAIL_SIZES', (64, 128, 256))
+# Calidad de codificación
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+# Formatos que se recodifican en su mismo formato (el resto pasa a JPEG)
+REENCODE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+# Codificar una imagen sin metadatos
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    # ? JPEG no admite transparencia
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+# Opciones de cada formato
+def _options(image_format):
+    if image_format == 'JPEG':
+        return {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+    if image_format == 'WEBP':
+        return {'quality': WEBP_QUALITY, 'method': 4}
+    return {'optimize': True}
+
+
+"""
+Procesa una foto de perfil.
+
+- Aplica la orientación EXIF y descarta todos los metadatos (EXIF, GPS, ICC).
+- Recodifica la original (JPEG/PNG/WebP se mantienen, el resto pasa a JPEG).
+  La subida no se elimina aquí, puede compartirla otro perfil.
+- Genera una variante WebP del tamaño original y miniaturas WebP cuadradas.
+- Devuelve (nombre_original, {variante: nombre}) con los nombres en el storage.
+"""
+def process_photo(storage, name):
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        source_format = image.format
+        image.seek(0)  # Primer cuadro (GIF animados)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    # Modo de color compatible (sin paletas ni CMYK)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    base, _ = os.path.splitext(name)
+    directory, stem = os.path.split(base)
+    variants_dir = os.path.join(directory, 'variants')
+
+    # Original recodificada (mismo nombre si conserva el formato)
+    image_format = source_format if source_format in REENCODE_FORMATS else 'JPEG'
+    original_name = f'{base}.{REENCODE_FORMATS[image_format]}'
+    content = _encode(image, image_format, **_options(image_format))
+    original_name = storage.save(original_name, ContentFile(content))
+
+    # Variante WebP a tamaño completo
+    variants = {
+        'webp': storage.save(
+            os.path.join(variants_dir, f'{stem}.webp'),
+            ContentFile(_encode(image, 'WEBP', **_options('WEBP'))),
+        )
+    }
+
+    # Miniaturas cuadradas
+    for size in THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+        variants[str(size)] = storage.save(
+            os.path.join(variants_dir, f'{stem}_{size}.webp'),
+            ContentFile(_encode(thumbnail, 'WEBP', **_options('WEBP'))),
+        )
+
+    return original_name, variants
+
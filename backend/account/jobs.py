@@ -0,0 +1,50 @@
+from django.utils import timezone
+from backend.authentication import invalidate_cached_user
+from .files import profile_file_names, release_files
+from .images import process_photo
+from .models import Profile
+
+
+"""
+Trabajo en segundo plano: procesa la foto de un perfil.
+
+- replaced: (foto, variantes) anteriores, se liberan al terminar (en el mismo
+  trabajo, así no se elimina un archivo que el procesado acaba de reutilizar).
+- Cada archivo generado suma su referencia al guardarse; la de la subida sin
+  procesar se libera al sustituirla por la recodificada.
+- Si la foto cambió antes de terminar, se liberan los archivos generados.
+"""
+def process_profile_photo(profile_id, name, replaced=None):
+    storage = Profile._meta.get_field('foto').storage
+    try:
+        profile = Profile.objects.filter(pk=profile_id, foto=name).first()
+        # ? El perfil ya no existe o tiene otra foto (quien la cambió libera la subida)
+        if profile is None:
+            return
+
+        original, variants = process_photo(storage, name)
+
+        # Guardar sin pasar por Profile.save (solo si la foto sigue siendo la misma)
+        updated = Profile.objects.filter(pk=profile_id, foto=name).update(
+            foto=original, foto_variants=variants, updated_at=timezone.now(),
+        )
+        # ? La foto cambió mientras se procesaba
+        if not updated:
+            release_files(profile_file_names(original, variants), storage)
+            return
+        # update() no envía señales: usuario en caché con el perfil anterior
+        invalidate_cached_user(profile.user_id)
+        # Referencia de la subida (la recodificada tiene la suya, aunque sea el mismo archivo)
+        release_files([name], storage)
+    finally:
+        if replaced:
+            release_files(profile_file_names(*replaced), storage)
+
+
+"""
+Trabajo en segundo plano: libera la foto y las variantes de un perfil (foto
+reemplazada o perfil eliminado); los archivos sin referencias se eliminan.
+"""
+def release_profile_files(name, variants):
+    storage = Profile._meta.get_field('foto').storage
+    release_files(profile_file_names(name, variants), storage)
@@ -0,0 +1,78 @@
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from account.benchmarks import run_benchmark, compare_with_baseline, save_results, load_results
+from tasks.cache import task_response_cache
+
+# @benchmark - Benchmark reproducible de la API (cuentas, tokens y tareas)
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Ejecuta el benchmark de la API sobre una base de datos de prueba y lo compara con una línea base'
+
+    # Argumentos del comando
+    # --sizes: Tamaños de datos (tareas) separados por coma
+    # --iterations: Peticiones medidas por escenario
+    # --token-iterations: Peticiones medidas para /api/token/ (hash de contraseña)
+    # --scenarios: Escenarios a ejecutar separados por coma (todos por defecto)
+    # --seed: Semilla de los datos
+    # --output: Archivo JSON de salida
+    # --baseline: Archivo JSON con la línea base a comparar
+    # --tolerance: Tolerancia de p95 frente a la línea base (0.2 = 20%)
+    # --cache: Mantener activa la caché de respuestas de tareas
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help='Tamaños de datos separados por coma')
+        parser.add_argument('--iterations', type=int, default=50, help='Peticiones medidas por escenario')
+        parser.add_argument('--token-iterations', type=int, default=10, help='Peticiones medidas para /api/token/')
+        parser.add_argument('--scenarios', default='', help='Escenarios separados por coma')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de los datos')
+        parser.add_argument('--output', default='', help='Archivo JSON de salida')
+        parser.add_argument('--baseline', default='', help='Archivo JSON de línea base')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Tolerancia de p95 (0.2 = 20%%)')
+        parser.add_argument('--cache', action='store_true', help='Mantener la caché de respuestas de tareas')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size]
+        except ValueError:
+            raise CommandError('--sizes debe ser una lista de enteros separados por coma.')
+        if not sizes or min(sizes) < 1:
+            raise CommandError('--sizes debe tener al menos un tamaño mayor que cero.')
+        scenarios = {name for name in options['scenarios'].split(',') if name}
+
+        # ? Medir sin la caché de respuestas
+        task_response_cache.enabled = options['cache']
+        # Sin líneas de tiempos por petición en la salida del benchmark
+        logging.getLogger('backend.timing').setLevel(logging.CRITICAL)
+
+        # Base de datos de prueba (nunca la de desarrollo / producción), como el runner de
+        # pruebas: las réplicas (TEST MIRROR) pasan a ser espejos de la base de prueba
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+        try:
+            results = run_benchmark(
+                sizes,
+                iterations=options['iterations'],
+                token_iterations=options['token_iterations'],
+                seed=options['seed'],
+                scenarios=scenarios,
+                log=self.stdout.write,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        # ? Guardar resultados
+        if options['output']:
+            save_results(results, options['output'])
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+
+        # ? Comparar con la línea base
+        if options['baseline']:
+            regressions = compare_with_baseline(results, load_results(options['baseline']), options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(self.style.ERROR(f'Regresión: {regression}'))
+                raise CommandError(f'{len(regressions)} regresiones frente a la línea base.')
+            self.stdout.write(self.style.SUCCESS('Sin regresiones frente a la línea base.'))
@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+# @prune - Poda de tokens JWT expirados (emitidos y en lista negra)
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Elimina por lotes los tokens expirados de OutstandingToken y BlacklistedToken (programable con cron)'
+
+    # Argumentos del comando
+    # --batch: Número de tokens a eliminar por lote
+    # --sleep: Segundos de pausa entre lotes
+    # --dry-run: Solo contar los tokens expirados
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=5000, help='Tokens a eliminar por lote')
+        parser.add_argument('--sleep', type=float, default=0, help='Pausa entre lotes (segundos)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo contar los tokens expirados')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+
+        # ? Solo contar
+        if options['dry_run']:
+            self.stdout.write(f'Tokens expirados: {expired.count()}')
+            return
+
+        total = 0
+        while True:
+            # Lote por clave primaria (transacciones cortas)
+            ids = list(expired.order_by('pk').values_list('pk', flat=True)[:options['batch']])
+            if not ids:
+                break
+            with transaction.atomic():
+                # BlacklistedToken se elimina en cascada
+                OutstandingToken.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡Eliminados {total} tokens expirados!'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from account.files import rebuild_file_references
+
+# @rebuild - Recalcula las referencias de las fotos de perfil compartidas
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Recalcula desde los perfiles cuántas filas usan cada foto y variante (archivos compartidos)'
+
+    def handle(self, *args, **options):
+        files = rebuild_file_references()
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡Referencias recalculadas para {files} archivos!'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from account.models import UserSearch
+from account.search import rebuild_user_search
+
+# @rebuild - Recalcula los documentos de búsqueda de usuarios
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Recalcula desde cero los documentos de búsqueda del directorio de usuarios'
+
+    # Argumentos del comando
+    # --user: Recalcular solo estos ids de usuario
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='Id de usuario (se puede repetir)')
+
+    def handle(self, *args, **options):
+        rebuild_user_search(options['user'])
+        documents = UserSearch.objects.all()
+        if options['user']:
+            documents = documents.filter(user_id__in=options['user'])
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡Documentos de búsqueda recalculados para {documents.count()} usuarios!'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from account.deletion import run_user_deletion
+from account.models import UserDeletion
+
+# @resume - Reanuda las eliminaciones de usuarios interrumpidas
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Ejecuta las eliminaciones de usuarios pendientes, en curso (interrumpidas) o fallidas'
+
+    # Argumentos del comando
+    # --failed: Reintentar también las fallidas
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Reintentar también las eliminaciones fallidas')
+
+    def handle(self, *args, **options):
+        statuses = [UserDeletion.PENDING, UserDeletion.RUNNING]
+        if options['failed']:
+            statuses.append(UserDeletion.FAILED)
+
+        pending = UserDeletion.objects.filter(status__in=statuses).order_by('created_at')
+        for deletion in pending:
+            self.stdout.write(f'Eliminando usuario {deletion.user_id} ({deletion.username})...')
+            run_user_deletion(deletion.pk)
+            deletion.refresh_from_db()
+            self.stdout.write(f'  {deletion.status}: {deletion.deleted_tasks}/{deletion.total_tasks} tareas')
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡{pending.count()} eliminaciones sin terminar!'))
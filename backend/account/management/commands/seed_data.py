@@ -1,5 +1,9 @@
+import random
+import time
 from django.core.management.base import BaseCommand
-from account.seeders import UserFactory, ProfileFactory, TaskFactory
+from django.contrib.auth.models import User
+from django.db import connection
+from account.seeders import UserFactory, ProfileFactory, TaskFactory, bulk_seed_users, bulk_seed_tasks
 
 # @seed - Datos de prueba para usuarios, perfiles y tareas
 class Command(BaseCommand):
@@ -10,22 +14,84 @@ class Command(BaseCommand):
     # Argumentos del comando
     # --users: Número de usuarios a crear
     # --tasks: Número de tareas a crear
+    # --bulk: Modo masivo (bulk_create por lotes, avatares locales)
+    # --chunk-size: Filas por lote en modo masivo
+    # --workers: Procesos para crear tareas en modo masivo
+    # --seed: Semilla para datos deterministas
+    # --no-avatars: No generar avatares en modo masivo
     def add_arguments(self, parser):
         parser.add_argument('--users', type=int, default=10, help='Número de usuarios a crear')
         parser.add_argument('--tasks', type=int, default=50, help='Número de tareas a crear')
+        parser.add_argument('--bulk', action='store_true', help='Modo masivo con bulk_create por lotes')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Filas por lote (modo masivo)')
+        parser.add_argument('--workers', type=int, default=1, help='Procesos para crear tareas (modo masivo)')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla para datos deterministas (modo masivo)')
+        parser.add_argument('--no-avatars', action='store_true', help='No generar avatares (modo masivo)')
 
     # Modelo de tarea
     def handle(self, *args, **options):
+        # ? Modo masivo
+        if options['bulk']:
+            return self.handle_bulk(options)
+
         # Crear usuarios con perfiles
         for _ in range(options['users']):
             user = UserFactory()
             # Perfil
             ProfileFactory(user=user) 
 
-        # Crear tareas
-        TaskFactory.create_batch(options['tasks'])
+        # Crear tareas (usuarios en memoria, sin ORDER BY RANDOM() por tarea)
+        users = list(User.objects.all())
+        for _ in range(options['tasks'] if users else 0):
+            TaskFactory(user=random.choice(users))
 
         # Mensaje de éxito
         self.stdout.write(self.style.SUCCESS(
             f'¡Creados {options["users"]} usuarios con perfiles y {options["tasks"]} tareas!'
-        ))
\ No newline at end of file
+        ))
+
+    # Modo masivo
+    def handle_bulk(self, options):
+        start = time.perf_counter()
+
+        # ? SQLite solo admite un escritor a la vez
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(self.style.WARNING('SQLite no admite escrituras en paralelo, se usará un solo proceso.'))
+            options['workers'] = 1
+
+        user_ids = bulk_seed_users(
+            options['users'],
+            seed=options['seed'],
+            chunk_size=min(options['chunk_size'], 1000),
+            avatars=not options['no_avatars'],
+        )
+        # ? Sin usuarios nuevos, usar los existentes
+        if not user_ids:
+            user_ids = list(User.objects.values_list('id', flat=True))
+        if not user_ids and options['tasks']:
+            self.stderr.write(self.style.ERROR('No hay usuarios para asignar las tareas.'))
+            return
+
+        self.stdout.write(f'Usuarios creados: {options["users"]} ({time.perf_counter() - start:.1f}s)')
+
+        # Progreso de las tareas
+        def progress(created):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'\rTareas: {created}/{options["tasks"]} ({elapsed:.1f}s)', ending='')
+            self.stdout.flush()
+
+        created = bulk_seed_tasks(
+            options['tasks'],
+            user_ids,
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            progress=progress,
+        )
+
+        # Mensaje de éxito
+        elapsed = time.perf_counter() - start
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'¡Creados {options["users"]} usuarios con perfiles y {created} tareas en {elapsed:.1f}s!'
+        ))
@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
+from backend.workers import submit_on_commit
+from .files import profile_photo_storage
+import copy
 import uuid
 import os
 
@@ -11,7 +12,8 @@ def user_profile_image_path(instance, filename):
     # Generar un nombre único usando UUID
     unique_filename = f"{uuid.uuid4().hex}.{ext}"
     # Retornar la ruta: profiles/user_<id>/<nombre_unico>.<ext>
-    return os.path.join('profiles', f'user_{instance.user.id}', unique_filename)
+    # (el storage de la foto la guarda como profiles/<ab>/<sha256 del contenido>.<ext>)
+    return os.path.join('profiles', f'user_{instance.user_id}', unique_filename)
 
 
 class Profile(models.Model):
@@ -20,7 +22,9 @@ class Profile(models.Model):
       - nombre: texto breve (max 100)
       - apellido: texto breve (max 100)
       - telefono: texto breve (max 20)
-      - foto: imagen, opcional
+      - foto: imagen, opcional (nombre por hash del contenido, compartida entre perfiles,
+        referencias en StoredFile)
+      - foto_variants: rutas de las variantes procesadas de la foto (webp, miniaturas)
       - created_at: timestamp automático
       - updated_at: timestamp automático
     """
@@ -28,18 +32,202 @@ class Profile(models.Model):
     nombre = models.CharField(max_length=100, blank=True)
     apellido = models.CharField(max_length=100, blank=True)
     telefono = models.CharField(max_length=20, blank=True)
-    foto = models.ImageField(upload_to=user_profile_image_path, null=True, blank=True) 
+    foto = models.ImageField(upload_to=user_profile_image_path, storage=profile_photo_storage, null=True, blank=True)
+    foto_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Copia de los valores cargados para detectar cambios sin consultar
+        # (profunda: foto_variants se puede modificar en el sitio)
+        instance._loaded_values = {
+            name: copy.deepcopy(value) for name, value in zip(field_names, values)
+            if value is not models.DEFERRED
+        }
+        return instance
+
+    # Valor actual comparable con el cargado de la base de datos
+    def _tracked_value(self, field):
+        value = getattr(self, field.attname)
+        # ? Archivo: se compara el nombre guardado
+        if isinstance(field, models.FileField):
+            return value.name or None
+        return copy.deepcopy(value)
+
+    """
+    Campos modificados desde que se cargó el perfil.
+
+    - None si el perfil no viene de la base de datos (nuevo).
+    - Una foto recién asignada (sin guardar) siempre cuenta como cambio.
+    """
+    def get_changed_fields(self):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname not in loaded:
+                continue
+            loaded_value = loaded[field.attname]
+            # ? Archivo vacío puede venir como '' o None
+            if isinstance(field, models.FileField):
+                loaded_value = loaded_value or None
+            if self._tracked_value(field) != loaded_value:
+                changed.add(field.name)
+        # ? Nueva foto subida (una foto diferida no se asignó)
+        if 'foto' not in self.get_deferred_fields() and self.foto and not self.foto._committed:
+            changed.add('foto')
+        return changed
+
     def save(self, *args, **kwargs):
+        # Fila y referencias de los archivos nuevos (storage) en la misma transacción
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            self._save_profile(using, *args, **kwargs)
+
+    def _save_profile(self, db, *args, **kwargs):
+        changed = self.get_changed_fields() if self.pk else None
+        loaded = getattr(self, '_loaded_values', None) or {}
+        old_files = None
+
+        # ? Con pk pero sin la foto cargada (perfil construido a mano, .only()...): archivos de
+        # la fila bloqueada, si existe, para no perder la referencia de la foto anterior
+        update_fields = kwargs.get('update_fields')
+        row_files = None
+        if self.pk and 'foto' not in loaded and 'foto' not in self.get_deferred_fields() and (
+            update_fields is None or 'foto' in update_fields
+        ):
+            row_files = (
+                Profile.objects.using(db).select_for_update()
+                .filter(pk=self.pk).values_list('foto', 'foto_variants').first()
+            )
+
+        # Perfil nuevo con foto
+        foto_changed = changed is None and row_files is None and bool(self.foto)
+        # ? Perfil existente sin la foto cargada: se compara con la de la fila
+        if row_files is not None:
+            if (self.foto.name or None) != (row_files[0] or None) or (self.foto and not self.foto._committed):
+                foto_changed = bool(self.foto)
+                self.foto_variants = {}
+                old_files = row_files
+                if changed is not None:
+                    changed |= {'foto', 'foto_variants'}
+                # ? Guardado parcial: las variantes de la foto anterior se vacían también
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'foto_variants'}
+            # ? Misma foto: se conservan las variantes procesadas si no se cargaron
+            elif 'foto_variants' not in loaded:
+                self.foto_variants = row_files[1]
         # Si el perfil ya existe en la base de datos
-        if self.pk:
-            old_instance = Profile.objects.get(pk=self.pk)
-            # Si la foto ha cambiado y existía una anterior
-            if old_instance.foto and old_instance.foto != self.foto:
-                old_instance.foto.delete(save=False)  # Eliminar la foto antigua
+        if changed is not None:
+            # Si la foto ha cambiado (con la foto cargada)
+            if 'foto' in changed and row_files is None:
+                foto_changed = bool(self.foto)
+                self.foto_variants = {}
+                changed.add('foto_variants')
+                # Archivos actuales de la fila (bloqueada): el procesado pudo cambiarlos tras cargar el perfil
+                old_files = (
+                    Profile.objects.using(db).select_for_update()
+                    .filter(pk=self.pk).values_list('foto', 'foto_variants').first()
+                )
+            # Solo las columnas modificadas (sin cambios no se escribe nada)
+            if kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+                kwargs['update_fields'] = changed | {'updated_at'} if changed else []
+
         super().save(*args, **kwargs)
 
+        # Nueva copia de los valores guardados (sin cargar los campos diferidos)
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        loaded = getattr(self, '_loaded_values', {}) if update_fields is not None else {}
+        for field in self._meta.concrete_fields:
+            # ? Campo diferido o no guardado (update_fields)
+            if field.attname in deferred or (
+                update_fields is not None and field.name not in update_fields and field.attname not in update_fields
+            ):
+                continue
+            loaded[field.attname] = self._tracked_value(field)
+        self._loaded_values = loaded
+
+        # ? Foto nueva, procesar en segundo plano al confirmar la transacción (después libera la anterior)
+        if foto_changed:
+            from .jobs import process_profile_photo
+            submit_on_commit(process_profile_photo, self.pk, self.foto.name, old_files, using=db)
+        # ? Se quitó la foto, liberar la anterior al confirmar (fuera de la petición)
+        elif old_files and (old_files[0] or old_files[1]):
+            from .jobs import release_profile_files
+            submit_on_commit(release_profile_files, *old_files, using=db)
+
+    def __str__(self):
+        return f"{self.user.username} - Profile"
+
+class StoredFile(models.Model):
+    """
+      - name: nombre del archivo en el storage (hash del contenido)
+      - references: fotos y variantes de perfiles que lo usan
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
+
+
+class UserSearch(models.Model):
+    """
+      - user: usuario buscado (clave primaria)
+      - document: texto de búsqueda normalizado (usuario, email, nombre,
+        apellido y dígitos del teléfono; minúsculas y sin acentos)
+      - updated_at: timestamp automático
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    document = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.document}"
+
+
+class UserDeletion(models.Model):
+    """
+      - user_id: id del usuario eliminado (sin FK, el registro sobrevive al usuario)
+      - username: nombre del usuario, para consultar el historial
+      - requested_by_id: id de quien pidió la eliminación
+      - status: pending | running | done | failed
+      - total_tasks: tareas del usuario al pedir la eliminación
+      - deleted_tasks: tareas eliminadas hasta ahora
+      - error: mensaje del fallo (status failed)
+      - created_at: timestamp automático
+      - updated_at: timestamp automático
+      - finished_at: fin de la eliminación
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pendiente'), (RUNNING, 'En curso'), (DONE, 'Terminada'), (FAILED, 'Fallida')]
+
+    user_id = models.BigIntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    requested_by_id = models.BigIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total_tasks = models.IntegerField(default=0)
+    deleted_tasks = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Porcentaje de tareas eliminadas
+    @property
+    def progress(self):
+        if self.status == self.DONE:
+            return 100
+        if not self.total_tasks:
+            return 0
+        return min(99, self.deleted_tasks * 100 // self.total_tasks)
+
     def __str__(self):
-        return f"{self.user.username} - Profile"
\ No newline at end of file
+        return f"{self.user_id} - {self.status} ({self.deleted_tasks}/{self.total_tasks})"
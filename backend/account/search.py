@@ -0,0 +1,257 @@
+import re
+import unicodedata
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+from .models import UserSearch
+
+# Nombres de las estructuras de búsqueda
+USER_TABLE = User._meta.db_table
+SEARCH_TABLE = UserSearch._meta.db_table
+PG_TRGM_INDEX = 'user_search_document_trgm'
+FTS_TABLE = f'{SEARCH_TABLE}_fts'
+
+# Palabras de la búsqueda (letras y números)
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+# Búsqueda con forma de teléfono (+34 600-12-34, (600) 123 ...)
+PHONE_QUERY_RE = re.compile(r'[\d\s+\-().]*\d[\d\s+\-().]*')
+NON_DIGIT_RE = re.compile(r'\D')
+
+# Longitud mínima de una palabra para el índice de trigramas
+TRIGRAM_LENGTH = 3
+
+
+# Minúsculas y sin acentos (José -> jose, Muñoz -> munoz)
+def fold(value):
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+# Solo los dígitos del teléfono
+def phone_digits(value):
+    return NON_DIGIT_RE.sub('', value or '')
+
+
+# Documento de búsqueda de un usuario
+def build_document(username, email, nombre, apellido, telefono):
+    parts = (username, email, nombre, apellido)
+    return ' '.join(filter(None, [fold(part) for part in parts] + [phone_digits(telefono)]))
+
+
+# Palabras normalizadas de una búsqueda (un teléfono se busca como sus dígitos)
+def search_terms(value):
+    value = value.replace('\x00', '')
+    # ? Parece un teléfono
+    if PHONE_QUERY_RE.fullmatch(value.strip()):
+        return [phone_digits(value)]
+    return TERM_RE.findall(fold(value))
+
+
+# Escapar comodines de LIKE (los guiones bajos son habituales en los usernames)
+def like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+"""
+Recalcula los documentos de búsqueda desde los usuarios y sus perfiles.
+
+- user_ids=None recalcula todos (comando rebuild_user_search).
+- Una consulta por lote y un INSERT ... ON CONFLICT DO UPDATE.
+"""
+def rebuild_user_search(user_ids=None, using='default', batch_size=1000):
+    users = User.objects.using(using).order_by()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    rows = users.values_list(
+        'pk', 'username', 'email', 'profile__nombre', 'profile__apellido', 'profile__telefono',
+    ).iterator(chunk_size=batch_size)
+
+    batch = []
+    for pk, *fields in rows:
+        batch.append(UserSearch(user_id=pk, document=build_document(*fields)))
+        if len(batch) >= batch_size:
+            _save_documents(batch, using)
+            batch = []
+    if batch:
+        _save_documents(batch, using)
+
+
+def _save_documents(documents, using):
+    UserSearch.objects.using(using).bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['document', 'updated_at'],
+    )
+
+
+"""
+Sentencias para Postgres.
+
+- Extensión pg_trgm e índice GIN de trigramas sobre el documento: sirve
+  para LIKE '%texto%' y para la similitud por palabras (<%).
+"""
+def _postgres_statements():
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS {PG_TRGM_INDEX} ON {SEARCH_TABLE} USING gin (document gin_trgm_ops)",
+    ]
+
+
+"""
+Sentencias para SQLite.
+
+- Tabla FTS5 con contenido externo y tokenizador de trigramas (busca
+  subcadenas, como el LIKE '%texto%' de antes, pero con índice).
+- Los triggers la mantienen al día al insertar, actualizar y eliminar.
+"""
+def _sqlite_statements():
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            document,
+            content='{SEARCH_TABLE}', content_rowid='user_id',
+            tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.user_id, new.document);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.user_id, old.document);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF document ON {SEARCH_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.user_id, old.document);
+            INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.user_id, new.document);
+        END
+        """,
+    ]
+
+
+"""
+Crea (si no existen) las estructuras de búsqueda en la base de datos indicada.
+
+- Es idempotente, se ejecuta después de cada migrate.
+- En SQLite reconstruye el índice FTS5 la primera vez que se crea.
+- Crea los documentos que falten (usuarios anteriores a la búsqueda).
+"""
+def install_user_search(using='default'):
+    connection = connections[using]
+
+    # ? La tabla de búsqueda todavía no existe
+    if SEARCH_TABLE not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        # Postgres
+        if connection.vendor == 'postgresql':
+            for statement in _postgres_statements():
+                cursor.execute(statement)
+        # SQLite
+        elif connection.vendor == 'sqlite':
+            created = FTS_TABLE not in connection.introspection.table_names(cursor)
+            for statement in _sqlite_statements():
+                cursor.execute(statement)
+            # ? Se acaba de crear, indexar los documentos existentes
+            if created:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    missing = list(
+        User.objects.using(using).filter(search_document__isnull=True).values_list('pk', flat=True)
+    )
+    # ? Usuarios sin documento
+    if missing:
+        rebuild_user_search(missing, using=using)
+
+
+"""
+Filtro de búsqueda del directorio de usuarios (?search=texto).
+
+- Busca en usuario, email, nombre, apellido y teléfono (solo dígitos), sin
+  distinguir mayúsculas ni acentos. Todas las palabras deben aparecer.
+- Postgres: LIKE sobre el índice de trigramas, más similitud por palabras
+  (tolera erratas); ordenado por word_similarity.
+- SQLite: tabla FTS5 de trigramas (subcadenas), ordenado por bm25. Las
+  palabras de menos de 3 caracteres se comprueban con LIKE.
+- Otros motores: icontains sobre el documento.
+"""
+class UserSearchFilter(filters.BaseFilterBackend):
+    search_param = api_settings.SEARCH_PARAM
+
+    # Obtener las palabras de la búsqueda
+    def get_search_terms(self, request):
+        return search_terms(request.query_params.get(self.search_param, ''))
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+
+        # ? Sin búsqueda
+        if not terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+
+        # Postgres
+        if vendor == 'postgresql':
+            conditions, params = [], []
+            for term in terms:
+                conditions.append('(document LIKE %s OR %s <%% document)')
+                params += [like_pattern(term), term]
+            match = RawSQL(
+                f'{USER_TABLE}.id IN (SELECT user_id FROM {SEARCH_TABLE} WHERE {" AND ".join(conditions)})',
+                params,
+                output_field=BooleanField(),
+            )
+            rank = RawSQL(
+                f'(SELECT word_similarity(%s, document) FROM {SEARCH_TABLE} WHERE user_id = {USER_TABLE}.id)',
+                [' '.join(terms)],
+                output_field=FloatField(),
+            )
+        # SQLite
+        elif vendor == 'sqlite':
+            indexed = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+            short = [term for term in terms if len(term) < TRIGRAM_LENGTH]
+            likes = ''.join(f" AND document LIKE %s ESCAPE '\\'" for _ in short)
+            like_params = [like_pattern(term) for term in short]
+
+            # ? Solo palabras cortas, sin índice
+            if not indexed:
+                match = RawSQL(
+                    f'{USER_TABLE}.id IN (SELECT user_id FROM {SEARCH_TABLE} WHERE 1{likes})',
+                    like_params,
+                    output_field=BooleanField(),
+                )
+                return queryset.filter(match)
+
+            fts_query = ' AND '.join(f'"{term}"' for term in indexed)
+            match = RawSQL(
+                f'{USER_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s{likes})',
+                [fts_query, *like_params],
+                output_field=BooleanField(),
+            )
+            # bm25 devuelve valores menores para mejores resultados
+            rank = RawSQL(
+                f'(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {USER_TABLE}.id)',
+                [fts_query],
+                output_field=FloatField(),
+            )
+        # Otros motores
+        else:
+            condition = Q()
+            for term in terms:
+                condition &= Q(search_document__document__contains=term)
+            return queryset.filter(condition)
+
+        queryset = queryset.filter(match).annotate(search_rank=rank)
+        # Más relevantes primero, desempate por el orden de la vista
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
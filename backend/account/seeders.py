@@ -1,10 +1,17 @@
+import io
+import os
 import random
 import urllib.request
 from tempfile import NamedTemporaryFile
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connections
 from account.models import Profile
 from tasks.models import Task
+from tasks.stats import rebuild_task_stats
+from account.search import rebuild_user_search
 import factory
 from factory.django import DjangoModelFactory
 from faker import Faker
@@ -72,4 +79,177 @@ class TaskFactory(DjangoModelFactory):
     completed = factory.LazyAttribute(lambda _: fake.boolean(chance_of_getting_true=30))
     
     # Evitar consulta directa a la base de datos
-    user = factory.LazyFunction(lambda: User.objects.order_by('?').first())
\ No newline at end of file
+    user = factory.LazyFunction(lambda: User.objects.order_by('?').first())
+
+
+# ---------------------------------------------------------------------------
+# Seeder masivo (bulk_create por lotes)
+# ---------------------------------------------------------------------------
+
+# Tamaño de los textos precalculados (títulos y descripciones)
+TEXT_POOL_SIZE = 2000
+# Contraseña de los usuarios generados
+BULK_PASSWORD = 'password123'
+# Tamaño de los avatares generados (px)
+AVATAR_SIZE = 128
+
+
+"""
+Genera un avatar local (PNG) con un color y una inicial, sin red.
+"""
+def generate_avatar(rng, letter):
+    from PIL import Image, ImageDraw
+
+    background = tuple(rng.randint(40, 200) for _ in range(3))
+    image = Image.new('RGB', (AVATAR_SIZE, AVATAR_SIZE), background)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((24, 24, AVATAR_SIZE - 24, AVATAR_SIZE - 24), fill=(245, 245, 245))
+    draw.text((AVATAR_SIZE // 2, AVATAR_SIZE // 2), letter.upper(), fill=background, anchor='mm')
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+"""
+Textos precalculados con Faker (deterministas según la semilla).
+
+- Elegir de una lista es mucho más rápido que generar cada texto con Faker.
+"""
+def build_text_pool(seed, size=TEXT_POOL_SIZE):
+    pool_fake = Faker()
+    pool_fake.seed_instance(seed)
+    titles = [pool_fake.sentence(nb_words=6)[:100] for _ in range(size)]
+    descriptions = [pool_fake.paragraph(nb_sentences=3)[:1200] for _ in range(size)]
+    return titles, descriptions
+
+
+"""
+Crea usuarios y perfiles con bulk_create por lotes.
+
+- Un solo hash de contraseña para todos (make_password es lento a propósito).
+- Avatares generados localmente (opcional).
+- Devuelve la lista de ids creados.
+"""
+def bulk_seed_users(count, seed=0, chunk_size=1000, avatars=True):
+    rng = random.Random(seed)
+    user_fake = Faker()
+    user_fake.seed_instance(seed)
+    password = make_password(BULK_PASSWORD)
+    storage = Profile._meta.get_field('foto').storage
+
+    # Sufijo para no repetir usernames con datos existentes
+    offset = (User.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+    user_ids = []
+
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        users = [
+            User(
+                username=f'{user_fake.user_name()}_{offset + start + i}'[:150],
+                email=f'{offset + start + i}_{user_fake.email()}',
+                password=password,
+            )
+            for i in range(size)
+        ]
+        User.objects.bulk_create(users)
+
+        profiles = []
+        for user in users:
+            profile = Profile(
+                user=user,
+                nombre=user_fake.first_name(),
+                apellido=user_fake.last_name(),
+                telefono=user_fake.phone_number()[:20],
+            )
+            # ? Avatar local
+            if avatars:
+                profile.foto.name = storage.save(
+                    os.path.join('profiles', f'user_{user.pk}', f'avatar_{user.pk}.png'),
+                    ContentFile(generate_avatar(rng, profile.nombre[:1] or 'U')),
+                )
+            profiles.append(profile)
+        Profile.objects.bulk_create(profiles)
+        # bulk_create no envía señales: documentos de búsqueda del lote
+        rebuild_user_search([user.pk for user in users])
+
+        user_ids.extend(user.pk for user in users)
+    return user_ids
+
+
+# Datos compartidos por los lotes de cada proceso (ids de usuarios, textos)
+_chunk_state = {}
+
+
+# Preparar los datos compartidos (y Django en procesos nuevos)
+def _init_worker(user_ids, text_pool, setup=False):
+    if setup:
+        import django
+        django.setup()
+    _chunk_state['user_ids'] = user_ids
+    _chunk_state['text_pool'] = text_pool
+
+
+"""
+Crea un lote de tareas (unidad de trabajo de cada proceso).
+
+- El lote depende solo de (semilla, índice), el resultado es el mismo con
+  cualquier número de procesos.
+"""
+def seed_task_chunk(args):
+    chunk_index, size, seed = args
+    rng = random.Random(f'{seed}-{chunk_index}')
+    user_ids = _chunk_state['user_ids']
+    titles, descriptions = _chunk_state['text_pool']
+    Task.objects.bulk_create([
+        Task(
+            user_id=rng.choice(user_ids),
+            title=rng.choice(titles),
+            description=rng.choice(descriptions),
+            completed=rng.random() < 0.3,
+        )
+        for _ in range(size)
+    ])
+    return size
+
+
+"""
+Crea tareas con bulk_create por lotes, opcionalmente en varios procesos.
+
+- Los usuarios se asignan desde una lista de ids en memoria (sin consultas por fila).
+- Los ids y los textos se envían una sola vez a cada proceso.
+- Al terminar recalcula los contadores de tareas (TaskStats).
+- Devuelve el número de tareas creadas.
+"""
+def bulk_seed_tasks(count, user_ids, seed=0, chunk_size=5000, workers=1, progress=None):
+    text_pool = build_text_pool(seed)
+    chunks = [
+        (index, min(chunk_size, count - start), seed)
+        for index, start in enumerate(range(0, count, chunk_size))
+    ]
+
+    created = 0
+    # ? Un solo proceso
+    if workers <= 1:
+        _init_worker(user_ids, text_pool)
+        for chunk in chunks:
+            created += seed_task_chunk(chunk)
+            if progress:
+                progress(created)
+        # bulk_create no envía señales: contadores recalculados
+        rebuild_task_stats()
+        return created
+
+    import multiprocessing
+
+    # Las conexiones abiertas no se pueden compartir con los procesos hijos
+    connections.close_all()
+    context = multiprocessing.get_context()
+    initargs = (user_ids, text_pool, context.get_start_method() != 'fork')
+    with context.Pool(processes=workers, initializer=_init_worker, initargs=initargs) as pool:
+        for size in pool.imap_unordered(seed_task_chunk, chunks):
+            created += size
+            if progress:
+                progress(created)
+    rebuild_task_stats()
+    return created
@@ -1,10 +1,11 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from tasks.serializers import TaskViewSerializer
+from backend.sparse import SparseFieldsetSerializerMixin
+from tasks.serializers import TaskViewSerializer, TaskSummarySerializer
 from .validators import validate_photo_size, validate_photo_format
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import Profile
+from .models import Profile, UserDeletion
 
 # Modelo
 t_user = get_user_model()
@@ -91,26 +92,39 @@ class ProfileUpdateSerializer(BaseProfileSerializerValidator):
 """
 Serializer para visualizar el perfil.
 """
-class ProfileReadSerializer(serializers.ModelSerializer):
+class ProfileReadSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Método para obtener la URL completa de la foto
     foto_url = serializers.SerializerMethodField()
+    # URLs de las variantes procesadas (webp, miniaturas 64/128/256)
+    foto_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ('nombre', 'apellido', 'telefono', 'foto', 'foto_url')
+        fields = ('nombre', 'apellido', 'telefono', 'foto', 'foto_url', 'foto_variants')
+
+    # URL completa de un archivo
+    def build_url(self, url):
+        # Verifica si request está disponible en el contexto
+        request = self.context.get('request')
+        if request:
+            # Devuelve la URL completa usando la URL del servidor
+            return request.build_absolute_uri(url)
+        # Si no hay request (por ejemplo, en entorno de localhost), construir manualmente
+        return f'http://localhost:8000{url}'
     
     def get_foto_url(self, obj):
         # Verificar si la foto existe
         if obj.foto:
-            # Verifica si request está disponible en el contexto
-            request = self.context.get('request')
-            if request:
-                # Devuelve la URL completa usando la URL del servidor
-                return request.build_absolute_uri(obj.foto.url)
-            # Si no hay request (por ejemplo, en entorno de localhost), construir manualmente
-            return f'http://localhost:8000{obj.foto.url}'
+            return self.build_url(obj.foto.url)
         return None
 
+    def get_foto_variants(self, obj):
+        # ? Sin foto o todavía en proceso
+        if not obj.foto or not obj.foto_variants:
+            return {}
+        storage = obj.foto.storage
+        return {variant: self.build_url(storage.url(name)) for variant, name in obj.foto_variants.items()}
+
 """
 Serializador para registro de User - Profile.
 """
@@ -214,7 +228,7 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
 """
 Serializador para visualizar datos de User + Profile.
 """
-class UserProfileDetailSerializer(serializers.ModelSerializer):
+class UserProfileDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     
     # Perfil
     profile = ProfileReadSerializer(read_only=True)
@@ -222,4 +236,43 @@ class UserProfileDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = t_user
-        fields = ('id', 'username', 'email', 'profile', 'tasks')
\ No newline at end of file
+        fields = ('id', 'username', 'email', 'profile', 'tasks')
+
+"""
+Serializador para el listado de usuarios (admin).
+
+- tasks_count y recent_tasks salen de la anotación y del prefetch de la vista.
+- La lista completa de tareas solo se incluye con ?include=tasks.
+"""
+class UserListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+
+    # Perfil y resumen de tareas
+    profile = ProfileReadSerializer(read_only=True)
+    tasks_count = serializers.IntegerField(read_only=True)
+    recent_tasks = TaskSummarySerializer(many=True, read_only=True)
+    tasks = TaskViewSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = t_user
+        fields = ('id', 'username', 'email', 'profile', 'tasks_count', 'recent_tasks', 'tasks')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ? No se pidieron las tareas completas
+        if not self.context.get('include_tasks'):
+            self.fields.pop('tasks', None)
+
+
+"""
+Serializador del progreso de la eliminación de un usuario.
+"""
+class UserDeletionSerializer(serializers.ModelSerializer):
+
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = UserDeletion
+        fields = (
+            'id', 'user_id', 'username', 'status', 'total_tasks', 'deleted_tasks', 'progress',
+            'error', 'created_at', 'updated_at', 'finished_at',
+        )
@@ -1,16 +1,77 @@
-import os
-from django.db.models.signals import pre_delete
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
+from backend.authentication import invalidate_cached_user
+from backend.workers import submit_on_commit
+from .jobs import release_profile_files
 from .models import Profile
+from .search import rebuild_user_search
 
 
 """
-Elimina la imagen de perfil del usuario al eliminar el perfil.
+Libera la imagen de perfil del usuario al eliminar el perfil.
+
+- Al confirmar la transacción y en segundo plano.
+- Los archivos se comparten entre perfiles (nombre por hash del contenido):
+  solo se eliminan la foto y las variantes que se quedan sin referencias.
 """
 @receiver(pre_delete, sender=Profile)
-def delete_profile_image(sender, instance, **kwargs):
+def delete_profile_image(sender, instance, using, **kwargs):
     # ? la imagen existe
-    if instance.foto:
-        # ? la ruta de la imagen existe
-        if os.path.isfile(instance.foto.path):
-            os.remove(instance.foto.path) # Eliminar la imagen
+    if instance.foto or instance.foto_variants:
+        submit_on_commit(release_profile_files, instance.foto.name, instance.foto_variants, using=using)
+
+
+"""
+Invalida el usuario en la caché de autenticación al guardar o eliminar el
+usuario o su perfil.
+"""
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, using=None, **kwargs):
+    invalidate_cached_user(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_user_cache(sender, instance, using=None, **kwargs):
+    invalidate_cached_user(instance.user_id, using=using)
+
+
+
+# Campos que forman el documento de búsqueda
+USER_SEARCH_FIELDS = {'username', 'email'}
+PROFILE_SEARCH_FIELDS = {'nombre', 'apellido', 'telefono'}
+
+
+"""
+Actualiza el documento de búsqueda del usuario al guardar el usuario o su
+perfil.
+
+- Solo si cambian campos buscables (el login guarda last_login, el
+  procesado de la foto guarda foto_variants).
+- Si la eliminación del perfil viene de borrar al usuario no se hace nada,
+  su documento también se elimina.
+"""
+@receiver(post_save, sender=User)
+def update_user_search(sender, instance, using, update_fields=None, **kwargs):
+    # ? Sin cambios en los campos buscables
+    if update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields):
+        return
+    rebuild_user_search([instance.pk], using=using)
+
+
+@receiver(post_save, sender=Profile)
+def update_profile_user_search(sender, instance, using, update_fields=None, **kwargs):
+    # ? Sin cambios en los campos buscables
+    if update_fields is not None and not PROFILE_SEARCH_FIELDS & set(update_fields):
+        return
+    rebuild_user_search([instance.user_id], using=using)
+
+
+@receiver(post_delete, sender=Profile)
+def update_deleted_profile_user_search(sender, instance, using, origin=None, **kwargs):
+    # ? Se está eliminando el usuario
+    if isinstance(origin, User):
+        return
+    rebuild_user_search([instance.user_id], using=using)
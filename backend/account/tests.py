@@ -1,3 +1,801 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.utils import ConnectionDoesNotExist
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from backend import workers
+from backend.authentication import CachedJWTAuthentication, invalidate_cached_user, user_cache, user_cache_key
+from backend.cache import DjangoCacheBackend
+from backend.media import serve_media
+from backend.middleware import SLOW_QUERIES, ReplicaRoutingMiddleware, RequestTiming
+from backend.revocation import revoked_tokens
+from backend.routers import ReadReplicaRouter, is_sticky, replica_health, sticky_users
+from backend.serializers import CustomTokenObtainPairSerializer
+from backend.storage import is_hashed_name
+from .benchmarks import compare_with_baseline, load_results, percentile, run_benchmark, save_results
+from .deletion import DELETION_STALE_SECONDS, resume_stale_deletions
+from .files import release_files
+from .images import process_photo
+from .seeders import bulk_seed_tasks
+from tasks.cache import task_response_cache
+from tasks.models import Task, TaskStats
+from .models import Profile, StoredFile, UserDeletion, UserSearch
 
-# Create your tests here.
+
+"""
+Búsqueda del directorio de usuarios (/api/account/users/?search=).
+
+- Sin distinguir acentos ni mayúsculas, teléfono por sus dígitos y el
+  documento al día con los cambios del usuario y del perfil.
+"""
+class UserSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'password', is_staff=True)
+        cls.jose = User.objects.create_user('jose_m', 'jose@example.com', 'password')
+        Profile.objects.create(user=cls.jose, nombre='José', apellido='Muñoz', telefono='+34 600-12-34')
+        cls.ana = User.objects.create_user('ana', 'ana@example.com', 'password')
+        Profile.objects.create(user=cls.ana, nombre='Ana', apellido='Pérez', telefono='611 22 33')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, value):
+        response = self.client.get('/api/account/users/', {'search': value})
+        return [user['username'] for user in response.data['results']]
+
+    def test_accent_folding(self):
+        self.assertEqual(self.search('munoz'), ['jose_m'])
+        self.assertEqual(self.search('JOSÉ MUÑ'), ['jose_m'])
+        self.assertEqual(self.search('perez ana'), ['ana'])
+
+    def test_phone_digits(self):
+        self.assertEqual(self.search('6001234'), ['jose_m'])
+        self.assertEqual(self.search('611-22'), ['ana'])
+
+    def test_short_terms_and_wildcards(self):
+        self.assertEqual(self.search('e_m'), ['jose_m'])
+        self.assertEqual(self.search('%'), ['ana', 'jose_m', 'admin'])
+
+    def test_document_follows_changes(self):
+        self.jose.profile.apellido = 'García'
+        self.jose.profile.save()
+        self.assertEqual(self.search('garcia'), ['jose_m'])
+        self.assertEqual(self.search('munoz'), [])
+
+        self.jose.profile.delete()
+        self.assertEqual(UserSearch.objects.get(user=self.jose).document, 'jose_m jose@example.com')
+
+
+"""
+Eliminación de usuarios en segundo plano (DELETE /api/account/user/<id>/).
+"""
+@mock.patch('backend.workers.BACKGROUND_EAGER', True)
+@mock.patch('account.deletion.DELETION_BATCH_SIZE', 2)
+class UserDeletionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'password', is_staff=True)
+        cls.user = User.objects.create_user('borrar', 'borrar@example.com', 'password')
+        Profile.objects.create(user=cls.user, nombre='Borrar')
+        for i in range(5):
+            Task.objects.create(user=cls.user, title=f'Tarea {i}', description='d', completed=i < 2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_delete_in_background(self):
+        # El trabajo se ejecuta al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/account/user/{self.user.pk}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total_tasks'], 5)
+
+        deletion = UserDeletion.objects.get(pk=response.data['id'])
+        self.assertEqual((deletion.status, deletion.deleted_tasks, deletion.progress), (UserDeletion.DONE, 5, 100))
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Task.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(TaskStats.objects.filter(user_id=self.user.pk).exists())
+
+        progress = self.client.get(response['Location'])
+        self.assertEqual(progress.data['status'], UserDeletion.DONE)
+
+    def test_total_tasks_counted_from_tasks(self):
+        # Contadores desviados: el total sale de las tareas
+        TaskStats.objects.filter(user_id=self.user.pk).update(total=99, completed=0)
+        response = self.client.delete(f'/api/account/user/{self.user.pk}/')
+        self.assertEqual(response.data['total_tasks'], 5)
+
+    def test_user_deactivated_before_job(self):
+        response = self.client.delete(f'/api/account/user/{self.user.pk}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        # ? Segunda petición: la misma eliminación pendiente
+        again = self.client.delete(f'/api/account/user/{self.user.pk}/')
+        self.assertEqual(again.data['id'], response.data['id'])
+
+    def test_stale_running_deletion_resumed(self):
+        # Proceso reiniciado a mitad: en curso, con un lote hecho y sin progreso desde entonces
+        Task.objects.filter(pk=Task.objects.filter(user=self.user).first().pk).delete()
+        stale = UserDeletion.objects.create(
+            user_id=self.user.pk, username='borrar', status=UserDeletion.RUNNING, total_tasks=5, deleted_tasks=1,
+        )
+        recent = UserDeletion.objects.create(user_id=self.admin.pk, username='admin', status=UserDeletion.RUNNING)
+        long_ago = timezone.now() - timedelta(seconds=DELETION_STALE_SECONDS + 1)
+        UserDeletion.objects.filter(pk=stale.pk).update(updated_at=long_ago)
+
+        self.assertEqual(resume_stale_deletions(), [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.deleted_tasks), (UserDeletion.DONE, 5))
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        # La que sigue progresando no se toca
+        self.assertEqual(UserDeletion.objects.get(pk=recent.pk).status, UserDeletion.RUNNING)
+        self.assertTrue(User.objects.filter(pk=self.admin.pk).exists())
+
+    @mock.patch('backend.workers.BACKGROUND_EAGER', False)
+    def test_stale_deletion_claimed_once(self):
+        deletion = UserDeletion.objects.create(user_id=self.user.pk, username='borrar')
+        UserDeletion.objects.filter(pk=deletion.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=DELETION_STALE_SECONDS + 1),
+        )
+        with mock.patch('account.deletion.submit') as submit:
+            self.assertEqual(resume_stale_deletions(), [deletion.pk])
+            # ? Otro proceso comprueba a continuación: ya reclamada
+            self.assertEqual(resume_stale_deletions(), [])
+        submit.assert_called_once()
+
+
+"""
+Campos del usuario autenticado (/api/account/me/?fields=).
+"""
+class CurrentUserFieldsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('yo', 'yo@example.com', 'password')
+        Profile.objects.create(user=cls.user, nombre='Yo', apellido='Mismo')
+        Task.objects.create(user=cls.user, title='Tarea', description='d')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_nested_fields(self):
+        response = self.client.get('/api/account/me/', {'fields': 'id,profile.nombre,tasks.title'})
+        self.assertEqual(response.data, {'id': self.user.pk, 'profile': {'nombre': 'Yo'}, 'tasks': [{'title': 'Tarea'}]})
+
+    async def test_async_matches_sync_view(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        response = await self.async_client.get('/api/account/async/me/', headers=headers)
+        sync = await self.async_client.get('/api/account/me/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync.content)
+
+    def test_tasks_not_loaded_when_omitted(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/account/me/', {'omit': 'tasks'})
+        self.assertNotIn('tasks', response.data)
+        self.assertFalse(any('"tasks_task"."title"' in query['sql'] for query in queries.captured_queries))
+
+
+"""
+Listado de usuarios (/api/account/users/): consultas constantes por página.
+"""
+class UserListQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', 'admin@example.com', 'password', is_staff=True)
+        Profile.objects.create(user=cls.admin, nombre='Admin')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_users(self, count, tasks=3):
+        for i in range(count):
+            user = User.objects.create_user(f'lista_{User.objects.count()}', 'lista@example.com', 'password')
+            Profile.objects.create(user=user, nombre=f'Lista {i}')
+            for j in range(tasks):
+                Task.objects.create(user=user, title=f'Tarea {j}', description='d')
+
+    def test_constant_queries(self):
+        self.add_users(2)
+        # COUNT del paginador, página de usuarios (perfil, conteo) y tareas recientes
+        with self.assertNumQueries(3):
+            self.client.get('/api/account/users/')
+        self.add_users(6)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/account/users/')
+        self.assertEqual(response.data['results'][0]['tasks_count'], 3)
+
+    def test_count_without_task_join(self):
+        self.add_users(2)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/account/users/')
+        count_sql = queries.captured_queries[0]['sql']
+        self.assertIn('COUNT', count_sql)
+        self.assertNotIn('tasks_task', count_sql)
+        self.assertNotIn('GROUP BY', queries.captured_queries[1]['sql'].split('FROM "auth_user"')[-1])
+
+    def test_count_without_stats_row(self):
+        self.add_users(1, tasks=2)
+        TaskStats.objects.all().delete()
+        response = self.client.get('/api/account/users/')
+        counts = {user['username']: user['tasks_count'] for user in response.data['results']}
+        self.assertEqual(counts, {'admin': 0, 'lista_1': 2})
+
+
+"""
+Lista negra de tokens de refresco en memoria (backend.revocation).
+"""
+@mock.patch('backend.revocation.REFRESH_INTERVAL', 0)
+class TokenRevocationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('token', 'token@example.com', 'password')
+
+    def setUp(self):
+        revoked_tokens.reload()
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)})
+
+    # Revocar en "otro proceso": fila en la base de datos sin pasar por el conjunto local
+    def blacklist(self, token, **kwargs):
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        return BlacklistedToken.objects.create(token=outstanding, **kwargs)
+
+    def test_blacklisted_token_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        self.blacklist(token)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_rows_committed_out_of_order(self):
+        first, late, last = (RefreshToken.for_user(self.user) for _ in range(3))
+        row = self.blacklist(first)
+        # Un id mayor confirmado antes que el id intermedio
+        self.blacklist(last, id=row.id + 2)
+        self.assertIn(last['jti'], revoked_tokens)
+        self.assertNotIn(late['jti'], revoked_tokens)
+
+        self.blacklist(late, id=row.id + 1)
+        self.assertIn(late['jti'], revoked_tokens)
+        self.assertEqual(self.refresh(late).status_code, 401)
+
+
+# Imagen PNG de prueba
+def make_png(color='red', size=(300, 200)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile('foto.png', buffer.getvalue(), content_type='image/png')
+
+
+"""
+Fotos de perfil: procesado en segundo plano, archivos compartidos por hash del
+contenido con referencias (StoredFile) y /media/ con caché inmutable.
+"""
+@mock.patch('backend.workers.BACKGROUND_EAGER', True)
+class ProfilePhotoTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = Profile._meta.get_field('foto').storage
+
+    def create_profile(self, username, photo):
+        user = User.objects.create_user(username, f'{username}@example.com', 'password')
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile.objects.create(user=user, nombre=username, foto=photo)
+        return Profile.objects.get(user=user)
+
+    def references(self, name):
+        return StoredFile.objects.filter(name=name).values_list('references', flat=True).first()
+
+    def test_photo_processed(self):
+        profile = self.create_profile('foto', make_png())
+        self.assertTrue(is_hashed_name(profile.foto.name))
+        self.assertEqual(set(profile.foto_variants), {'webp', '64', '128', '256'})
+        for name in [profile.foto.name, *profile.foto_variants.values()]:
+            self.assertTrue(self.storage.exists(name))
+            self.assertEqual(self.references(name), 1)
+        with Image.open(self.storage.path(profile.foto_variants['64'])) as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 64))
+
+    def test_exif_orientation_applied_and_removed(self):
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientación: girada 90°
+        Image.new('RGB', (300, 200), 'red').save(buffer, format='JPEG', exif=exif)
+        profile = self.create_profile('exif', SimpleUploadedFile('foto.jpg', buffer.getvalue(), content_type='image/jpeg'))
+        with Image.open(self.storage.path(profile.foto.name)) as original:
+            self.assertEqual((original.format, original.size), ('JPEG', (200, 300)))
+            self.assertFalse(original.getexif())
+
+    def test_other_formats_reencoded_as_jpeg(self):
+        buffer = io.BytesIO()
+        Image.new('P', (100, 100)).save(buffer, format='GIF')
+        profile = self.create_profile('gif', SimpleUploadedFile('foto.gif', buffer.getvalue(), content_type='image/gif'))
+        self.assertTrue(profile.foto.name.endswith('.jpg'))
+        self.assertEqual(set(profile.foto_variants), {'webp', '64', '128', '256'})
+
+    def test_photo_changed_while_processing(self):
+        real_process_photo = process_photo
+
+        # La foto cambia mientras se generan las variantes
+        def change_photo(storage, name):
+            Profile.objects.filter(foto=name).update(foto='')
+            return real_process_photo(storage, name)
+
+        with mock.patch('account.jobs.process_photo', side_effect=change_photo):
+            profile = self.create_profile('carrera', make_png('orange'))
+        self.assertEqual((profile.foto.name, profile.foto_variants), ('', {}))
+        # Archivos generados liberados (solo queda la subida, sin liberar)
+        self.assertFalse(self.storage.exists(f'{os.path.dirname(StoredFile.objects.get().name)}/variants'))
+
+    def test_variant_urls_in_api(self):
+        profile = self.create_profile('api', make_png('white'))
+        client = APIClient()
+        client.force_authenticate(profile.user)
+        variants = client.get('/api/account/me/').data['profile']['foto_variants']
+        self.assertEqual(set(variants), {'webp', '64', '128', '256'})
+        self.assertTrue(variants['64'].endswith(profile.foto_variants['64']))
+
+    def test_shared_files_deleted_with_last_reference(self):
+        first = self.create_profile('uno', make_png('blue'))
+        second = self.create_profile('dos', make_png('blue'))
+        self.assertEqual(first.foto.name, second.foto.name)
+        self.assertEqual(self.references(first.foto.name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(self.storage.exists(second.foto.name))
+        self.assertEqual(self.references(second.foto.name), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(self.storage.exists(second.foto.name))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_replaced_photo_released(self):
+        profile = self.create_profile('cambia', make_png('green'))
+        old_files = [profile.foto.name, *profile.foto_variants.values()]
+        profile.foto = make_png('yellow')
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        profile.refresh_from_db()
+        self.assertNotIn(profile.foto.name, old_files)
+        self.assertFalse(any(self.storage.exists(name) for name in old_files))
+        self.assertEqual(StoredFile.objects.count(), 1 + len(profile.foto_variants))
+
+    def test_replaced_photo_released_without_loaded_snapshot(self):
+        first = self.create_profile('mano', make_png('green'))
+        second = self.create_profile('parcial', make_png('red'))
+        old_files = [first.foto.name, *first.foto_variants.values(), second.foto.name, *second.foto_variants.values()]
+        # Perfil construido a mano (sin valores cargados) y perfil con .only()
+        by_hand = Profile(pk=first.pk, user_id=first.user_id, nombre='mano', foto=make_png('yellow'))
+        partial = Profile.objects.only('nombre').get(pk=second.pk)
+        partial.foto = make_png('black')
+        with self.captureOnCommitCallbacks(execute=True):
+            by_hand.save(update_fields=['nombre', 'foto'])
+            partial.save()
+        self.assertFalse(any(self.storage.exists(name) for name in old_files))
+        self.assertFalse(StoredFile.objects.filter(name__in=old_files).exists())
+        self.assertEqual(Profile.objects.get(pk=second.pk).nombre, 'parcial')
+
+        # Misma foto sin valores cargados: se conservan las variantes y las referencias
+        first.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile(pk=first.pk, user_id=first.user_id, nombre='otra vez', foto=first.foto.name).save(
+                update_fields=['nombre', 'foto'],
+            )
+        self.assertEqual(Profile.objects.get(pk=first.pk).foto_variants, first.foto_variants)
+        for name in [first.foto.name, *first.foto_variants.values()]:
+            self.assertEqual(self.references(name), 1)
+
+    def test_save_after_release_rewrites_file(self):
+        content = ContentFile(b'contenido')
+        name = self.storage.save('profiles/a.txt', content)
+        release_files([name], self.storage)
+        self.assertFalse(self.storage.exists(name))
+        # Mismo contenido guardado de nuevo: vuelve a escribirse y a contarse
+        self.assertEqual(self.storage.save('profiles/b.txt', ContentFile(b'contenido')), name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.references(name), 1)
+
+    def test_media_cache_headers(self):
+        profile = self.create_profile('media', make_png('purple'))
+        request = RequestFactory().get(f'/media/{profile.foto.name}')
+        response = serve_media(request, profile.foto.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        request = RequestFactory().get(f'/media/{profile.foto.name}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(serve_media(request, profile.foto.name).status_code, 304)
+
+
+"""
+Seeder masivo (seed_data --bulk): lotes con bulk_create, contadores
+recalculados y datos deterministas según la semilla.
+"""
+class BulkSeedTests(TestCase):
+
+    def seed(self, **options):
+        call_command('seed_data', bulk=True, seed=1, chunk_size=10, stdout=io.StringIO(), **options)
+
+    def test_users_tasks_and_stats(self):
+        self.seed(users=3, tasks=25, no_avatars=True)
+        self.assertEqual((User.objects.count(), Profile.objects.count(), Task.objects.count()), (3, 3, 25))
+        self.assertEqual(sum(TaskStats.objects.values_list('total', flat=True)), 25)
+        self.assertEqual(UserSearch.objects.count(), 3)
+
+    def test_tasks_deterministic(self):
+        self.seed(users=2, tasks=0, no_avatars=True)
+        user_ids = list(User.objects.values_list('id', flat=True))
+
+        def tasks():
+            return list(Task.objects.order_by('id').values_list('user_id', 'title', 'completed'))
+
+        bulk_seed_tasks(12, user_ids, seed=5, chunk_size=5)
+        first = tasks()
+        Task.objects.all().delete()
+        bulk_seed_tasks(12, user_ids, seed=5, chunk_size=5)
+        self.assertEqual(tasks(), first)
+
+    def test_local_avatars_referenced(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            self.seed(users=2, tasks=0)
+            names = list(Profile.objects.values_list('foto', flat=True))
+            self.assertTrue(all(names))
+            self.assertEqual(set(StoredFile.objects.values_list('name', flat=True)), set(names))
+
+
+"""
+Benchmark de la API (benchmark_api): métricas, comparación con la línea base
+y una ejecución reducida.
+"""
+class BenchmarkTests(TestCase):
+
+    def metrics(self, p95, queries, ok=True):
+        return {'p95_ms': p95, 'queries': queries, 'ok': ok}
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 95), 0.0)
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertEqual(percentile([1, 2, 3, 4], 100), 4)
+
+    def test_compare_with_baseline(self):
+        baseline = {'results': {'100': {
+            'me': self.metrics(10, 2), 'users': self.metrics(10, 3), 'token': self.metrics(10, 1),
+            'removed': self.metrics(10, 1),
+        }}}
+        current = {'results': {'100': {
+            'me': self.metrics(11.5, 2), 'users': self.metrics(13, 4), 'token': self.metrics(5, 1, ok=False),
+        }}}
+        regressions = compare_with_baseline(current, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(all(regression.startswith(('100/users', '100/token')) for regression in regressions))
+
+    # El comando crea las bases de prueba con las réplicas como espejos y las elimina aunque falle
+    def test_command_uses_test_databases(self):
+        # El comando silencia los tiempos por petición: restaurar para el resto de pruebas
+        timing = logging.getLogger('backend.timing')
+        self.addCleanup(timing.setLevel, timing.level)
+        with mock.patch('account.management.commands.benchmark_api.setup_databases', return_value='config') as setup, \
+                mock.patch('account.management.commands.benchmark_api.teardown_databases') as teardown, \
+                mock.patch('account.management.commands.benchmark_api.run_benchmark', side_effect=RuntimeError), \
+                mock.patch('account.management.commands.benchmark_api.setup_test_environment'), \
+                mock.patch('account.management.commands.benchmark_api.teardown_test_environment'), \
+                mock.patch.object(task_response_cache, 'enabled', True):
+            with self.assertRaises(RuntimeError):
+                call_command('benchmark_api', sizes='5', stdout=io.StringIO())
+        self.assertEqual(setup.call_args.kwargs['aliases'], {'default'})
+        teardown.assert_called_once_with('config', verbosity=0)
+
+    # Sin líneas de peticiones lentas (hash de contraseña en /api/token/)
+    @mock.patch('backend.middleware.SLOW_REQUEST_MS', float('inf'))
+    def test_small_run(self):
+        results = run_benchmark(
+            [5], iterations=2, token_iterations=1, scenarios={'me', 'task_list', 'task_list_cursor'}, log=lambda *args: None,
+        )
+        self.assertEqual(set(results['results']['5']), {'me', 'task_list', 'task_list_cursor'})
+        self.assertTrue(all(metrics['ok'] for metrics in results['results']['5'].values()))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'base.json')
+            save_results(results, path)
+            self.assertEqual(compare_with_baseline(results, load_results(path), tolerance=0), [])
+
+
+"""
+Tiempos por petición (backend.middleware.RequestTimingMiddleware): cabecera
+Server-Timing, conteo de consultas y registro de peticiones lentas.
+"""
+class RequestTimingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tiempos', 'tiempos@example.com', 'password')
+        Task.objects.create(user=cls.user, title='Tarea', description='d')
+
+    def setUp(self):
+        user_cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    # Métricas de la cabecera: {nombre: (duración, descripción)}
+    def server_timing(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            values = dict(param.split('=', 1) for param in params)
+            metrics[name] = (float(values['dur']), values.get('desc', '').strip('"'))
+        return metrics
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/account/me/')
+        metrics = self.server_timing(response)
+        self.assertEqual(set(metrics), {'db', 'view', 'render', 'total'})
+        self.assertEqual(metrics['db'][1], f'{len(queries.captured_queries)} queries')
+        self.assertGreater(len(queries.captured_queries), 0)
+        self.assertTrue(all(duration >= 0 for duration, _ in metrics.values()))
+        self.assertGreaterEqual(metrics['total'][0], metrics['db'][0])
+
+    @mock.patch('backend.middleware.SLOW_QUERIES', 2)
+    def test_counts_queries_and_keeps_slowest(self):
+        # perf_counter: inicio de la petición y (inicio, fin) de cada consulta
+        clock = [0.0, 0.0, 0.001, 1.0, 1.0005, 2.0, 2.003]
+        with mock.patch('backend.middleware.time.perf_counter', side_effect=clock):
+            timing = RequestTiming()
+            for sql in ('a', 'b', 'c'):
+                timing(lambda *args: None, sql, None, False, {})
+        self.assertEqual(timing.queries, 3)
+        self.assertAlmostEqual(timing.sql_time, 0.0045)
+        self.assertEqual([query['sql'] for query in timing.slowest_queries()], ['c', 'a'])
+
+    def test_slow_log_above_threshold(self):
+        with mock.patch('backend.middleware.SLOW_REQUEST_MS', 0), \
+                self.assertLogs('backend.timing.slow', 'WARNING') as logs:
+            self.client.get('/api/account/me/')
+        payload = json.loads(logs.records[0].getMessage())
+        self.assertEqual((payload['path'], payload['status']), ('/api/account/me/', 200))
+        self.assertEqual(len(payload['slow_queries']), min(payload['queries'], SLOW_QUERIES))
+
+        with mock.patch('backend.middleware.SLOW_REQUEST_MS', float('inf')), \
+                self.assertNoLogs('backend.timing.slow', 'WARNING'):
+            self.client.get('/api/account/me/')
+
+
+"""
+Pool de trabajos en segundo plano (backend.workers).
+"""
+class BackgroundWorkerTests(TestCase):
+
+    def test_runs_outside_request_thread(self):
+        future = workers.submit(lambda: threading.current_thread().name)
+        self.assertTrue(future.result(timeout=5).startswith('background'))
+
+    def test_errors_logged(self):
+        def fail():
+            raise ValueError('fallo')
+
+        with self.assertLogs('backend.workers', 'ERROR'):
+            self.assertIsNone(workers.submit(fail).result(timeout=5))
+
+    @mock.patch('backend.workers.BACKGROUND_EAGER', True)
+    def test_submitted_on_commit(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True):
+            workers.submit_on_commit(calls.append, 'hecho')
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['hecho'])
+
+
+"""
+Enrutamiento de lecturas a réplicas: el usuario de la ventana de lectura tras
+escritura es el autenticado, nunca el de un token sin verificar.
+"""
+@mock.patch('backend.routers.REPLICAS', ['replica'])
+@mock.patch.object(replica_health, 'is_healthy', return_value=True)
+# Fuera de la transacción de la prueba (dentro de una transacción se lee del primario)
+@mock.patch('backend.routers.connections', {'default': mock.Mock(in_atomic_block=False)})
+class ReplicaRoutingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('replica', 'replica@example.com', 'password')
+
+    def setUp(self):
+        sticky_users.clear()
+        self.factory = RequestFactory()
+        self.router = ReadReplicaRouter()
+
+    # Petición por el middleware: base de datos de lectura antes y después de autenticar
+    def route(self, method, token=None):
+        routes = []
+
+        def view(request):
+            routes.append(self.router.db_for_read(Task))
+            try:
+                CachedJWTAuthentication().authenticate(Request(request))
+            except (AuthenticationFailed, InvalidToken):
+                pass
+            routes.append(self.router.db_for_read(Task))
+            return HttpResponse()
+
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        ReplicaRoutingMiddleware(view)(getattr(self.factory, method)('/api/task/tasks/', **headers))
+        return routes
+
+    def test_read_waits_for_verified_token(self, healthy):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.route('get', token), [None, 'replica'])
+        self.assertEqual(self.route('get'), ['replica', 'replica'])
+
+    def test_write_marks_authenticated_user(self, healthy):
+        token = AccessToken.for_user(self.user)
+        self.route('post', token)
+        self.assertTrue(is_sticky(self.user.pk))
+        self.assertEqual(self.route('get', token), [None, None])
+
+    def test_forged_token_ignored(self, healthy):
+        other = User.objects.create_user('otro', 'otro@example.com', 'password')
+        # Payload de otro usuario con la firma del token original
+        header, _, signature = str(AccessToken.for_user(self.user)).split('.')
+        payload = str(AccessToken.for_user(other)).split('.')[1]
+        self.route('post', f'{header}.{payload}.{signature}')
+        self.assertFalse(is_sticky(other.pk))
+        self.assertFalse(is_sticky(self.user.pk))
+
+    def test_watermark_and_validator_reads_on_primary(self, healthy):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        # El alias 'replica' no existe en las pruebas: cualquier lectura en la réplica falla
+        for url in ('/api/task/tasks/changes/', '/api/task/tasks/', '/api/account/me/'):
+            self.assertEqual(client.get(url).status_code, 200)
+        with self.assertRaises(ConnectionDoesNotExist):
+            client.get('/api/task/tasks/stats/')
+
+    def test_replicas_not_migrated(self, healthy):
+        self.assertIs(self.router.allow_migrate('replica', 'tasks'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'tasks'))
+
+
+"""
+Autenticación JWT con caché del usuario (cached) y sin estado (stateless).
+"""
+class CachedAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cache', 'cache@example.com', 'password')
+        Profile.objects.create(user=cls.user, nombre='Caché')
+
+    def setUp(self):
+        user_cache.clear()
+        self.auth = CachedJWTAuthentication()
+
+    def test_request_copy_does_not_share_profile(self):
+        token = AccessToken.for_user(self.user)
+        first = self.auth.get_user(token)
+        first.profile.nombre = 'Cambiado'
+        with self.assertNumQueries(0):
+            second = self.auth.get_user(token)
+        self.assertEqual(second.profile.nombre, 'Caché')
+
+    def test_cache_key_namespaced(self):
+        self.auth.get_user(AccessToken.for_user(self.user))
+        self.assertIsNone(user_cache.get(self.user.pk))
+        self.assertEqual(user_cache.get(user_cache_key(self.user.pk)).pk, self.user.pk)
+        # Invalidación (señales de User / Profile) con la misma clave
+        invalidate_cached_user(self.user.pk)
+        self.assertIsNone(user_cache.get(user_cache_key(self.user.pk)))
+
+    def test_deactivated_user_rejected(self):
+        token = AccessToken.for_user(self.user)
+        self.auth.get_user(token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(token)
+
+    @mock.patch('backend.authentication.AUTH_USER_CACHE_MODE', 'stateless')
+    def test_stateless_checks_is_active_claim(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(token).username, 'cache')
+        token['is_active'] = False
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(token)
+        # Token emitido sin el claim
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(AccessToken.for_user(self.user))
+
+    async def test_async_authentication_uses_async_cache(self):
+        token = AccessToken.for_user(self.user)
+        cache = DjangoCacheBackend()
+        cache.clear()
+        loop_thread = threading.get_ident()
+        threads = []
+        # Llamadas síncronas a la caché compartida (Redis): fuera del hilo del bucle
+        def track(method):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return method(*args, **kwargs)
+            return wrapper
+        with mock.patch('backend.authentication.user_cache', cache), \
+                mock.patch.object(cache.cache, 'get', track(cache.cache.get)), \
+                mock.patch.object(cache.cache, 'set', track(cache.cache.set)):
+            first = await self.auth.aget_user(token)
+            second = await self.auth.aget_user(token)
+        self.assertEqual((first.pk, second.profile.nombre), (self.user.pk, 'Caché'))
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_refresh_reads_current_claims(self):
+        refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+        User.objects.filter(pk=self.user.pk).update(email='nuevo@example.com')
+        response = self.client.post('/api/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(AccessToken(response.data['access'])['email'], 'nuevo@example.com')
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post('/api/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 401)
+
+
+"""
+Detección de cambios del perfil (get_changed_fields) sin consultas extra.
+"""
+class ProfileChangeTrackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cambios', 'cambios@example.com', 'password')
+        cls.profile = Profile.objects.create(user=cls.user, nombre='Antes', foto_variants={'webp': 'a.webp'})
+
+    def test_in_place_json_change(self):
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.foto_variants['thumb'] = 'a_thumb.webp'
+        self.assertEqual(profile.get_changed_fields(), {'foto_variants'})
+        profile.save()
+        self.assertEqual(profile.get_changed_fields(), set())
+        profile.foto_variants['thumb'] = 'b_thumb.webp'
+        self.assertEqual(profile.get_changed_fields(), {'foto_variants'})
+
+    def test_save_does_not_load_deferred_fields(self):
+        profile = Profile.objects.only('nombre', 'user').get(pk=self.profile.pk)
+        profile.nombre = 'Después'
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT "account_profile"')])
+        self.assertIn('apellido', profile.get_deferred_fields())
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).nombre, 'Después')
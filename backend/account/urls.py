@@ -1,10 +1,13 @@
 from django.urls import path
 from django.urls import path
-from .views import RegisterView, UserListView, UserDetailView, CurrentUserViewToken
+from .async_views import current_user
+from .views import RegisterView, UserListView, UserDetailView, UserDeletionView, CurrentUserViewToken
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('users/', UserListView.as_view(), name='user-list'),
-    path('user/<int:pk>/', UserDetailView.as_view(), name='user-detail'),  # GET | PUT | DELETE
+    path('user/<int:pk>/', UserDetailView.as_view(), name='user-detail'),  # GET | PUT | DELETE (202, en segundo plano)
+    path('deletions/<int:pk>/', UserDeletionView.as_view(), name='user-deletion'),  # GET - progreso
     path('me/', CurrentUserViewToken.as_view(), name='current-user'),
+    path('async/me/', current_user, name='current-user-async'),  # GET (ASGI)
 ]
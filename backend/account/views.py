@@ -1,21 +1,44 @@
-from rest_framework import generics, permissions
+from django.conf import settings
 from django.contrib.auth.models import User
-from .serializers import RegisterProfileSerializer, UpdateProfileSerializer, UserProfileDetailSerializer
-from rest_framework import generics, permissions, filters
+from django.db.models import Prefetch
+from tasks.models import Task
+from .search import UserSearchFilter
+from .deletion import request_user_deletion
+from .models import UserDeletion
+from .serializers import RegisterProfileSerializer, UpdateProfileSerializer, UserProfileDetailSerializer, UserListSerializer, UserDeletionSerializer
+from rest_framework import generics, permissions, status
 from rest_framework.exceptions import NotFound, AuthenticationFailed
+from backend.conditional import ConditionalGetMixin
+from backend.sparse import SparseFieldsetMixin
 from backend.permissions import IsOwnerOrAdmin
+from tasks.conditional import latest
+from tasks.stats import get_task_state, tasks_count_annotation
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
 
 # Obtener user por token
-class CurrentUserViewToken(APIView):
+class CurrentUserViewToken(SparseFieldsetMixin, ConditionalGetMixin, APIView):
     
     # Datos
     permission_classes = [permissions.IsAuthenticated]
 
-    # Get response
+    # Validadores: datos del usuario, fecha del perfil y estado de sus tareas (una fila)
+    def get_validators(self, request, *args, **kwargs):
+        state = get_task_state(request.user.pk, 'username', 'email', 'profile__updated_at')
+        # ? Usuario inexistente
+        if state is None:
+            return None
+        return tuple(state.values()), latest(
+            state['tasks_changed'], state['tasks_updated'], state['profile__updated_at'],
+        )
+
+    # Get response (304 si el perfil y las tareas no cambiaron)
     def get(self, request):
+        return self.conditional_response(self.get_profile, request)
+
+    def get_profile(self, request):
         
         try: 
             # ? El token no está presente o no es válido
@@ -26,8 +49,8 @@ class CurrentUserViewToken(APIView):
             if request.user != request.user: 
                 raise AuthenticationFailed("El usuario no está autenticado correctamente.")
             
-            # Si las verificaciones pasan, devuelve la información del perfil
-            serializer = UserProfileDetailSerializer(request.user)
+            # Si las verificaciones pasan, devuelve la información del perfil (?fields= / ?omit=)
+            serializer = UserProfileDetailSerializer(request.user, context=self.get_sparse_context())
             return Response(serializer.data)
         
         except AuthenticationFailed:
@@ -41,25 +64,58 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterProfileSerializer
     permission_classes = [permissions.AllowAny]  # Registros sin login
 
+# Columnas de las tareas recientes (TaskSummarySerializer, orden y usuario del prefetch)
+SUMMARY_COLUMNS = ('id', 'user', 'title', 'completed', 'created_at')
+
+
 # Listar Usuarios 
-class UserListView(generics.ListAPIView):
+class UserListView(SparseFieldsetMixin, generics.ListAPIView):
     queryset = User.objects.all().order_by('-date_joined')
-    serializer_class = UserProfileDetailSerializer
+    serializer_class = UserListSerializer
     permission_classes = [permissions.IsAdminUser]  # Solo admins pueden listar
     
-    # Filtros de búsqueda
-    filter_backends = [filters.SearchFilter]
-    search_fields = [
-        'username', 
-        'email', 
-        'profile__nombre', # 'nombre' del perfil
-        'profile__apellido', # 'apellido' del perfil
-        'profile__telefono' # 'telefono' del perfil
-    ]
+    # Búsqueda indexada en usuario, email, nombre, apellido y teléfono (ver UserSearch)
+    filter_backends = [UserSearchFilter]
+
+    # ? Se pidieron las tareas completas (?include=tasks)
+    def include_tasks(self):
+        include = 'tasks' in self.request.query_params.get('include', '').split(',')
+        return include and self.is_field_requested('tasks')
+
+    # Consultas constantes: perfil en JOIN, conteo en subconsulta y tareas recientes en un prefetch
+    # (solo lo que pide ?fields= / ?omit=)
+    def get_queryset(self):
+        recent = settings.USER_LIST_RECENT_TASKS
+        queryset = User.objects.order_by('-date_joined')
+        # ? Perfil
+        if self.is_field_requested('profile'):
+            queryset = queryset.select_related('profile')
+        # ? Número de tareas
+        if self.is_field_requested('tasks_count'):
+            queryset = queryset.annotate(tasks_count=tasks_count_annotation())
+        # ? Tareas recientes
+        if self.is_field_requested('recent_tasks'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'tasks',
+                # Ventana limitada por usuario (ROW_NUMBER() OVER PARTITION BY user)
+                queryset=Task.objects.only(*SUMMARY_COLUMNS).order_by('-created_at', '-id')[:recent],
+                to_attr='recent_tasks',
+            ))
+        # ? Tareas completas solo bajo petición
+        if self.include_tasks():
+            queryset = queryset.prefetch_related(
+                Prefetch('tasks', queryset=Task.objects.order_by('-created_at', '-id'))
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_tasks'] = self.include_tasks()
+        return context
 
 
 # Detalles, Actualizar y Eliminar
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     
     # Permisos
     queryset = User.objects.all()
@@ -75,6 +131,21 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         except User.DoesNotExist:
             raise NotFound("Este usuario no existe o no fue encontrado.")
 
-    # ! Eliminar usuario y su perfil (CASCADE)
-    def perform_destroy(self, instance):
-        instance.delete()
\ No newline at end of file
+    # ! Eliminar usuario en segundo plano: se desactiva ya y responde 202 con el progreso
+    def destroy(self, request, *args, **kwargs):
+        deletion = request_user_deletion(self.get_object(), requested_by=request.user)
+        serializer = UserDeletionSerializer(deletion)
+        location = reverse('user-deletion', kwargs={'pk': deletion.pk}, request=request)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+# Progreso de la eliminación de un usuario (admins o quien la pidió)
+class UserDeletionView(generics.RetrieveAPIView):
+    serializer_class = UserDeletionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # ? Admin: todas las eliminaciones
+        if self.request.user.is_staff:
+            return UserDeletion.objects.all()
+        return UserDeletion.objects.filter(requested_by_id=self.request.user.pk)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import functools
+import json
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .authentication import CachedJWTAuthentication
+
+# Autenticación compartida con las vistas de DRF
+authentication = CachedJWTAuthentication()
+
+
+# Respuesta JSON (listas y diccionarios) con el renderer de DRF: mismo cuerpo que las vistas síncronas
+def json_response(data, status=status.HTTP_200_OK):
+    renderer = JSONRenderer()
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+# Cuerpo JSON de la petición
+def read_json(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ParseError('JSON inválido.')
+    # ? Se esperaba un objeto
+    if not isinstance(data, dict):
+        raise ParseError('Se esperaba un objeto JSON.')
+    return data
+
+
+"""
+Decorador de vistas asíncronas de la API.
+
+- Las vistas de DRF son síncronas; estas se ejecutan directamente en el bucle
+  de eventos del servidor ASGI (uvicorn), con el ORM async (aget, acreate,
+  async for), sin ocupar un hilo por petición.
+- Autentica con JWT (misma caché de usuarios que DRF) y exige usuario.
+- Convierte las excepciones de DRF en respuestas JSON con el mismo formato
+  ({"detail": ...}).
+"""
+def async_api_view(methods):
+    allowed = {method.upper() for method in methods}
+
+    def decorator(view):
+        @csrf_exempt  # Autenticación por token, sin sesión
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                # ? Método no permitido
+                if request.method not in allowed:
+                    raise MethodNotAllowed(request.method)
+
+                try:
+                    result = await authentication.aauthenticate(request)
+                except TokenError as exc:
+                    raise InvalidToken(exc.args[0])
+                # ? Sin token
+                if result is None:
+                    raise NotAuthenticated()
+                request.user, request.auth = result
+
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                response = json_response(
+                    exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail},
+                    status=exc.status_code,
+                )
+                # ? Cabecera de autenticación (igual que DRF)
+                if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                    response['WWW-Authenticate'] = authentication.authenticate_header(request)
+                if isinstance(exc, MethodNotAllowed):
+                    response['Allow'] = ', '.join(sorted(allowed))
+                return response
+
+        return wrapper
+
+    return decorator
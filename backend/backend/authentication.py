@@ -0,0 +1,161 @@
+import copy
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .cache import build_cache_backend
+from .routers import aset_routing_user, set_routing_user
+
+# Configuración de la caché de usuarios autenticados
+AUTH_USER_CACHE = getattr(settings, 'AUTH_USER_CACHE', {})
+# Modos: 'cached' (caché + base de datos), 'stateless' (solo token), 'database' (sin caché)
+AUTH_USER_CACHE_MODE = AUTH_USER_CACHE.get('MODE', 'cached')
+
+# Caché global de usuarios (auth:user:<user_id> -> User con profile precargado)
+user_cache = build_cache_backend(AUTH_USER_CACHE)
+
+
+# Clave del usuario en la caché (con prefijo: la caché puede ser compartida, p. ej. Redis)
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+# Invalidar el usuario en caché (señales de User / Profile): ahora y al confirmar
+# (una petición concurrente puede volver a guardar la versión anterior antes del COMMIT)
+def invalidate_cached_user(user_id, using=None):
+    key = user_cache_key(user_id)
+    user_cache.delete(key)
+    transaction.on_commit(lambda: user_cache.delete(key), using=using)
+
+
+"""
+Autenticación JWT con caché del usuario resuelto.
+
+- cached: el User (con su profile) se guarda en una caché LRU/TTL por id; las
+  peticiones siguientes no consultan la base de datos. Cada petición recibe
+  una copia profunda (usuario y perfil) para no compartir estado entre hilos.
+- stateless: construye un User sin consultar, con los claims del token
+  (username, email, is_staff, is_superuser, is_active). Los cambios del
+  usuario se ven al renovar el token (los claims se leen de nuevo).
+- database: comportamiento original de simplejwt.
+"""
+class CachedJWTAuthentication(JWTAuthentication):
+
+    # Usuario verificado para el enrutamiento a réplicas (backend.routers)
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            set_routing_user(result[0].pk)
+        return result
+
+    def get_user(self, validated_token):
+        # ? Sin caché
+        if AUTH_USER_CACHE_MODE == 'database':
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # ? Usuario a partir del token
+        if AUTH_USER_CACHE_MODE == 'stateless':
+            return self.build_stateless_user(user_id, validated_token)
+
+        user = user_cache.get(user_cache_key(user_id))
+        # ? No está en caché, consultar con el perfil
+        if user is None:
+            try:
+                user = (
+                    self.user_model.objects
+                    .select_related('profile')
+                    .get(**{api_settings.USER_ID_FIELD: user_id})
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_cache_key(user_id), user, ttl=user_cache.ttl)
+
+        return self.check_user(user, validated_token)
+
+    """
+    Autenticación para vistas asíncronas (ORM async, sin bloquear el bucle).
+
+    - Devuelve (user, token) o None si la petición no trae token.
+    - El token se valida en memoria; solo consulta la base de datos si el
+      usuario no está en caché.
+    - La caché de usuarios y la ventana de lectura tras escritura se leen con
+      su API async (aget / aset): Redis no bloquea el bucle de eventos.
+    """
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = await self.aget_user(validated_token)
+        await aset_routing_user(user.pk)
+        return user, validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # ? Usuario a partir del token
+        if AUTH_USER_CACHE_MODE == 'stateless':
+            return self.build_stateless_user(user_id, validated_token)
+
+        # ? Con caché
+        user = await user_cache.aget(user_cache_key(user_id)) if AUTH_USER_CACHE_MODE == 'cached' else None
+        if user is None:
+            try:
+                user = await (
+                    self.user_model.objects
+                    .select_related('profile')
+                    .aget(**{api_settings.USER_ID_FIELD: user_id})
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if AUTH_USER_CACHE_MODE == 'cached':
+                await user_cache.aset(user_cache_key(user_id), user, ttl=user_cache.ttl)
+
+        return self.check_user(user, validated_token)
+
+    # Copia por petición y comprobaciones de simplejwt (activo, contraseña cambiada)
+    def check_user(self, user, validated_token):
+        user = copy.deepcopy(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    # User ligero (sin guardar) construido con los claims del token
+    def build_stateless_user(self, user_id, validated_token):
+        # ? Usuario inactivo (o token emitido sin el claim)
+        if not validated_token.get('is_active', False):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        user = get_user_model()(
+            **{api_settings.USER_ID_FIELD: user_id},
+            username=validated_token.get('username', ''),
+            email=validated_token.get('email', ''),
+            is_staff=validated_token.get('is_staff', False),
+            is_superuser=validated_token.get('is_superuser', False),
+            is_active=True,
+        )
+        # Se comporta como un registro ya existente (relaciones, comparaciones)
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
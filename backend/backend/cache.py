@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+"""
+Caché en memoria local (por proceso) con política LRU y expiración (TTL).
+
+- Al superar max_entries se descarta la entrada usada hace más tiempo.
+- ttl=None en set() significa que la entrada no expira (solo LRU).
+- Es segura entre hilos, pero cada proceso tiene su propia copia.
+- aget / aset / adelete (vistas async): operaciones en memoria, no bloquean el
+  bucle de eventos.
+"""
+class LocMemLRUCache:
+
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            # ? No existe
+            if item is None:
+                return default
+            value, expires_at = item
+            # ? Expiró
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            # Marcar como usada recientemente
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            # ? Se superó el límite, descartar las menos usadas
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    async def aget(self, key, default=None):
+        return self.get(key, default)
+
+    async def aset(self, key, value, ttl=None):
+        self.set(key, value, ttl)
+
+    async def adelete(self, key):
+        self.delete(key)
+
+    def __len__(self):
+        return len(self._data)
+
+
+"""
+Adaptador del framework de caché de Django con la misma interfaz.
+
+- Usa un alias de CACHES (Redis, Memcached...), compartido entre procesos.
+- aget / aset / adelete usan la API async de Django (la red no bloquea el
+  bucle de eventos).
+"""
+class DjangoCacheBackend:
+
+    def __init__(self, alias='default', ttl=60):
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def set(self, key, value, ttl=None):
+        # En Django timeout=None significa que no expira
+        self.cache.set(key, value, timeout=ttl)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    async def aget(self, key, default=None):
+        return await self.cache.aget(key, default)
+
+    async def aset(self, key, value, ttl=None):
+        await self.cache.aset(key, value, timeout=ttl)
+
+    async def adelete(self, key):
+        await self.cache.adelete(key)
+
+
+# Backends disponibles
+CACHE_BACKENDS = {
+    'locmem': LocMemLRUCache,
+    'django': DjangoCacheBackend,
+}
+
+
+"""
+Construye un backend de caché a partir de un diccionario de configuración.
+
+- BACKEND: 'locmem' (por defecto) o 'django'.
+- TTL: segundos de vida de las entradas.
+- MAX_ENTRIES: límite de entradas (solo 'locmem').
+- ALIAS: alias de CACHES (solo 'django').
+"""
+def build_cache_backend(config):
+    backend = config.get('BACKEND', 'locmem')
+    ttl = config.get('TTL', 60)
+    # ? Backend desconocido
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Backend de caché desconocido: {backend}")
+    if backend == 'django':
+        return DjangoCacheBackend(alias=config.get('ALIAS', 'default'), ttl=ttl)
+    return LocMemLRUCache(max_entries=config.get('MAX_ENTRIES', 10000), ttl=ttl)
@@ -0,0 +1,56 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .routers import read_from_primary
+
+
+"""
+Mixin de peticiones condicionales (ETag / Last-Modified) para vistas de DRF.
+
+- La vista define get_validators(request, *args, **kwargs) y devuelve
+  (partes, last_modified): partes es una tupla con el estado de los datos
+  (contadores, fechas) leída con una consulta barata; None desactiva el modo
+  condicional para la petición.
+- El ETag (débil) combina las partes con la ruta, los parámetros y el formato
+  de la respuesta, así cada página o filtro tiene el suyo.
+- Con If-None-Match / If-Modified-Since vigentes responde 304 sin cuerpo,
+  antes de consultar y serializar los datos (412 con If-Match fallido).
+- Validadores y cuerpo se leen del primario (backend.routers): con una réplica
+  atrasada el ETag no correspondería al cuerpo.
+"""
+class ConditionalGetMixin:
+
+    def get_validators(self, request, *args, **kwargs):
+        return None
+
+    def build_etag(self, request, parts):
+        media_type = getattr(request, 'accepted_media_type', '')
+        raw = f'{parts}|{request.get_full_path()}|{media_type}'
+        return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        read_from_primary()
+        validators = self.get_validators(request, *args, **kwargs)
+        # ? Sin validadores
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        parts, last_modified = validators
+        etag = self.build_etag(request, parts)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        # ? El cliente ya tiene esta versión
+        conditional = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if conditional is not None:
+            conditional['ETag'] = etag
+            return conditional
+
+        response = handler(request, *args, **kwargs)
+        # ? Solo respuestas correctas
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # El navegador guarda la respuesta pero la revalida en cada petición
+            response['Cache-Control'] = 'private, no-cache'
+        return response
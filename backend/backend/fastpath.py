@@ -0,0 +1,96 @@
+from operator import attrgetter
+from django.db import models
+from rest_framework import serializers
+
+# Conversiones equivalentes a to_representation de los campos simples de DRF
+FAST_CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+    serializers.BooleanField: bool,
+}
+
+
+"""
+Plan de lectura rápida de un serializer (lista de filas -> lista de dicts).
+
+- Se compila una vez por serializer: por cada campo legible, la columna, el
+  getter y el conversor (int / str / bool, o el to_representation del campo).
+- Mismo resultado que Serializer.to_representation (orden de claves, None sin
+  convertir) sin get_attribute, SkipField ni la comprobación de PKOnlyObject
+  por campo y fila.
+- Solo para serializers planos: cada campo lee una columna del modelo, sin
+  relaciones, anidados, SerializerMethodField ni to_representation propio.
+  Si no, supported es False y se usa el camino normal.
+"""
+class FastReadPlan:
+
+    def __init__(self, serializer, model):
+        self.supported = False
+        self.columns = []
+        self.spec = []
+
+        # ? El serializer cambia la representación
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            return
+
+        model_fields = {field.name: field for field in model._meta.concrete_fields}
+        for field in serializer._readable_fields:
+            model_field = model_fields.get(field.source)
+            # ? Campo que no es una columna propia
+            if model_field is None or model_field.is_relation:
+                return
+            convert = FAST_CONVERTERS.get(type(field), field.to_representation)
+            self.columns.append(field.source)
+            self.spec.append((field.field_name, attrgetter(field.source), convert, model_field.null))
+        self.supported = True
+
+    # Filas como tuplas con nombre (sin instancias del modelo), más columnas extra (orden, cursor)
+    def values(self, queryset, extra=()):
+        columns = list(dict.fromkeys([*self.columns, *extra]))
+        return queryset.values_list(*columns, named=True)
+
+    # Filas (instancias o tuplas con nombre) -> lista de dicts
+    def represent(self, rows):
+        spec = self.spec
+        # ? Sin columnas que admitan NULL
+        if not any(nullable for *_, nullable in spec):
+            return [{name: convert(get(row)) for name, get, convert, _ in spec} for row in rows]
+
+        results = []
+        for row in rows:
+            item = {}
+            for name, get, convert, _ in spec:
+                value = get(row)
+                item[name] = None if value is None else convert(value)
+            results.append(item)
+        return results
+
+
+"""
+ListSerializer con la lectura rápida (Meta.list_serializer_class).
+
+- QuerySet o manager sin resultados cargados: values_list() con las columnas
+  del plan, sin crear instancias (tareas anidadas del usuario).
+- Lista ya cargada (página, prefetch, tuplas de values_list): getters y
+  conversores del plan.
+- Serializers no admitidos por el plan: to_representation de DRF.
+"""
+class FastListSerializer(serializers.ListSerializer):
+
+    def get_fast_plan(self):
+        # Se compila con los campos ya filtrados (?fields= / ?omit=)
+        if not hasattr(self, '_fast_plan'):
+            self._fast_plan = FastReadPlan(self.child, self.child.Meta.model)
+        return self._fast_plan
+
+    def to_representation(self, data):
+        plan = self.get_fast_plan()
+        # ? Serializer no admitido
+        if not plan.supported:
+            return super().to_representation(data)
+
+        rows = data.all() if isinstance(data, models.manager.BaseManager) else data
+        # ? Consulta sin evaluar (ni prefetch)
+        if isinstance(rows, models.QuerySet) and rows._result_cache is None:
+            rows = plan.values(rows)
+        return plan.represent(rows)
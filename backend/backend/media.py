@@ -0,0 +1,75 @@
+import mimetypes
+import os
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from .storage import is_hashed_name
+
+# Configuración
+MEDIA_SERVING = getattr(settings, 'MEDIA_SERVING', {})
+MODE = MEDIA_SERVING.get('MODE', 'django')
+INTERNAL_URL = MEDIA_SERVING.get('INTERNAL_URL', '/protected-media/')
+# Caché de archivos direccionados por contenido (1 año, no cambian nunca)
+IMMUTABLE_MAX_AGE = MEDIA_SERVING.get('IMMUTABLE_MAX_AGE', 31536000)
+# Caché del resto de archivos (nombres antiguos, pueden reescribirse)
+MAX_AGE = MEDIA_SERVING.get('MAX_AGE', 3600)
+
+
+# Cabeceras de caché según el nombre
+def cache_control(path):
+    # ? Nombre por hash del contenido
+    if is_hashed_name(path):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={MAX_AGE}'
+
+
+"""
+Sirve los archivos de MEDIA_ROOT (fotos de perfil y variantes).
+
+- MODE 'django': FileResponse, el servidor usa sendfile si puede
+  (wsgi.file_wrapper).
+- MODE 'nginx': X-Accel-Redirect a INTERNAL_URL, nginx envía el archivo.
+- MODE 'apache': X-Sendfile con la ruta absoluta (mod_xsendfile).
+- ETag / Last-Modified: 304 sin abrir el archivo. Los nombres por hash se
+  cachean como inmutables.
+"""
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404('Archivo no encontrado.')
+    # ? No existe o es una carpeta
+    if not os.path.isfile(full_path):
+        raise Http404('Archivo no encontrado.')
+
+    stat = os.stat(full_path)
+    etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control(path),
+    }
+
+    # ? El cliente ya tiene el archivo
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        # Servidor web
+        if MODE == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = INTERNAL_URL.rstrip('/') + '/' + path.lstrip('/')
+        elif MODE == 'apache':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        # Django
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,248 @@
+import heapq
+import json
+import logging
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from .routers import RoutingState, current_routing, mark_sticky
+
+logger = logging.getLogger('backend.timing')
+slow_logger = logging.getLogger('backend.timing.slow')
+
+# Configuración
+REQUEST_TIMING = getattr(settings, 'REQUEST_TIMING', {})
+SLOW_REQUEST_MS = REQUEST_TIMING.get('SLOW_REQUEST_MS', 500)
+SLOW_QUERIES = REQUEST_TIMING.get('SLOW_QUERIES', 5)
+LOG_REQUESTS = REQUEST_TIMING.get('LOG_REQUESTS', False)
+
+
+"""
+Medición de una petición.
+
+- Actúa como execute_wrapper de las conexiones: cuenta consultas, suma el
+  tiempo de SQL y guarda solo las N consultas más lentas (heap de tamaño N).
+"""
+class RequestTiming:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self._slowest = []
+        self._sequence = 0
+
+    # execute_wrapper de Django
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+            self._sequence += 1
+            item = (duration, self._sequence, sql)
+            # Mantener las N más lentas
+            if len(self._slowest) < SLOW_QUERIES:
+                heapq.heappush(self._slowest, item)
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest_queries(self):
+        return [
+            {'ms': round(duration * 1000, 2), 'sql': sql}
+            for duration, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    # Tiempos en milisegundos
+    def durations(self):
+        finished = time.perf_counter()
+        view_started = self.view_started or self.started
+        view_finished = self.view_finished or finished
+        render = (self.render_finished - view_finished) if self.render_finished else 0.0
+        return {
+            'total': (finished - self.started) * 1000,
+            'db': self.sql_time * 1000,
+            'view': (view_finished - view_started) * 1000,
+            'render': render * 1000,
+        }
+
+
+# Medición de la petición en curso (se propaga a los hilos de sync_to_async)
+current_timing = ContextVar('current_timing', default=None)
+
+
+# execute_wrapper permanente de cada conexión: mide si hay una petición en curso
+def _timing_wrapper(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+# Instalar el wrapper en cada conexión nueva (cualquier alias, cualquier hilo)
+def install_timing_wrapper(sender, connection, **kwargs):
+    if _timing_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timing_wrapper)
+
+
+connection_created.connect(install_timing_wrapper)
+
+
+"""
+Middleware de instrumentación por petición.
+
+- Mide número de consultas, tiempo de SQL, tiempo de la vista y de render.
+- Los agrega en la cabecera Server-Timing (visible en las DevTools).
+- Si supera SLOW_REQUEST_MS escribe una línea JSON con las consultas más
+  lentas (backend.timing.slow, WARNING). La línea de cada petición (backend.timing,
+  INFO) solo con LOG_REQUESTS=True y el logger en INFO.
+"""
+class RequestTimingMiddleware:
+    # Compatible con WSGI y ASGI (no fuerza las vistas async a un hilo)
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Conexiones ya abiertas en este hilo (antes de cargar el middleware)
+        for connection in connections.all(initialized_only=True):
+            install_timing_wrapper(None, connection)
+        # ? Cadena asíncrona (ASGI)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # ? Cadena asíncrona
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timing = RequestTiming()
+        request._timing = timing
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        request._timing = timing
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    # Cabecera Server-Timing y registro
+    def finish(self, request, response, timing):
+        durations = timing.durations()
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={durations["db"]:.1f};desc="{timing.queries} queries"',
+            f'view;dur={durations["view"]:.1f}',
+            f'render;dur={durations["render"]:.1f}',
+            f'total;dur={durations["total"]:.1f}',
+        ])
+        self.log(request, response, timing, durations)
+        return response
+
+    # Inicio de la vista
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing.view_started = time.perf_counter()
+
+    # Fin de la vista, inicio del render (respuestas de DRF / plantillas)
+    def process_template_response(self, request, response):
+        timing = request._timing
+        timing.view_finished = time.perf_counter()
+        response.add_post_render_callback(lambda rendered: self._render_finished(timing))
+        return response
+
+    def _render_finished(self, timing):
+        timing.render_finished = time.perf_counter()
+
+    # Registro estructurado
+    def log(self, request, response, timing, durations):
+        slow = durations['total'] >= SLOW_REQUEST_MS
+        log_request = LOG_REQUESTS and logger.isEnabledFor(logging.INFO)
+        # ? Nada que registrar
+        if not log_request and not slow:
+            return
+
+        payload = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{f'{name}_ms': round(value, 2) for name, value in durations.items()},
+        }
+        if log_request:
+            logger.info(json.dumps(payload))
+        if slow:
+            slow_logger.warning(json.dumps({**payload, 'slow_queries': timing.slowest_queries()}))
+
+
+"""
+Middleware de enrutamiento de lecturas a réplicas (backend.routers).
+
+- GET / HEAD / OPTIONS leen de una réplica, salvo que el usuario autenticado
+  haya escrito en los últimos segundos (lectura tras escritura).
+- Con cabecera Authorization las lecturas van al primario hasta que la
+  autenticación verifica el token (set_routing_user); el id del usuario nunca
+  se toma de un token sin verificar.
+- El resto de métodos usa solo el primario y abre esa ventana para el usuario.
+"""
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # ? Cadena asíncrona (ASGI)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    # Estado de la petición
+    def routing_state(self, request):
+        return RoutingState(
+            request.method in self.READ_METHODS,
+            authenticating='HTTP_AUTHORIZATION' in request.META,
+        )
+
+    def __call__(self, request):
+        # ? Cadena asíncrona
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = self.routing_state(request)
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        self.finish(state, request)
+        return response
+
+    async def __acall__(self, request):
+        state = self.routing_state(request)
+        token = current_routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        self.finish(state, request)
+        return response
+
+    # ? Petición de escritura: el usuario lee del primario durante la ventana
+    def finish(self, state, request):
+        if request.method not in self.READ_METHODS:
+            mark_sticky(state.user_id)
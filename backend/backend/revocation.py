@@ -0,0 +1,100 @@
+import threading
+import time
+from django.conf import settings
+from django.db.models import Q
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# Configuración del filtro de tokens revocados
+TOKEN_REVOCATION = getattr(settings, 'TOKEN_REVOCATION', {})
+# Segundos entre lecturas incrementales de la lista negra
+REFRESH_INTERVAL = TOKEN_REVOCATION.get('REFRESH_INTERVAL', 5)
+# Segundos entre recargas completas (descarta los tokens ya podados)
+FULL_RELOAD_INTERVAL = TOKEN_REVOCATION.get('FULL_RELOAD_INTERVAL', 3600)
+# Segundos que se vuelve a buscar un id saltado (transacción sin confirmar)
+GAP_TIMEOUT = TOKEN_REVOCATION.get('GAP_TIMEOUT', 60)
+# Ids saltados como máximo, con más se recarga todo
+MAX_GAPS = TOKEN_REVOCATION.get('MAX_GAPS', 1000)
+
+
+"""
+Conjunto en memoria de JTIs revocados (lista negra de simplejwt).
+
+- Búsqueda en un frozenset sin consultar la base de datos. Cada actualización
+  crea un conjunto nuevo y lo sustituye: las lecturas no usan el lock.
+- Se actualiza de forma incremental (filas con id mayor al último leído) como
+  máximo cada REFRESH_INTERVAL segundos.
+- Los ids no se confirman en orden: un id menor al último leído que todavía no
+  existe (transacción concurrente sin confirmar) se vuelve a buscar en cada
+  lectura durante GAP_TIMEOUT segundos.
+- Un token revocado en otro proceso se detecta en a lo sumo REFRESH_INTERVAL
+  segundos; con REFRESH_INTERVAL = 0 se consulta en cada verificación.
+"""
+class RevokedTokenSet:
+
+    def __init__(self):
+        self._jtis = frozenset()
+        self._last_id = 0
+        self._gaps = {}
+        self._refreshed_at = None
+        self._reloaded_at = None
+        self._lock = threading.Lock()
+
+    # Recarga completa
+    def reload(self):
+        rows = list(BlacklistedToken.objects.order_by('id').values_list('id', 'token__jti'))
+        with self._lock:
+            self._jtis = frozenset(jti for _, jti in rows)
+            self._last_id = rows[-1][0] if rows else 0
+            self._gaps = {}
+            self._refreshed_at = self._reloaded_at = time.monotonic()
+
+    # Lectura incremental de los nuevos tokens revocados (y de los ids saltados)
+    def refresh(self):
+        now = time.monotonic()
+        # ? Nunca se cargó o toca recarga completa
+        if self._reloaded_at is None or now - self._reloaded_at >= FULL_RELOAD_INTERVAL:
+            return self.reload()
+        # ? Todavía no toca
+        if now - self._refreshed_at < REFRESH_INTERVAL:
+            return
+
+        with self._lock:
+            last_id, gaps = self._last_id, dict(self._gaps)
+        rows = list(
+            BlacklistedToken.objects.filter(Q(id__gt=last_id) | Q(id__in=list(gaps)))
+            .order_by('id').values_list('id', 'token__jti')
+        )
+
+        found = {row_id for row_id, _ in rows}
+        new_last_id = max([last_id, *found])
+        # Ids saltados: los que siguen sin aparecer y los nuevos huecos
+        gaps = {row_id: seen for row_id, seen in gaps.items() if row_id not in found and now - seen < GAP_TIMEOUT}
+        for row_id in range(last_id + 1, new_last_id):
+            if row_id not in found:
+                gaps[row_id] = now
+        # ? Demasiados huecos
+        if len(gaps) > MAX_GAPS:
+            return self.reload()
+
+        with self._lock:
+            if rows:
+                self._jtis = self._jtis | {jti for _, jti in rows}
+            self._last_id = max(self._last_id, new_last_id)
+            self._gaps = gaps
+            self._refreshed_at = now
+
+    # Marcar como revocado en este proceso (blacklist local)
+    def add(self, jti):
+        with self._lock:
+            self._jtis = self._jtis | {jti}
+
+    def __contains__(self, jti):
+        self.refresh()
+        return jti in self._jtis
+
+    def __len__(self):
+        return len(self._jtis)
+
+
+# Instancia global
+revoked_tokens = RevokedTokenSet()
@@ -0,0 +1,210 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from .cache import build_cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+DATABASE_ROUTING = getattr(settings, 'DATABASE_ROUTING', {})
+REPLICAS = list(getattr(settings, 'DATABASE_REPLICAS', []))
+# Apps cuyas lecturas pueden ir a una réplica (el resto, p. ej. la lista negra de tokens, al primario)
+REPLICA_APPS = set(DATABASE_ROUTING.get('APPS', ('tasks', 'account', 'auth')))
+# Segundos en los que un usuario lee del primario después de escribir
+STICKY_SECONDS = DATABASE_ROUTING.get('STICKY_SECONDS', 5)
+# Segundos entre comprobaciones de salud de cada réplica
+HEALTH_CHECK_INTERVAL = DATABASE_ROUTING.get('HEALTH_CHECK_INTERVAL', 10)
+# Retraso máximo de replicación aceptado (segundos, PostgreSQL)
+MAX_REPLICATION_LAG = DATABASE_ROUTING.get('MAX_LAG', 5)
+
+# Usuarios que escribieron hace poco (misma configuración de caché que el resto: BACKEND, ALIAS)
+sticky_users = build_cache_backend({'TTL': STICKY_SECONDS, **DATABASE_ROUTING.get('STICKY_CACHE', {})})
+
+# Retraso de una réplica de PostgreSQL (0 si está al día o no es réplica)
+PG_LAG_SQL = (
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+
+
+"""
+Estado de enrutamiento de la petición en curso.
+
+- use_replica: la petición es de lectura (GET/HEAD/OPTIONS) y el usuario no
+  escribió en los últimos STICKY_SECONDS.
+- authenticating: la petición trae credenciales que todavía no se verificaron;
+  hasta entonces se lee del primario (la propia autenticación incluida).
+- user_id solo se asigna con el usuario ya autenticado (authenticated), nunca
+  con el contenido de un token sin verificar.
+- La réplica se elige una vez por petición (lecturas consistentes entre sí).
+"""
+class RoutingState:
+
+    def __init__(self, use_replica, authenticating=False):
+        self.use_replica = use_replica
+        self.authenticating = authenticating
+        self.user_id = None
+        self.replica = None
+
+    # Usuario verificado: con una escritura reciente, leer del primario
+    # (sticky ya consultado por las vistas async, None: consultarlo aquí)
+    def authenticated(self, user_id, sticky=None):
+        self.user_id = user_id
+        self.authenticating = False
+        if self.use_replica and (is_sticky(user_id) if sticky is None else sticky):
+            self.use_replica = False
+
+
+# Estado de la petición (se propaga a los hilos de sync_to_async)
+current_routing = ContextVar('current_routing', default=None)
+
+
+# Asignar el usuario autenticado a la petición en curso (backend.authentication)
+def set_routing_user(user_id):
+    state = current_routing.get()
+    if state is not None:
+        state.authenticated(user_id)
+
+
+# Versión async (backend.asyncapi): la ventana de lectura se consulta sin bloquear el bucle
+async def aset_routing_user(user_id):
+    state = current_routing.get()
+    if state is not None:
+        state.authenticated(user_id, sticky=state.use_replica and await ais_sticky(user_id))
+
+
+"""
+Lee del primario el resto de la petición en curso.
+
+- Para lecturas que no pueden ir por detrás del primario: marcas de agua de
+  sincronización y validadores de ETag (una réplica atrasada haría que el
+  cliente saltara filas o guardara un cuerpo viejo con un ETag nuevo).
+"""
+def read_from_primary():
+    state = current_routing.get()
+    if state is not None:
+        state.use_replica = False
+
+
+# Marcar / consultar la ventana de lectura tras escritura
+def mark_sticky(user_id):
+    if user_id is not None:
+        sticky_users.set(f'db:sticky:{user_id}', True, ttl=STICKY_SECONDS)
+
+
+def is_sticky(user_id):
+    return user_id is not None and sticky_users.get(f'db:sticky:{user_id}') is not None
+
+
+async def ais_sticky(user_id):
+    return user_id is not None and await sticky_users.aget(f'db:sticky:{user_id}') is not None
+
+
+"""
+Salud de las réplicas.
+
+- Se comprueba como mucho cada HEALTH_CHECK_INTERVAL segundos por réplica
+  (conexión y, en PostgreSQL, retraso de replicación).
+- Una réplica caída o atrasada no recibe lecturas hasta la siguiente
+  comprobación correcta.
+"""
+class ReplicaHealth:
+
+    def __init__(self, interval, max_lag):
+        self.interval = interval
+        self.max_lag = max_lag
+        self._state = {}  # alias -> (sana, momento de la comprobación)
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(alias)
+        # ? Comprobación reciente
+        if state and now - state[1] < self.interval:
+            return state[0]
+        healthy = self.check(alias)
+        with self._lock:
+            self._state[alias] = (healthy, now)
+        return healthy
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+            # ? Réplica de PostgreSQL: retraso de replicación
+            if connection.vendor == 'postgresql' and self.max_lag is not None:
+                with connection.cursor() as cursor:
+                    cursor.execute(PG_LAG_SQL)
+                    lag = float(cursor.fetchone()[0])
+                if lag > self.max_lag:
+                    logger.warning('Réplica %s atrasada %.1fs, se usará el primario', alias, lag)
+                    return False
+            return True
+        except DatabaseError as e:
+            logger.warning('Réplica %s no disponible, se usará el primario: %s', alias, e)
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._state.clear()
+
+
+replica_health = ReplicaHealth(HEALTH_CHECK_INTERVAL, MAX_REPLICATION_LAG)
+
+
+"""
+Router de lectura/escritura.
+
+- Escrituras: siempre el primario (default). Una escritura durante una
+  petición de lectura pasa el resto de la petición al primario y abre la
+  ventana de lectura tras escritura del usuario.
+- Lecturas: réplica sana solo dentro de una petición de lectura (ver
+  ReplicaRoutingMiddleware) ya autenticada, de las apps de REPLICA_APPS y
+  fuera de una transacción del primario. Comandos, trabajos en segundo plano y pruebas
+  leen del primario.
+- Sin réplicas configuradas se comporta como si no hubiera router.
+"""
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        # ? Sin réplicas, fuera de una petición de lectura o credenciales sin verificar
+        if not REPLICAS or state is None or not state.use_replica or state.authenticating:
+            return None
+        if model._meta.app_label not in REPLICA_APPS:
+            return None
+        # ? Dentro de una transacción del primario (debe ver sus propios cambios)
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        if state.replica is None:
+            healthy = [alias for alias in REPLICAS if replica_health.is_healthy(alias)]
+            state.replica = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        # ? Escritura dentro de una petición: leer del primario a partir de ahora
+        if state is not None:
+            if state.use_replica:
+                state.use_replica = False
+            mark_sticky(state.user_id)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas y primario tienen los mismos datos
+        aliases = {DEFAULT_DB_ALIAS, *REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    # Las réplicas reciben el esquema por replicación, no con migrate
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in REPLICAS:
+            return False
+        return None
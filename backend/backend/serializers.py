@@ -1,11 +1,61 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
+from .tokens import FastBlacklistRefreshToken
+
+
+# Claims para la autenticación sin estado (AUTH_USER_CACHE MODE='stateless')
+def set_user_claims(token, user):
+    token['username'] = user.username
+    token['email'] = user.email
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    token['is_active'] = user.is_active
+    return token
+
 
 # Validar token
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        return set_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         try:
             return super().validate(attrs)
         except AuthenticationFailed as e:
             raise AuthenticationFailed(_("Las credenciales son incorrectas."))
+
+
+"""
+Refrescar token (lista negra en memoria).
+
+- Los claims del nuevo token de acceso se leen del usuario actual, no se
+  copian del token de refresco (que puede tener días).
+- Un usuario inactivo o eliminado no obtiene un nuevo token.
+"""
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FastBlacklistRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        # ? Usuario eliminado o inactivo
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_("La cuenta no está activa."), code='no_active_account')
+
+        data = {'access': str(set_user_claims(refresh.access_token, user))}
+        # ? Rotación de tokens de refresco (SIMPLE_JWT)
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(set_user_claims(refresh, user))
+        return data
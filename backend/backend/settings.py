@@ -53,7 +53,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.RequestTimingMiddleware', # Tiempos por petición (Server-Timing)
+    'backend.middleware.ReplicaRoutingMiddleware', # Lecturas a réplicas (backend.routers)
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware', # Archivos estáticos (collectstatic)
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +92,21 @@ LANGUAGES = [
     ('en', 'English'),
 ]
 
+# Caché compartida entre procesos (Redis), p. ej. CACHE_URL=redis://redis:6379/0
+# - Sin CACHE_URL cada proceso tiene su propia caché en memoria (desarrollo, un solo proceso):
+#   las invalidaciones no llegan a los otros procesos.
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+# Backend por defecto de las cachés propias (backend.cache): 'django' si hay caché compartida
+SHARED_CACHE_BACKEND = 'django' if CACHE_URL else 'locmem'
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -109,6 +127,31 @@ DATABASES = {
     }
 }
 
+# Réplicas de lectura de PostgreSQL: DB_REPLICA_HOSTS=host1,host2 (mismas credenciales que default)
+DATABASE_REPLICAS = []
+for index, host in enumerate(host for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host):
+    DATABASES[f'replica_{index + 1}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},  # Las pruebas leen del primario
+    }
+    DATABASE_REPLICAS.append(f'replica_{index + 1}')
+# Alias usados como réplica (pruebas locales): DB_REPLICAS=replica crea un espejo de default
+for alias in (alias for alias in os.getenv('DB_REPLICAS', '').split(',') if alias):
+    DATABASES.setdefault(alias, {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}})
+    DATABASE_REPLICAS.append(alias)
+
+# Router de lectura/escritura (backend.routers)
+DATABASE_ROUTERS = ['backend.routers.ReadReplicaRouter']
+DATABASE_ROUTING = {
+    'APPS': ['tasks', 'account', 'auth'],  # Apps cuyas lecturas van a las réplicas
+    'STICKY_SECONDS': 5,  # Lectura del primario tras escribir (lectura tras escritura)
+    'HEALTH_CHECK_INTERVAL': 10,  # Segundos entre comprobaciones de cada réplica
+    'MAX_LAG': 5,  # Retraso de replicación máximo (segundos)
+    # Ventana de lectura tras escritura: compartida entre procesos si hay CACHE_URL ('django' + ALIAS)
+    'STICKY_CACHE': {'BACKEND': SHARED_CACHE_BACKEND, 'ALIAS': 'default'},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,6 +200,9 @@ DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
 STATIC_URL = 'static/'
 
+# Destino de collectstatic, servido por WhiteNoise (admin)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -172,7 +218,7 @@ CORS_ALLOWED_ORIGINS = [
 REST_FRAMEWORK = {
     # Standard authentication
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # JWT
+        'backend.authentication.CachedJWTAuthentication',  # JWT con caché de usuario
     ),
     # Permisos
     'DEFAULT_PERMISSION_CLASSES': (
@@ -190,6 +236,116 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Búsqueda de texto completo de tareas (configuración de idioma de Postgres)
+TASK_SEARCH_CONFIG = 'spanish'
+
+# Número de tareas recientes por usuario en el listado de usuarios
+USER_LIST_RECENT_TASKS = 5
+
+# Eliminación de usuarios en segundo plano (DELETE /api/account/user/<id>/), tareas por lote
+USER_DELETION_BATCH_SIZE = 5000
+# Segundos sin progreso tras los que una eliminación se reanuda (proceso reiniciado o desplegado)
+USER_DELETION_STALE_SECONDS = 300
+
+# Caché de respuestas de tareas (list / retrieve)
+# - BACKEND 'locmem': LRU en memoria por proceso (un solo proceso / desarrollo).
+# - BACKEND 'django': usa CACHES[ALIAS], compartido entre procesos (Redis, Memcached).
+# - Por defecto 'django' si hay CACHE_URL.
+TASK_CACHE = {
+    'ENABLED': os.getenv('TASK_CACHE_ENABLED', 'True') == 'True',
+    'BACKEND': os.getenv('TASK_CACHE_BACKEND', SHARED_CACHE_BACKEND),
+    'ALIAS': 'default',
+    'TTL': 60,  # Segundos
+    'MAX_ENTRIES': 10000,
+}
+
+# Máximo de operaciones por petición en /api/task/tasks/bulk/
+TASK_BULK_MAX_ITEMS = 500
+
+# Sincronización incremental (/api/task/tasks/changes/)
+TASK_SYNC_PAGE_SIZE = 500
+TASK_SYNC_SAFETY_LAG = 2  # Segundos
+TASK_TOMBSTONE_RETENTION_DAYS = 30
+
+# Exportación en streaming (/api/task/tasks/export/), filas por lectura
+TASK_EXPORT_CHUNK_SIZE = 2000
+
+# Importación (/api/task/tasks/import/ y comando import_tasks)
+TASK_IMPORT_BATCH_SIZE = 1000  # Filas por bulk_create
+TASK_IMPORT_MAX_ERRORS = 1000  # Errores detallados en el reporte
+
+# Trabajos en segundo plano (procesamiento de fotos de perfil)
+BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', '2'))
+BACKGROUND_TASKS_EAGER = False  # True: ejecutar en el hilo de la petición
+
+# Tamaños de las miniaturas de las fotos de perfil (px)
+PROFILE_THUMBNAIL_SIZES = (64, 128, 256)
+
+# Servir /media/ (backend.media.serve_media)
+# - MODE 'django': FileResponse desde MEDIA_ROOT.
+# - MODE 'nginx': X-Accel-Redirect a INTERNAL_URL (location internal con alias a MEDIA_ROOT).
+# - MODE 'apache': X-Sendfile (mod_xsendfile).
+# - Los archivos con nombre por hash (fotos de perfil) se cachean como inmutables.
+# - ENABLED: ruta /media/ en Django. Por defecto con DEBUG o detrás del proxy (nginx / apache); en
+#   producción con MODE 'django' cada archivo ocupa un proceso de la API (MEDIA_SERVING_ENABLED=True
+#   solo como alternativa sin proxy).
+MEDIA_SERVING_MODE = os.getenv('MEDIA_SERVING_MODE', 'django')
+MEDIA_SERVING = {
+    'ENABLED': os.getenv('MEDIA_SERVING_ENABLED', str(DEBUG or MEDIA_SERVING_MODE != 'django')) == 'True',
+    'MODE': MEDIA_SERVING_MODE,
+    'INTERNAL_URL': '/protected-media/',
+    'IMMUTABLE_MAX_AGE': 60 * 60 * 24 * 365,
+    'MAX_AGE': 60 * 60,
+}
+
+# Caché del usuario autenticado por JWT
+# - MODE 'cached': LRU/TTL por id de usuario, se invalida al guardar User / Profile.
+# - MODE 'stateless': usuario construido con los claims del token (sin consultas). Los cambios
+#   (p. ej. desactivar la cuenta) se aplican al renovar el token: hasta ACCESS_TOKEN_LIFETIME.
+# - MODE 'database': una consulta por petición (simplejwt original).
+# - BACKEND 'locmem' invalida solo en el proceso actual, con varios procesos usar 'django'
+#   (por defecto si hay CACHE_URL).
+AUTH_USER_CACHE = {
+    'MODE': os.getenv('AUTH_USER_CACHE_MODE', 'cached'),
+    'BACKEND': os.getenv('AUTH_USER_CACHE_BACKEND', SHARED_CACHE_BACKEND),
+    'ALIAS': 'default',
+    'TTL': 60,  # Segundos
+    'MAX_ENTRIES': 5000,
+}
+
+# Lista negra de tokens en memoria (segundos)
+TOKEN_REVOCATION = {
+    'REFRESH_INTERVAL': 5,  # Lectura incremental de nuevos tokens revocados
+    'FULL_RELOAD_INTERVAL': 3600,  # Recarga completa
+    'GAP_TIMEOUT': 60,  # Ids saltados (transacciones sin confirmar) que se siguen buscando
+}
+
+# Instrumentación de peticiones (backend.middleware.RequestTimingMiddleware)
+REQUEST_TIMING = {
+    'SLOW_REQUEST_MS': int(os.getenv('SLOW_REQUEST_MS', 500)),  # Umbral de petición lenta
+    'SLOW_QUERIES': 5,  # Consultas más lentas registradas por petición lenta
+    'LOG_REQUESTS': os.getenv('LOG_REQUESTS', 'False') == 'True',  # Línea JSON por petición (LOG_REQUESTS=True)
+}
+
+# Registro (líneas JSON de tiempos en consola)
+# - Por defecto solo las peticiones lentas (WARNING); REQUEST_LOG_LEVEL=INFO y LOG_REQUESTS=True
+#   registran una línea por petición.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'backend.timing': {
+            'handlers': ['console'], 'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING'), 'propagate': False,
+        },
+    },
+}
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),  # 2 horas
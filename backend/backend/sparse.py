@@ -0,0 +1,133 @@
+from rest_framework.exceptions import ValidationError
+
+# Parámetros de la petición
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+# Lista de campos de un parámetro (?fields=id,title,profile.nombre)
+def parse_field_list(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+# Selección de campos de la petición para el contexto del serializer
+def get_sparse_context(params, default_fields=None):
+    fields = parse_field_list(params.get(FIELDS_PARAM)) or None
+    # ? Sin ?fields=, selección por defecto (representación compacta)
+    if fields is None and default_fields:
+        fields = set(default_fields)
+    return {'sparse_fields': fields, 'sparse_omit': parse_field_list(params.get(OMIT_PARAM))}
+
+
+# Columnas del modelo que necesita la salida del serializer (más las obligatorias)
+def get_sparse_columns(serializer_class, context, model, required=('id',)):
+    serializer = serializer_class(context=context)
+    concrete = {field.name for field in model._meta.concrete_fields}
+    columns = {field.source for field in serializer.fields.values() if field.source in concrete}
+    return columns | set(required)
+
+
+# Ruta del serializer dentro de la respuesta ('' la raíz, 'tasks.' una lista anidada)
+def serializer_path(serializer):
+    parts = []
+    node = serializer
+    while node.parent is not None:
+        if node.field_name:
+            parts.append(node.field_name)
+        node = node.parent
+    return ''.join(f'{part}.' for part in reversed(parts))
+
+
+"""
+Mixin de serializer para respuestas con campos a elegir (sparse fieldsets).
+
+- Lee del contexto sparse_fields (None = todos) y sparse_omit, con rutas con
+  punto para los serializers anidados (profile.nombre, tasks.title). Los pone
+  SparseFieldsetMixin (vista).
+- Un anidado pedido sin subcampos (?fields=tasks) sale completo.
+- Solo afecta a la salida: con datos de entrada (crear / actualizar) se
+  validan todos los campos.
+- Un campo desconocido responde 400.
+"""
+class SparseFieldsetSerializerMixin:
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # ? Serializer de entrada
+        if hasattr(self.root, 'initial_data'):
+            return fields
+
+        requested = self.context.get('sparse_fields')
+        omitted = self.context.get('sparse_omit') or set()
+        # ? Sin selección
+        if requested is None and not omitted:
+            return fields
+
+        prefix = serializer_path(self)
+        self._check_names(FIELDS_PARAM, requested or set(), prefix, fields)
+        self._check_names(OMIT_PARAM, omitted, prefix, fields)
+
+        # Campos pedidos en este nivel (ninguno: todos, el anidado se pidió completo)
+        selected = None
+        if requested is not None:
+            selected = {path[len(prefix):].split('.')[0] for path in requested if path.startswith(prefix)}
+        for name in list(fields):
+            # ? No pedido u omitido
+            if (selected and name not in selected) or f'{prefix}{name}' in omitted:
+                fields.pop(name)
+        return fields
+
+    # Campos desconocidos de este nivel
+    def _check_names(self, param, paths, prefix, fields):
+        unknown = sorted(
+            path for path in paths
+            if path.startswith(prefix) and path[len(prefix):].split('.')[0] not in fields
+        )
+        if unknown:
+            raise ValidationError({param: f"Campos desconocidos: {', '.join(unknown)}. Permitidos: {', '.join(fields)}."})
+
+
+"""
+Mixin de vista para ?fields= / ?omit=.
+
+- Pasa la selección al serializer (contexto). list_fields es la selección
+  por defecto de la acción list (representación compacta), ?fields= la
+  sustituye.
+- En las acciones de sparse_only_actions reduce también el SQL: .only() con
+  las columnas de los campos elegidos más sparse_required_columns (permisos,
+  orden, paginación por cursor).
+- is_field_requested(nombre) permite a la vista quitar JOIN, anotaciones o
+  prefetch de los campos que no se piden.
+"""
+class SparseFieldsetMixin:
+    list_fields = None
+    sparse_only_actions = ()
+    sparse_required_columns = ('id',)
+
+    def get_sparse_context(self):
+        # ? Listado: representación compacta por defecto
+        default = self.list_fields if getattr(self, 'action', None) == 'list' else None
+        return get_sparse_context(self.request.query_params, default)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_sparse_context())
+        return context
+
+    # ? El campo (de primer nivel) sale en la respuesta
+    def is_field_requested(self, name):
+        sparse = self.get_sparse_context()
+        if name in sparse['sparse_omit']:
+            return False
+        fields = sparse['sparse_fields']
+        return fields is None or any(path == name or path.startswith(f'{name}.') for path in fields)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # ? Acción sin reducción de columnas
+        if getattr(self, 'action', None) not in self.sparse_only_actions:
+            return queryset
+        columns = get_sparse_columns(
+            self.get_serializer_class(), self.get_serializer_context(), queryset.model, self.sparse_required_columns,
+        )
+        return queryset.only(*columns)
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import re
+import uuid
+from contextlib import nullcontext
+from django.core.files.storage import FileSystemStorage
+
+# Nombre direccionado por contenido: <carpeta>/<ab>/<sha256>.<ext>
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+# ? El nombre es un hash del contenido (el archivo nunca cambia)
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+"""
+Storage direccionado por contenido.
+
+- El nombre del archivo es el SHA-256 de su contenido: la misma imagen se
+  guarda una sola vez y su URL no cambia nunca (caché inmutable).
+- Del nombre pedido solo se conservan la primera carpeta y la extensión
+  (profiles/user_1/foto.JPG -> profiles/3f/3fa2...c1.jpg).
+- Guardar un contenido existente no escribe nada y devuelve el mismo nombre.
+- Varias filas pueden apuntar al mismo archivo: reference(name) envuelve la
+  comprobación y la escritura de cada guardado (account.files cuenta las
+  referencias y solo elimina archivos sin ninguna).
+"""
+class ContentAddressedStorage(FileSystemStorage):
+    hash_algorithm = 'sha256'
+
+    # Nombre final del contenido
+    def hashed_name(self, name, content):
+        digest = hashlib.new(self.hash_algorithm)
+        for chunk in content.chunks():
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        checksum = digest.hexdigest()
+
+        folder = name.replace('\\', '/').split('/')[0] if '/' in name else ''
+        ext = os.path.splitext(name)[1].lower()
+        return '/'.join(filter(None, [folder, checksum[:2], f'{checksum}{ext}']))
+
+    # El nombre definitivo lo decide el contenido (_save)
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    # Contexto de cada guardado del nombre (sin referencias por defecto)
+    def reference(self, name):
+        return nullcontext()
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        with self.reference(name):
+            # ? Contenido ya guardado
+            if self.exists(name):
+                return name
+            # Escribir en un temporal y renombrar: otra petición puede guardar el mismo contenido a la vez
+            temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+            os.replace(self.path(temporary), self.path(name))
+        return name
@@ -0,0 +1,25 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .revocation import revoked_tokens
+
+
+"""
+Token de refresco que verifica la lista negra en memoria.
+
+- check_blacklist usa el conjunto de JTIs revocados en lugar de una consulta.
+- blacklist() también lo marca en el conjunto local al instante.
+"""
+class FastBlacklistRefreshToken(RefreshToken):
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        # ? Token revocado
+        if jti in revoked_tokens:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        revoked_tokens.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -15,14 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.http import JsonResponse
-from django.conf.urls.static import static
 from django.conf import settings
-from .views import CustomTokenObtainPairView
-from rest_framework_simplejwt.views import (
-    TokenRefreshView
-)
+from .media import serve_media
+from .views import CustomTokenObtainPairView, CustomTokenRefreshView
 
 # Root "/"
 def server_status_view(request):
@@ -34,10 +31,13 @@ urlpatterns = [
     path('api/account/', include('account.urls')), 
     path('api/task/', include('tasks.urls')), 
      path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
 ]
 
 
-# Añadir soporte para servir archivos MEDIA en desarrollo
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Archivos MEDIA (fotos de perfil) con caché inmutable (ver MEDIA_SERVING)
+# ? Activado (DEBUG o detrás del proxy) y MEDIA_URL local (no un CDN u otro dominio)
+if settings.MEDIA_SERVING.get('ENABLED') and settings.MEDIA_URL.startswith('/'):
+    urlpatterns += [
+        re_path(rf'^{settings.MEDIA_URL.strip("/")}/(?P<path>.+)$', serve_media, name='media'),
+    ]
\ No newline at end of file
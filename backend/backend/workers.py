@@ -0,0 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Número de hilos del pool de trabajos en segundo plano
+BACKGROUND_WORKERS = getattr(settings, 'BACKGROUND_WORKERS', 2)
+# Ejecutar los trabajos en el mismo hilo (pruebas / scripts)
+BACKGROUND_EAGER = getattr(settings, 'BACKGROUND_TASKS_EAGER', False)
+
+_executor = None
+
+
+# Pool de hilos compartido (se crea al primer uso)
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='background')
+    return _executor
+
+
+# Ejecutar el trabajo y liberar la conexión del hilo
+def _run(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception('Error en el trabajo en segundo plano %s', func.__name__)
+    finally:
+        # ? Con modo inmediato la conexión es la de la petición
+        if not BACKGROUND_EAGER:
+            close_old_connections()
+
+
+"""
+Envía un trabajo al pool de segundo plano.
+
+- Fuera del hilo de la petición, la respuesta no espera al trabajo.
+- Cada hilo usa su propia conexión a la base de datos.
+"""
+def submit(func, *args, **kwargs):
+    if BACKGROUND_EAGER:
+        return _run(func, *args, **kwargs)
+    return get_executor().submit(_run, func, *args, **kwargs)
+
+
+"""
+Envía un trabajo al pool cuando la transacción actual se confirme.
+
+- Evita que el trabajo lea datos que todavía no existen o que se revierten.
+"""
+def submit_on_commit(func, *args, using=None, **kwargs):
+    transaction.on_commit(lambda: submit(func, *args, **kwargs), using=using)
@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+
+# Servidor de producción: gunicorn con workers de uvicorn (ASGI)
+# - Las vistas síncronas de DRF se ejecutan en hilos (sync_to_async con thread_sensitive=True):
+#   Django abre un ThreadSensitiveContext por petición, así que varias peticiones se
+#   atienden a la vez en cada proceso, cada una con su hilo y su conexión a la base de datos.
+# - Las vistas async (/async/) atienden muchas peticiones por proceso.
+# - Con varios procesos, las cachés deben ser compartidas (CACHE_URL).
+
+# Dirección y puerto
+bind = os.getenv('BIND', '0.0.0.0:8000')
+
+# Procesos (WEB_CONCURRENCY, por defecto 2 por CPU + 1)
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Reinicio periódico de cada proceso (memoria) y tiempo máximo por petición
+max_requests = 1000
+max_requests_jitter = 100
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+# Registro en consola
+accesslog = '-'
+errorlog = '-'
+
+
+# Al arrancar cada proceso: reanudar las eliminaciones de usuarios cortadas por un
+# reinicio (max_requests) o un despliegue, y seguir vigilándolas en un hilo
+def post_worker_init(worker):
+    from account.deletion import start_stale_deletion_watcher
+    start_stale_deletion_watcher()
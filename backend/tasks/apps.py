@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import signals  # Señales de invalidación de caché
+        # Crear estructuras de búsqueda (tsvector / FTS5) después de migrar
+        post_migrate.connect(install_search_structures, sender=self)
+
+
+# Instalar búsqueda de texto completo en la base de datos migrada
+def install_search_structures(sender, using='default', **kwargs):
+    from .search import install_task_search
+    install_task_search(using=using)
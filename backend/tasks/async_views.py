@@ -0,0 +1,137 @@
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import _positive_int
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from backend.asyncapi import async_api_view, json_response, read_json
+from backend.sparse import get_sparse_columns, get_sparse_context
+from .models import Task
+from .pagination import TaskPageNumberPagination
+from .serializers import TaskViewSerializer, TASK_LIST_FIELDS, TASK_REQUIRED_COLUMNS
+
+
+# Tareas visibles para el usuario (el staff ve todas)
+def task_queryset(user):
+    queryset = Task.objects.all() if user.is_staff else Task.objects.filter(user=user)
+    return queryset.order_by('-created_at', '-id')
+
+
+# Tarea visible o 404 (igual que el ViewSet y get_object_or_404: no revela tareas ajenas)
+async def aget_task(user, pk):
+    try:
+        return await task_queryset(user).aget(pk=pk)
+    except Task.DoesNotExist:
+        raise NotFound(f'No {Task._meta.object_name} matches the given query.')
+
+
+# Tamaño de página de la query string (inválido o fuera de rango: el de por defecto, como DRF)
+def page_size_param(request, paginator):
+    try:
+        return _positive_int(
+            request.GET[paginator.page_size_query_param], strict=True, cutoff=paginator.max_page_size,
+        )
+    except (KeyError, ValueError):
+        return paginator.page_size
+
+
+# Número de página de la query string ('last' la última); inválido o fuera de rango: 404, como DRF
+def page_number_param(request, paginator, pages):
+    value = request.GET.get(paginator.page_query_param) or 1
+    if value in paginator.last_page_strings:
+        return pages
+    try:
+        page = int(value)
+    except (TypeError, ValueError):
+        page = 0
+    # ? Página inválida
+    if not 1 <= page <= pages:
+        raise NotFound(paginator.invalid_page_message)
+    return page
+
+
+"""
+Página de tareas con el mismo formato que TaskPageNumberPagination.
+
+- {count, next, previous, results}, ?page=N|last&page_size=M. Una página
+  inválida responde 404 y un page_size inválido usa el de por defecto.
+- COUNT(*) y la página se leen con el ORM async (acount, async for).
+- ?fields= / ?omit= como el ViewSet (compacto por defecto, solo las columnas
+  necesarias) y la misma lectura rápida (backend.fastpath).
+"""
+async def paginate(request, queryset):
+    paginator = TaskPageNumberPagination
+    page_size = page_size_param(request, paginator)
+    count = await queryset.acount()
+    pages = max(1, -(-count // page_size))
+    page = page_number_param(request, paginator, pages)
+
+    context = get_sparse_context(request.GET, TASK_LIST_FIELDS)
+    serializer = TaskViewSerializer(many=True, context=context)
+    plan = serializer.get_fast_plan()
+    # ? Lectura rápida: tuplas de values_list, si no instancias con las columnas necesarias
+    if plan.supported:
+        queryset = plan.values(queryset)
+    else:
+        queryset = queryset.only(*get_sparse_columns(TaskViewSerializer, context, Task, TASK_REQUIRED_COLUMNS))
+    offset = (page - 1) * page_size
+    rows = [row async for row in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    previous = None
+    if page > 1:
+        previous = replace_query_param(url, paginator.page_query_param, page - 1) if page > 2 \
+            else remove_query_param(url, paginator.page_query_param)
+    return {
+        'count': count,
+        'next': replace_query_param(url, paginator.page_query_param, page + 1) if page < pages else None,
+        'previous': previous,
+        'results': serializer.to_representation(rows),
+    }
+
+
+"""
+Vistas asíncronas de las tareas (ASGI).
+
+- Mismo contrato que TaskViewSet: validación con TaskViewSerializer, el usuario
+  se asigna desde el token y el staff ve todas las tareas.
+- Las señales de Task (caché de respuestas, tombstones) se ejecutan igual:
+  asave / adelete llaman a save / delete.
+- Rutas:
+  - GET | POST /async/tasks/
+  - GET | PUT | PATCH | DELETE /async/tasks/{id}/
+"""
+@async_api_view(['GET', 'POST'])
+async def task_list(request):
+    # ? Listar
+    if request.method == 'GET':
+        return json_response(await paginate(request, task_queryset(request.user)))
+
+    # Crear (validación sin consultas, se ejecuta en el bucle)
+    serializer = TaskViewSerializer(data=read_json(request))
+    if not serializer.is_valid():
+        raise ValidationError(serializer.errors)
+    task = await Task.objects.acreate(user=request.user, **serializer.validated_data)
+    return json_response(TaskViewSerializer(task).data, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
+async def task_detail(request, pk):
+    task = await aget_task(request.user, pk)
+
+    # ? Obtener (?fields= / ?omit= como el ViewSet)
+    if request.method == 'GET':
+        return json_response(TaskViewSerializer(task, context=get_sparse_context(request.GET)).data)
+
+    # ? Eliminar
+    if request.method == 'DELETE':
+        await task.adelete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    # Actualizar (PATCH parcial)
+    serializer = TaskViewSerializer(task, data=read_json(request), partial=request.method == 'PATCH')
+    if not serializer.is_valid():
+        raise ValidationError(serializer.errors)
+    for field, value in serializer.validated_data.items():
+        setattr(task, field, value)
+    await task.asave()
+    return json_response(TaskViewSerializer(task).data)
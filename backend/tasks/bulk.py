@@ -0,0 +1,206 @@
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from .models import Task, TaskTombstone
+from .stats import apply_bulk_task_delta, apply_task_delta
+
+# Límite de operaciones por petición
+BULK_MAX_ITEMS = getattr(settings, 'TASK_BULK_MAX_ITEMS', 500)
+
+
+"""
+Elimina tareas con un DELETE directo, sin cargarlas ni enviar señales por fila.
+
+- rows: (id, user_id, completed) de las tareas, bloqueadas (select_for_update)
+  en la transacción en curso.
+- Las eliminaciones (TaskTombstone) se registran con un bulk_create y los
+  contadores con una diferencia por usuario, como hacen las señales de
+  Task.delete. tombstones=False al eliminar el usuario.
+- Siempre en la base de datos de escritura; devuelve el número de tareas eliminadas.
+"""
+def delete_task_rows(rows, tombstones=True):
+    using = router.db_for_write(Task)
+    tasks = Task.objects.using(using).filter(pk__in=[pk for pk, _, _ in rows])
+    # _raw_delete (API privada de QuerySet) es un DELETE ... WHERE id IN (...) sin el Collector:
+    # - Sin cascadas que perder: ningún modelo apunta a Task (TaskTombstone guarda task_id
+    #   como entero); lo comprueba TaskBulkWriteTests.test_raw_delete_is_safe.
+    # - Sin señales por fila: su trabajo (tombstones, contadores) se hace abajo por lote y
+    #   la caché de respuestas la invalida quien llama.
+    deleted = tasks._raw_delete(using)
+
+    if tombstones:
+        TaskTombstone.objects.using(using).bulk_create(
+            [TaskTombstone(task_id=pk, user_id=user_id) for pk, user_id, _ in rows]
+        )
+    deltas = {}
+    for _, user_id, completed in rows:
+        total, done = deltas.get(user_id, (0, 0))
+        deltas[user_id] = (total + 1, done + int(completed))
+    for user_id, (total, done) in deltas.items():
+        apply_task_delta(user_id, -total, -done, using=using)
+    return deleted
+
+
+"""
+Mixin con operaciones por lotes para el ViewSet de tareas.
+
+- POST   /tasks/bulk/ - Crear tareas: [{title, description, completed}, ...]
+- PUT    /tasks/bulk/ - Actualizar tareas: [{id, title, description, completed}, ...]
+- PATCH  /tasks/bulk/ - Actualizar parcialmente: [{id, ...campos}, ...]
+- DELETE /tasks/bulk/ - Eliminar tareas: {"ids": [1, 2, 3]}
+
+- Cada lote se valida con el serializer (many=True) y se escribe con una sola
+  consulta (bulk_create / bulk_update / DELETE directo) dentro de una transacción.
+- Los elementos inválidos no detienen el lote, la respuesta trae el resultado
+  de cada elemento: {"results": [{"index", "status", "data" | "errors"}]}.
+- Responde 207 si algún elemento falló.
+"""
+class TaskBulkMixin:
+
+    # Obtener la lista de elementos del cuerpo
+    def get_bulk_items(self, request):
+        items = request.data
+        # ? No es una lista
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Se esperaba una lista de tareas.'})
+        # ? Lote vacío o demasiado grande
+        if not items:
+            raise ValidationError({'detail': 'La lista de tareas está vacía.'})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({'detail': f'No se permiten más de {BULK_MAX_ITEMS} tareas por petición.'})
+        return items
+
+    # Validar cada elemento con el serializer hijo
+    def validate_bulk_items(self, items, partial=False):
+        child = self.get_serializer(data=items, many=True, partial=partial).child
+        validated, results = {}, {}
+        for index, item in enumerate(items):
+            try:
+                # ? El elemento no es un objeto
+                if not isinstance(item, dict):
+                    raise ValidationError({'detail': 'Cada tarea debe ser un objeto.'})
+                validated[index] = child.run_validation(item)
+            except ValidationError as e:
+                results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': e.detail}
+        return validated, results
+
+    # Respuesta con resultados por elemento
+    def bulk_response(self, results, success_status):
+        results = [results[index] for index in sorted(results)]
+        failed = any(result['status'] >= 400 for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_207_MULTI_STATUS if failed else success_status,
+        )
+
+    # Crear tareas por lote
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items = self.get_bulk_items(request)
+        validated, results = self.validate_bulk_items(items)
+
+        # Tareas válidas
+        indexes = sorted(validated)
+        tasks = [Task(user=request.user, **validated[index]) for index in indexes]
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            apply_bulk_task_delta(tasks, created=True)
+
+        serializer = self.get_serializer(tasks, many=True)
+        for index, data in zip(indexes, serializer.data):
+            results[index] = {'index': index, 'status': status.HTTP_201_CREATED, 'data': data}
+
+        # bulk_create no envía señales
+        if tasks:
+            self.invalidate_cache(request.user.pk)
+        return self.bulk_response(results, status.HTTP_201_CREATED)
+
+    # Actualizar tareas por lote
+    @bulk.mapping.put
+    def bulk_update(self, request):
+        return self.perform_bulk_update(request, partial=False)
+
+    # Actualizar parcialmente tareas por lote
+    @bulk.mapping.patch
+    def bulk_partial_update(self, request):
+        return self.perform_bulk_update(request, partial=True)
+
+    def perform_bulk_update(self, request, partial):
+        items = self.get_bulk_items(request)
+        validated, results = self.validate_bulk_items(items, partial=partial)
+
+        # Tareas del usuario (o todas si es admin) en una sola consulta, bloqueadas hasta el
+        # final: el estado anterior (contadores) es el de la fila, no uno leído antes
+        ids = {items[index].get('id') for index in validated}
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            tasks = (
+                self.get_queryset().using(using).select_for_update()
+                .in_bulk([pk for pk in ids if isinstance(pk, int)])
+            )
+
+            now = timezone.now()
+            changed, fields = {}, {'updated_at'}
+            for index in sorted(validated):
+                task = tasks.get(items[index].get('id'))
+                # ? No existe o no pertenece al usuario
+                if task is None:
+                    results[index] = {'index': index, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'La tarea no existe.'}}
+                    continue
+                for attr, value in validated[index].items():
+                    setattr(task, attr, value)
+                    fields.add(attr)
+                # bulk_update no aplica auto_now
+                task.updated_at = now
+                changed[index] = task
+
+            unique = list({task.pk: task for task in changed.values()}.values())
+            Task.objects.using(using).bulk_update(unique, sorted(fields))
+            apply_bulk_task_delta(unique, using=using)
+
+        for index, task in changed.items():
+            results[index] = {'index': index, 'status': status.HTTP_200_OK, 'data': self.get_serializer(task).data}
+
+        # bulk_update no envía señales
+        for user_id in {task.user_id for task in changed.values()}:
+            self.invalidate_cache(user_id)
+        return self.bulk_response(results, status.HTTP_200_OK)
+
+    # Eliminar tareas por lote
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        # ? Lista de ids inválida
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            raise ValidationError({'ids': 'Se esperaba una lista de ids de tareas.'})
+        if len(ids) > BULK_MAX_ITEMS:
+            raise ValidationError({'ids': f'No se permiten más de {BULK_MAX_ITEMS} tareas por petición.'})
+
+        # Filas leídas y bloqueadas en la base de datos de escritura
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            rows = list(
+                self.get_queryset().using(using).filter(pk__in=ids).select_for_update()
+                .order_by().values_list('pk', 'user_id', 'completed')
+            )
+            owners = {pk: user_id for pk, user_id, _ in rows}
+            # ? Alguna tarea del usuario
+            if rows:
+                delete_task_rows(rows)
+
+        results = {}
+        for index, pk in enumerate(ids):
+            # ? No existe o no pertenece al usuario
+            if pk not in owners:
+                results[index] = {'index': index, 'status': status.HTTP_404_NOT_FOUND, 'errors': {'detail': 'La tarea no existe.'}}
+            else:
+                results[index] = {'index': index, 'status': status.HTTP_204_NO_CONTENT, 'data': {'id': pk}}
+
+        for user_id in set(owners.values()):
+            self.invalidate_cache(user_id)
+        return self.bulk_response(results, status.HTTP_200_OK)
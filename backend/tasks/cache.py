@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from rest_framework.response import Response
+from backend.cache import build_cache_backend
+
+
+"""
+Caché de respuestas de tareas por usuario con contador de versión.
+
+- La clave incluye el usuario, su versión actual, la acción y los parámetros.
+- Cualquier escritura sobre las tareas del usuario cambia su versión, las
+  respuestas anteriores dejan de ser alcanzables y expiran solas (TTL/LRU).
+- Si la versión se pierde (expulsión de la caché) se genera una nueva a partir
+  del reloj, nunca se reutiliza una versión anterior.
+- La versión cambia al confirmar la transacción de la escritura: antes, una
+  lectura concurrente guardaría las filas anteriores con la versión nueva.
+- Con BACKEND 'locmem' la versión es por proceso; con varios procesos se usa
+  'django' sobre una caché compartida (CACHE_URL).
+"""
+class TaskResponseCache:
+
+    def __init__(self, config):
+        self.backend = build_cache_backend(config)
+        self.ttl = config.get('TTL', 60)
+        self.enabled = config.get('ENABLED', True)
+        # Contadores de aciertos y fallos (por proceso)
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._stats_lock = threading.Lock()
+
+    # Incrementar un contador
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _version_key(self, user_id):
+        return f'tasks:version:{user_id}'
+
+    # Versión actual de las tareas del usuario
+    def get_version(self, user_id):
+        version = self.backend.get(self._version_key(user_id))
+        # ? No existe o fue expulsada
+        if version is None:
+            version = time.time_ns()
+            self.backend.set(self._version_key(user_id), version)
+        return version
+
+    # Invalidar todas las respuestas del usuario
+    def bump_version(self, user_id):
+        self.backend.set(self._version_key(user_id), time.time_ns())
+        self._count('invalidations')
+
+    # Invalidar al confirmar la transacción en curso (en el momento si no hay ninguna)
+    def bump_version_on_commit(self, user_id, using=None):
+        transaction.on_commit(lambda: self.bump_version(user_id), using=using)
+
+    # Clave de la respuesta
+    def build_key(self, user_id, action, request, **kwargs):
+        params = sorted(request.query_params.lists())
+        raw = f'{action}|{sorted(kwargs.items())}|{params}'
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'tasks:response:{user_id}:{self.get_version(user_id)}:{digest}'
+
+    def get(self, key):
+        data = self.backend.get(key)
+        self._count('misses' if data is None else 'hits')
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data, ttl=self.ttl)
+
+
+# Instancia global
+task_response_cache = TaskResponseCache(getattr(settings, 'TASK_CACHE', {}))
+
+
+"""
+Mixin para cachear list/retrieve de un ViewSet de tareas.
+
+- Solo cachea respuestas 200 de usuarios normales; los administradores ven
+  tareas de otros usuarios y no se cachean.
+- Agrega la cabecera X-Cache (HIT / MISS).
+"""
+class TaskCacheMixin:
+
+    # ? La petición se puede cachear
+    def is_cacheable(self, request):
+        return task_response_cache.enabled and not request.user.is_staff
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # ? No se cachea
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        key = task_response_cache.build_key(request.user.pk, self.action, request, **kwargs)
+        data = task_response_cache.get(key)
+
+        # ? Acierto, no se toca la base de datos
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = handler(request, *args, **kwargs)
+        # ? Solo respuestas correctas
+        if response.status_code == 200:
+            task_response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    # Invalidar la caché del usuario (al confirmar)
+    def invalidate_cache(self, user_id):
+        task_response_cache.bump_version_on_commit(user_id)
@@ -0,0 +1,37 @@
+from backend.conditional import ConditionalGetMixin
+from .stats import get_task_state
+
+
+# Fecha más reciente (ignorando vacíos)
+def latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+"""
+Peticiones condicionales para list/retrieve del ViewSet de tareas.
+
+- Validador: contadores del usuario (TaskStats) y la última edición de sus
+  tareas, una fila leída por clave primaria e índice.
+- Cualquier alta, baja o edición cambia el ETag; el Last-Modified es el
+  último de esos cambios.
+- Los administradores ven tareas de todos los usuarios: sin modo condicional.
+"""
+class TaskConditionalMixin(ConditionalGetMixin):
+
+    def get_validators(self, request, *args, **kwargs):
+        # ? Administrador
+        if request.user.is_staff:
+            return None
+        state = get_task_state(request.user.pk)
+        # ? Usuario inexistente (token de un usuario eliminado)
+        if state is None:
+            return None
+        parts = (request.user.pk, self.action, state['tasks_total'], state['tasks_changed'], state['tasks_updated'])
+        return parts, latest(state['tasks_changed'], state['tasks_updated'])
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,142 @@
+import csv
+import json
+import zlib
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+# Filas leídas por viaje a la base de datos (cursor del servidor en PostgreSQL)
+EXPORT_CHUNK_SIZE = getattr(settings, 'TASK_EXPORT_CHUNK_SIZE', 2000)
+# Bytes acumulados antes de enviar un bloque al cliente
+EXPORT_BUFFER_SIZE = 64 * 1024
+# Columnas exportadas (mismo orden en NDJSON y CSV)
+EXPORT_FIELDS = ('id', 'title', 'description', 'completed', 'created_at', 'updated_at')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Fechas con el mismo formato que la API (ISO 8601)
+datetime_field = serializers.DateTimeField()
+
+
+# Fila -> diccionario serializable
+def _row_dict(row):
+    item = dict(zip(EXPORT_FIELDS, row))
+    item['created_at'] = datetime_field.to_representation(item['created_at'])
+    item['updated_at'] = datetime_field.to_representation(item['updated_at'])
+    return item
+
+
+# Líneas NDJSON
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(_row_dict(row), ensure_ascii=False) + '\n'
+
+
+# Buffer de una línea para csv.writer (patrón de la documentación de Django)
+class _Echo:
+    def write(self, value):
+        return value
+
+
+# Líneas CSV con encabezado
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        item = _row_dict(row)
+        yield writer.writerow([item[field] for field in EXPORT_FIELDS])
+
+
+"""
+Agrupa las líneas en bloques de ~EXPORT_BUFFER_SIZE bytes.
+
+- El primer bloque sale con la primera línea (primer byte inmediato).
+- Con gzip, cada bloque se comprime y se vacía (Z_SYNC_FLUSH) al momento.
+"""
+def _chunks(lines, compress=False):
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: formato gzip
+    buffer, size, first = [], 0, True
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if first or size >= EXPORT_BUFFER_SIZE:
+            data = ''.join(buffer).encode('utf-8')
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else data
+            buffer, size, first = [], 0, False
+
+    data = ''.join(buffer).encode('utf-8')
+    if compressor:
+        yield compressor.compress(data) + compressor.flush()
+    elif data:
+        yield data
+
+
+"""
+Versión asíncrona de un iterador de bloques (servidor ASGI).
+
+- Con un iterador síncrono Django lo lee entero (sync_to_async(list)) antes
+  de enviar el primer byte; así se envía cada bloque al generarlo.
+- Cada bloque se obtiene en el hilo de la vista (thread_sensitive): el cursor
+  de la consulta sigue en su misma conexión.
+"""
+async def _achunks(chunks):
+    chunks = iter(chunks)
+    done = object()
+    while True:
+        chunk = await sync_to_async(next)(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+"""
+Mixin de exportación para el ViewSet de tareas.
+
+- GET /tasks/export/?output=ndjson|csv&compress=gzip
+- Recorre las tareas con iterator(chunk_size) sobre values_list: sin instancias
+  del modelo ni caché del queryset, la memoria no crece con el número de filas.
+- Respeta la visibilidad de la lista (el staff exporta todas) y ?search=.
+- compress=gzip comprime al vuelo (Content-Encoding: gzip) si el cliente lo acepta.
+- Con ASGI (gunicorn + uvicorn) la respuesta recibe un iterador asíncrono.
+"""
+class TaskExportMixin:
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        # ? Formato no soportado
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Formatos soportados: {', '.join(EXPORT_FORMATS)}."})
+
+        compress = (
+            request.query_params.get('compress') == 'gzip'
+            and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        lines = _csv_lines(rows) if output == 'csv' else _ndjson_lines(rows)
+
+        chunks = _chunks(lines, compress)
+        # ? Servidor ASGI
+        if isinstance(request._request, ASGIRequest):
+            chunks = _achunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[output])
+        filename = f"tasks-{timezone.now():%Y%m%d-%H%M%S}.{output}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        response['X-Accel-Buffering'] = 'no'  # nginx: no acumular la respuesta
+        response['Vary'] = 'Accept-Encoding'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        return response
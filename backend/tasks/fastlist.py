@@ -0,0 +1,21 @@
+"""
+Mixin de listado rápido para el ViewSet de tareas.
+
+- La acción list pagina tuplas de values_list() (columnas de los campos
+  elegidos más las de orden y cursor) en lugar de instancias de Task, y
+  TaskViewSerializer las convierte con su plan de lectura rápida
+  (backend.fastpath.FastListSerializer). La respuesta es idéntica.
+- Si el serializer no admite el plan se listan instancias como siempre.
+"""
+class TaskFastListMixin:
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # ? Solo el listado
+        if getattr(self, 'action', None) != 'list':
+            return queryset
+        plan = self.get_serializer(many=True).get_fast_plan()
+        # ? Serializer no admitido
+        if not plan.supported:
+            return queryset
+        return plan.values(queryset, extra=self.sparse_required_columns)
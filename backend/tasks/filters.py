@@ -0,0 +1,93 @@
+from datetime import datetime, time
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+# Valores aceptados para ?completed=
+BOOLEAN_VALUES = {
+    'true': True, '1': True, 'yes': True,
+    'false': False, '0': False, 'no': False,
+}
+
+# Rangos de fechas: parámetro -> lookup
+DATE_RANGE_PARAMS = {
+    'created_after': 'created_at__gte',
+    'created_before': 'created_at__lt',
+    'updated_after': 'updated_at__gte',
+    'updated_before': 'updated_at__lt',
+}
+
+"""
+Órdenes permitidos: ?ordering= -> ORDER BY.
+
+- Cada uno termina en id (orden total, estable para paginar) y coincide con un
+  índice de Task.Meta.indexes, en ambos sentidos.
+"""
+TASK_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    '-updated_at': ('-updated_at', '-id'),
+    'updated_at': ('updated_at', 'id'),
+}
+DEFAULT_TASK_ORDERING = '-created_at'
+
+
+# Fecha u hora ISO 8601 (una fecha sola es el inicio del día)
+def parse_moment(param, value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({param: 'Fecha inválida, se esperaba ISO 8601 (AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS).'})
+        moment = datetime.combine(day, time.min)
+    # ? Sin zona horaria, la del proyecto
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+"""
+Filtros de las tareas.
+
+- ?completed=true|false - estado (índices parciales por estado).
+- ?created_after= / ?created_before= / ?updated_after= / ?updated_before= -
+  rango de fechas [after, before).
+"""
+class TaskFilter(filters.BaseFilterBackend):
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = {}
+
+        completed = request.query_params.get('completed')
+        if completed is not None:
+            # ? Valor no booleano
+            if completed.lower() not in BOOLEAN_VALUES:
+                raise ValidationError({'completed': 'Se esperaba true o false.'})
+            conditions['completed'] = BOOLEAN_VALUES[completed.lower()]
+
+        for param, lookup in DATE_RANGE_PARAMS.items():
+            value = request.query_params.get(param)
+            if value:
+                conditions[lookup] = parse_moment(param, value)
+
+        return queryset.filter(**conditions) if conditions else queryset
+
+
+"""
+Orden de las tareas (?ordering=), solo de la lista de TASK_ORDERINGS.
+
+- get_ordering también lo usa la paginación por cursor.
+"""
+class TaskOrderingFilter(filters.BaseFilterBackend):
+    ordering_param = 'ordering'
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param, DEFAULT_TASK_ORDERING)
+        # ? Orden no permitido
+        if value not in TASK_ORDERINGS:
+            raise ValidationError({self.ordering_param: f"Órdenes permitidos: {', '.join(TASK_ORDERINGS)}."})
+        return TASK_ORDERINGS[value]
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
@@ -0,0 +1,217 @@
+import codecs
+import csv
+import json
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from .models import Task
+from .serializers import BaseTaskSerializerValidator, TaskViewSerializer
+from .stats import apply_bulk_task_delta
+
+# Filas por bulk_create (una transacción por lote)
+IMPORT_BATCH_SIZE = getattr(settings, 'TASK_IMPORT_BATCH_SIZE', 1000)
+# Errores detallados guardados en el reporte (el resto solo se cuenta)
+IMPORT_MAX_ERRORS = getattr(settings, 'TASK_IMPORT_MAX_ERRORS', 1000)
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+
+# Formato a partir del nombre del archivo (.csv o NDJSON por defecto)
+def guess_format(name):
+    return 'csv' if (name or '').lower().endswith('.csv') else 'ndjson'
+
+
+# Errores de lectura de una fila (no la detienen: se informan como las filas inválidas)
+DECODE_ERROR = 'La fila no es texto UTF-8 válido.'
+JSON_ERROR = 'La fila no es un objeto JSON válido.'
+
+
+"""
+Decodifica las líneas de un archivo binario una a una (UTF-8, BOM incluido).
+
+- Una línea con bytes inválidos se decodifica con reemplazo y su número se
+  guarda en invalid_lines (iter_rows descarta la fila que la contiene): el
+  resto del archivo se sigue leyendo.
+"""
+def decode_lines(file, invalid_lines):
+    for number, raw in enumerate(file, start=1):
+        # ? Primera línea: quitar el BOM
+        if number == 1:
+            raw = raw.removeprefix(codecs.BOM_UTF8)
+        try:
+            yield raw.decode('utf-8')
+        except UnicodeDecodeError:
+            invalid_lines.add(number)
+            yield raw.decode('utf-8', errors='replace')
+
+
+"""
+Lee las filas de un archivo binario como flujo.
+
+- Decodifica UTF-8 línea por línea, nunca carga el archivo completo.
+- Devuelve (número_de_fila, datos | None, error | None); datos None indica una
+  fila que no se pudo leer (UTF-8 inválido, JSON inválido o error de CSV) y
+  error su motivo. La lectura continúa con la fila siguiente.
+"""
+def iter_rows(file, input_format):
+    invalid_lines = set()
+    lines = decode_lines(file, invalid_lines)
+
+    # ? CSV con encabezado (las columnas extra se ignoran, p. ej. las de /export/)
+    if input_format == 'csv':
+        reader = csv.DictReader(lines)
+        number, line_num = 0, 0
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                row, error = None, f'CSV inválido: {e}'
+            else:
+                # ? Bytes inválidos en alguna línea de la fila (un campo entre comillas puede ocupar varias)
+                row, error = (None, DECODE_ERROR) if invalid_lines else (row, None)
+            number += 1
+            invalid_lines.clear()
+            yield number, row, error
+            # ? El lector no avanzó tras un error (evita repetirlo sin fin)
+            if reader.reader.line_num == line_num:
+                return
+            line_num = reader.reader.line_num
+
+    number = 0
+    for line in lines:
+        # ? Línea vacía
+        if not line.strip():
+            invalid_lines.clear()
+            continue
+        number += 1
+        # ? Bytes inválidos
+        if invalid_lines:
+            invalid_lines.clear()
+            yield number, None, DECODE_ERROR
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield (number, data, None) if isinstance(data, dict) else (number, None, JSON_ERROR)
+
+
+"""
+Validador de filas con las reglas de BaseTaskSerializerValidator.
+
+- Reutiliza los campos del serializer (mensajes, longitudes, valores por
+  defecto) pero sin crear un serializer por fila: cada valor pasa por
+  field.run_validation, que es lo que hace el serializer internamente.
+"""
+class TaskRowValidator:
+
+    def __init__(self):
+        # Campos enlazados de TaskViewSerializer (hereda las reglas de la base)
+        serializer = TaskViewSerializer()
+        self.fields = [
+            (name, serializer.fields[name])
+            for name in BaseTaskSerializerValidator.Meta.fields
+        ]
+
+    # Devuelve los datos validados o lanza ValidationError con los errores por campo
+    def validate(self, row):
+        validated, errors = {}, {}
+        for name, field in self.fields:
+            try:
+                validated[name] = field.run_validation(row.get(name, empty))
+            except SkipField:
+                continue
+            except ValidationError as e:
+                errors[name] = e.detail
+        if errors:
+            raise ValidationError(errors)
+        return validated
+
+
+"""
+Importa tareas de un archivo NDJSON/CSV para un usuario.
+
+- Las filas válidas se insertan en lotes de IMPORT_BATCH_SIZE con bulk_create;
+  un lote confirmado no se pierde si una fila posterior falla.
+- Las filas inválidas se informan (hasta IMPORT_MAX_ERRORS) sin detener la
+  importación.
+- bulk_create no envía señales: los contadores (TaskStats) se ajustan en la
+  transacción de cada lote y on_batch(user_id, tasks) se llama al confirmarla
+  (caché de respuestas).
+- Devuelve {created, failed, errors: [{row, errors}], errors_truncated}.
+"""
+def import_task_file(file, user, input_format='ndjson', batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    validator = TaskRowValidator()
+    report = {'created': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    batch = []
+
+    def flush():
+        tasks = list(batch)
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            apply_bulk_task_delta(tasks, created=True)
+            if on_batch:
+                transaction.on_commit(lambda: on_batch(user.pk, tasks))
+        report['created'] += len(tasks)
+        batch.clear()
+
+    for number, row, error in iter_rows(file, input_format):
+        try:
+            # ? Fila ilegible
+            if row is None:
+                raise ValidationError({'detail': error})
+            batch.append(Task(user=user, **validator.validate(row)))
+        except ValidationError as e:
+            report['failed'] += 1
+            if len(report['errors']) < IMPORT_MAX_ERRORS:
+                report['errors'].append({'row': number, 'errors': e.detail})
+            else:
+                report['errors_truncated'] = True
+            continue
+
+        # ? Lote completo
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
+
+
+"""
+Mixin de importación para el ViewSet de tareas.
+
+- POST /tasks/import/ (multipart) con `file` y opcionalmente `input=ndjson|csv`
+  (por defecto según la extensión).
+- Django guarda las subidas grandes en un archivo temporal y aquí se leen
+  línea por línea: la memoria no depende del tamaño del archivo.
+- Responde 201 con el reporte, o 207 si alguna fila falló.
+"""
+class TaskImportMixin:
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_tasks(self, request):
+        file = request.FILES.get('file')
+        # ? Sin archivo
+        if file is None:
+            raise ValidationError({'file': 'Se requiere un archivo NDJSON o CSV.'})
+
+        input_format = request.data.get('input') or guess_format(file.name)
+        # ? Formato no soportado
+        if input_format not in IMPORT_FORMATS:
+            raise ValidationError({'input': f"Formatos soportados: {', '.join(IMPORT_FORMATS)}."})
+
+        report = import_task_file(
+            file, request.user, input_format,
+            on_batch=lambda user_id, tasks: self.invalidate_cache(user_id),
+        )
+        return Response(
+            report,
+            status=status.HTTP_207_MULTI_STATUS if report['failed'] else status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,62 @@
+import sys
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from tasks.cache import task_response_cache
+from tasks.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, guess_format, import_task_file
+
+# @import - Importa tareas desde un archivo NDJSON/CSV (o stdin)
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Importa tareas de un archivo NDJSON o CSV para un usuario, en lotes y sin cargar el archivo en memoria'
+
+    # Argumentos del comando
+    # path: Archivo a importar ('-' para stdin)
+    # --user: Usuario dueño de las tareas
+    # --input: Formato del archivo (por defecto según la extensión)
+    # --batch-size: Filas por bulk_create
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo NDJSON/CSV ('-' para leer de stdin)")
+        parser.add_argument('--user', required=True, help='Username del dueño de las tareas')
+        parser.add_argument('--input', choices=IMPORT_FORMATS, help='Formato del archivo')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Filas por lote')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"El usuario {options['user']} no existe.")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que cero.')
+
+        path = options['path']
+        input_format = options['input'] or guess_format(path)
+        started = time.perf_counter()
+
+        # ? Leer de stdin
+        if path == '-':
+            report = self.run(sys.stdin.buffer, user, input_format, options['batch_size'])
+        else:
+            try:
+                with open(path, 'rb') as file:
+                    report = self.run(file, user, input_format, options['batch_size'])
+            except FileNotFoundError:
+                raise CommandError(f'No existe el archivo {path}.')
+
+        elapsed = time.perf_counter() - started
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+
+        # Mensaje de éxito
+        rate = report['created'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"¡Importadas {report['created']} tareas en {elapsed:.1f}s ({rate:.0f} filas/s), "
+            f"{report['failed']} filas con errores!"
+        ))
+
+    def run(self, file, user, input_format, batch_size):
+        return import_task_file(
+            file, user, input_format, batch_size=batch_size,
+            on_batch=lambda user_id, tasks: task_response_cache.bump_version(user_id),
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.models import TaskTombstone
+from tasks.sync import TOMBSTONE_RETENTION
+
+# @prune - Elimina registros de tareas eliminadas fuera de la retención
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Elimina los registros de tareas eliminadas más antiguos que la retención de sincronización'
+
+    # Argumentos del comando
+    # --batch: Número de registros a eliminar por lote
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=5000, help='Registros a eliminar por lote')
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - TOMBSTONE_RETENTION
+        total = 0
+
+        # Eliminar por lotes para no bloquear la tabla
+        while True:
+            ids = list(
+                TaskTombstone.objects.filter(deleted_at__lt=limit)
+                .values_list('id', flat=True)[:options['batch']]
+            )
+            if not ids:
+                break
+            total += TaskTombstone.objects.filter(id__in=ids).delete()[0]
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡Eliminados {total} registros de tareas eliminadas!'))
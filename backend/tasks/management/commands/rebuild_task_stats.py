@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from tasks.models import TaskStats
+from tasks.stats import rebuild_task_stats
+
+# @rebuild - Recalcula los contadores de tareas por usuario
+class Command(BaseCommand):
+
+    # Descripción del comando
+    help = 'Recalcula desde cero los contadores de tareas (total, completadas) de cada usuario'
+
+    # Argumentos del comando
+    # --user: Recalcular solo estos ids de usuario
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='Id de usuario (se puede repetir)')
+
+    def handle(self, *args, **options):
+        rebuild_task_stats(options['user'])
+        stats = TaskStats.objects.all()
+        if options['user']:
+            stats = stats.filter(user_id__in=options['user'])
+
+        # Mensaje de éxito
+        self.stdout.write(self.style.SUCCESS(f'¡Contadores recalculados para {stats.count()} usuarios!'))
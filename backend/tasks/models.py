@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 
 # @model Task - Modelo de Tarea
@@ -20,5 +20,99 @@ class Task(models.Model):
     # Relación con el usuario que creó la tarea
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor: WHERE user = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['user', '-created_at', '-id'], name='task_user_created_idx'),
+            # Sincronización incremental: WHERE user = ? AND updated_at > ? ORDER BY updated_at, id
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_idx'),
+            # Filtro por estado (?completed=): índices parciales, cada fila está solo en los de su estado
+            models.Index(
+                fields=['user', '-created_at', '-id'], name='task_user_open_created_idx',
+                condition=models.Q(completed=False),
+            ),
+            models.Index(
+                fields=['user', '-updated_at', '-id'], name='task_user_open_updated_idx',
+                condition=models.Q(completed=False),
+            ),
+            models.Index(
+                fields=['user', '-created_at', '-id'], name='task_user_done_created_idx',
+                condition=models.Q(completed=True),
+            ),
+            models.Index(
+                fields=['user', '-updated_at', '-id'], name='task_user_done_updated_idx',
+                condition=models.Q(completed=True),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Dueño y estado cargados (Task.save los vuelve a leer con la fila bloqueada)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in ('user_id', 'completed') and value is not models.DEFERRED
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Escritura y contadores (post_save) en la misma transacción
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=using):
+            # ? Tarea existente que guarda el estado: dueño y estado de la fila bloqueada (el
+            # valor cargado puede ser viejo si otra petición la modificó después)
+            if not self._state.adding and self.pk is not None and (
+                update_fields is None or {'completed', 'user', 'user_id'} & set(update_fields)
+            ):
+                row = (
+                    Task.objects.using(using).select_for_update()
+                    .filter(pk=self.pk).values_list('user_id', 'completed').first()
+                )
+                self._loaded_values = {'user_id': row[0], 'completed': row[1]} if row else {}
+            super().save(*args, **kwargs)
+        self._loaded_values = {'user_id': self.user_id, 'completed': self.completed}
+
+    def __str__(self):
+        return self.title
+
+
+# @model TaskTombstone - Registro de tareas eliminadas (sincronización)
+class TaskTombstone(models.Model):
+    """
+      - task_id: id de la tarea eliminada
+      - user: FK a User, dueño de la tarea eliminada
+      - deleted_at: timestamp automático de la eliminación
+    """
+    task_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_tombstones')
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.deleted_at}"
+
+# @model TaskStats - Contadores de tareas por usuario
+class TaskStats(models.Model):
+    """
+      - user: usuario dueño de los contadores (clave primaria)
+      - total: número de tareas
+      - completed: número de tareas completadas
+      - updated_at: timestamp automático
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_stats')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Tareas pendientes
+    @property
+    def pending(self):
+        return self.total - self.completed
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.user_id} - {self.completed}/{self.total}"
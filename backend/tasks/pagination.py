@@ -0,0 +1,48 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+"""
+Paginación clásica por número de página.
+
+- Es la paginación que ya usaban los clientes (?page=2&page_size=20).
+- Ejecuta OFFSET/LIMIT y un COUNT(*) en cada página.
+"""
+class TaskPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+"""
+Paginación por cursor (keyset) para las tareas.
+
+- Ordena por (created_at, id) descendente, un orden estable y único.
+- El cursor guarda el created_at de la última fila (y un desplazamiento solo
+  para empates), la siguiente página se obtiene con WHERE created_at < cursor
+  recorriendo el índice (user, created_at, id).
+- No ejecuta COUNT(*), cada página cuesta lo mismo sin importar la profundidad.
+"""
+class TaskCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# Modos de paginación disponibles para las tareas
+PAGINATION_MODES = {
+    'page': TaskPageNumberPagination,
+    'cursor': TaskCursorPagination,
+}
+
+
+"""
+Obtiene la clase de paginación según la petición.
+
+- ?pagination=cursor o la presencia de ?cursor= activan el modo cursor.
+- Por defecto se mantiene la paginación por número de página.
+"""
+def get_task_pagination_class(request):
+    # ? El cliente ya navega con un cursor
+    if request.query_params.get(TaskCursorPagination.cursor_query_param):
+        return TaskCursorPagination
+    mode = request.query_params.get('pagination', 'page')
+    return PAGINATION_MODES.get(mode, TaskPageNumberPagination)
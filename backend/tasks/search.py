@@ -0,0 +1,177 @@
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+from .models import Task
+
+# Configuración de idioma para Postgres (to_tsvector / to_tsquery)
+SEARCH_CONFIG = getattr(settings, 'TASK_SEARCH_CONFIG', 'spanish')
+
+# Nombres de las estructuras de búsqueda
+TASK_TABLE = Task._meta.db_table
+PG_VECTOR_COLUMN = 'search_vector'
+PG_VECTOR_INDEX = 'task_search_vector_gin'
+FTS_TABLE = f'{TASK_TABLE}_fts'
+
+# Palabras de la búsqueda (letras y números, con acentos)
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+"""
+Sentencias para Postgres.
+
+- search_vector es una columna generada (STORED), Postgres la recalcula en
+  cada INSERT/UPDATE, incluso en bulk_create/update().
+- El título pesa más (A) que la descripción (B) en el ranking.
+"""
+def _postgres_statements():
+    return [
+        f"""
+        ALTER TABLE {TASK_TABLE} ADD COLUMN IF NOT EXISTS {PG_VECTOR_COLUMN} tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        f"CREATE INDEX IF NOT EXISTS {PG_VECTOR_INDEX} ON {TASK_TABLE} USING gin ({PG_VECTOR_COLUMN})",
+    ]
+
+
+"""
+Sentencias para SQLite.
+
+- Tabla FTS5 con contenido externo (no duplica el texto de las tareas).
+- Los triggers la mantienen al día al insertar, actualizar y eliminar.
+"""
+def _sqlite_statements():
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            title, description,
+            content='{TASK_TABLE}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TASK_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TASK_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON {TASK_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ]
+
+
+"""
+Crea (si no existen) las estructuras de búsqueda en la base de datos indicada.
+
+- Es idempotente, se ejecuta después de cada migrate.
+- En SQLite reconstruye el índice FTS5 la primera vez que se crea.
+"""
+def install_task_search(using='default'):
+    connection = connections[using]
+
+    # ? La tabla de tareas todavía no existe
+    if TASK_TABLE not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        # Postgres
+        if connection.vendor == 'postgresql':
+            for statement in _postgres_statements():
+                cursor.execute(statement)
+        # SQLite
+        elif connection.vendor == 'sqlite':
+            created = FTS_TABLE not in connection.introspection.table_names(cursor)
+            for statement in _sqlite_statements():
+                cursor.execute(statement)
+            # ? Se acaba de crear, indexar las tareas existentes
+            if created:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+"""
+Filtro de búsqueda de texto completo para las tareas.
+
+- Busca en título y descripción (?search=texto).
+- Cada palabra se busca como prefijo y todas deben aparecer.
+- Postgres: tsvector + índice GIN, ordenado por ts_rank.
+- SQLite: tabla FTS5, ordenado por bm25.
+- Otros motores: icontains en título y descripción.
+- No admite la paginación por cursor (responde 400): el cursor recorre
+  (created_at, id) y perdería el orden por relevancia.
+"""
+class TaskSearchFilter(filters.BaseFilterBackend):
+    search_param = api_settings.SEARCH_PARAM
+
+    # Obtener las palabras de la búsqueda
+    def get_search_terms(self, request):
+        value = request.query_params.get(self.search_param, '')
+        return TERM_RE.findall(value.replace('\x00', ''))
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+
+        # ? Sin búsqueda
+        if not terms:
+            return queryset
+        # ? Paginación por cursor (?pagination=cursor o ?cursor=)
+        if isinstance(getattr(view, 'paginator', None), CursorPagination):
+            raise ValidationError({
+                self.search_param: 'La búsqueda se ordena por relevancia y no admite la paginación por cursor, '
+                                   'usa la paginación por página.',
+            })
+
+        vendor = connections[queryset.db].vendor
+
+        # Postgres
+        if vendor == 'postgresql':
+            tsquery = ' & '.join(f'{term}:*' for term in terms)
+            query_sql = 'to_tsquery(%s::regconfig, %s)'
+            params = [SEARCH_CONFIG, tsquery]
+            vector = f'{TASK_TABLE}.{PG_VECTOR_COLUMN}'
+            match = RawSQL(f'{vector} @@ {query_sql}', params, output_field=BooleanField())
+            rank = RawSQL(f'ts_rank({vector}, {query_sql})', params, output_field=FloatField())
+        # SQLite
+        elif vendor == 'sqlite':
+            fts_query = ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+            match = RawSQL(
+                f'{TASK_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+                [fts_query],
+                output_field=BooleanField(),
+            )
+            # bm25 devuelve valores menores para mejores resultados
+            rank = RawSQL(
+                f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TASK_TABLE}.id)',
+                [fts_query],
+                output_field=FloatField(),
+            )
+        # Otros motores
+        else:
+            condition = Q()
+            for term in terms:
+                condition &= Q(title__icontains=term) | Q(description__icontains=term)
+            return queryset.filter(condition)
+
+        queryset = queryset.filter(match).annotate(search_rank=rank)
+        # Más relevantes primero, desempate por fecha
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
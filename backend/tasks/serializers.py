@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from backend.fastpath import FastListSerializer
+from backend.sparse import SparseFieldsetSerializerMixin
 from .models import Task
 
 
@@ -49,8 +51,14 @@ class BaseTaskSerializerValidator(serializers.ModelSerializer):
         fields = ('title', 'description', 'completed')
 
 
-# @serializer task - "Form Request - Resource"
-class TaskViewSerializer(BaseTaskSerializerValidator):
+# Campos del listado de tareas por defecto (compacto, sin la descripción)
+TASK_LIST_FIELDS = ('id', 'title', 'completed')
+# Columnas que los listados cargan siempre: dueño (permisos) y fechas (orden, cursor)
+TASK_REQUIRED_COLUMNS = ('id', 'user', 'created_at', 'updated_at')
+
+
+# @serializer task - "Form Request - Resource" (?fields= / ?omit= en la salida)
+class TaskViewSerializer(SparseFieldsetSerializerMixin, BaseTaskSerializerValidator):
     
     # Modelo
     class Meta:
@@ -60,3 +68,15 @@ class TaskViewSerializer(BaseTaskSerializerValidator):
         fields = ('id', 'title', 'description', 'completed')
         # No pueden modificar desde el frontend
         read_only_fields = ['user', 'created_at', 'updated_at'] 
+        # Listas (many=True) con la lectura rápida
+        list_serializer_class = FastListSerializer
+
+
+# @serializer task - Resumen ligero para listados anidados (usuarios)
+class TaskSummarySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Task
+        fields = ('id', 'title', 'completed')
+        read_only_fields = fields
+        list_serializer_class = FastListSerializer
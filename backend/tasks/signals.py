@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import task_response_cache
+from .models import Task, TaskTombstone
+from .stats import apply_task_delta, rebuild_task_stats
+
+
+"""
+Invalida la caché de respuestas del usuario al guardar o eliminar una tarea.
+
+- Task.save / delete se ejecutan en una transacción: la versión cambia al
+  confirmarla.
+"""
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender, instance, using=None, **kwargs):
+    task_response_cache.bump_version_on_commit(instance.user_id, using=using)
+
+
+"""
+Registra la tarea eliminada para la sincronización incremental.
+
+- Si la eliminación viene de borrar al usuario no se registra nada, sus
+  registros también se eliminan.
+"""
+@receiver(post_delete, sender=Task)
+def create_task_tombstone(sender, instance, origin=None, **kwargs):
+    # ? Se está eliminando el usuario
+    if isinstance(origin, User):
+        return
+    TaskTombstone.objects.using(kwargs.get('using')).create(task_id=instance.pk, user_id=instance.user_id)
+
+
+"""
+Mantiene los contadores de tareas del usuario (TaskStats).
+
+- Alta: +1 total (+1 completadas si lo está). Baja: lo inverso.
+- Modificación: solo cambia completadas, comparando con el valor de la fila
+  bloqueada antes del UPDATE (Task.save). Sin ese valor se recalcula el usuario.
+- Se ejecuta dentro de la transacción de Task.save / delete.
+"""
+@receiver(post_save, sender=Task)
+def update_task_stats_on_save(sender, instance, created, using, update_fields=None, **kwargs):
+    # ? Nueva tarea
+    if created:
+        apply_task_delta(instance.user_id, 1, int(instance.completed), using=using)
+        return
+    # ? No se guardó el estado
+    if update_fields is not None and not {'completed', 'user', 'user_id'} & set(update_fields):
+        return
+
+    loaded = getattr(instance, '_loaded_values', {})
+    # ? Estado anterior desconocido o la tarea cambió de dueño
+    if 'completed' not in loaded or loaded.get('user_id', instance.user_id) != instance.user_id:
+        rebuild_task_stats({instance.user_id, loaded.get('user_id', instance.user_id)}, using=using)
+        return
+    apply_task_delta(instance.user_id, 0, int(instance.completed) - int(loaded['completed']), using=using)
+
+
+@receiver(post_delete, sender=Task)
+def update_task_stats_on_delete(sender, instance, using, origin=None, **kwargs):
+    # ? Se está eliminando el usuario (sus contadores también)
+    if isinstance(origin, User):
+        return
+    apply_task_delta(instance.user_id, -1, -int(instance.completed), using=using)
@@ -0,0 +1,184 @@
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .models import Task, TaskStats
+
+
+# Bloquea a los usuarios (FOR NO KEY UPDATE: compatible con las FK de las tareas que se insertan)
+def lock_users(user_ids, using='default'):
+    list(User.objects.using(using).select_for_update(no_key=True).filter(pk__in=user_ids).values_list('pk', flat=True))
+
+
+# Contadores calculados desde las tareas: {user_id: (total, completed)}
+def count_tasks(tasks):
+    rows = (
+        tasks.order_by()
+        .values('user_id')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(completed=True)))
+    )
+    return {row['user_id']: (row['total'], row['completed']) for row in rows}
+
+
+"""
+Recalcula los contadores desde las tareas.
+
+- user_ids=None recalcula todos los usuarios (comando rebuild_task_stats,
+  mantenimiento: las escrituras concurrentes pueden perderse).
+- Con user_ids los usuarios se bloquean antes de contar y todos quedan con
+  fila (ceros si no tienen tareas).
+- Un solo GROUP BY sobre las tareas y las filas se reescriben en una
+  transacción.
+"""
+def rebuild_task_stats(user_ids=None, using='default'):
+    tasks = Task.objects.using(using)
+    stats = TaskStats.objects.using(using)
+    with transaction.atomic(using=using):
+        if user_ids is not None:
+            user_ids = set(user_ids)
+            lock_users(user_ids, using=using)
+            tasks = tasks.filter(user_id__in=user_ids)
+            stats = stats.filter(user_id__in=user_ids)
+
+        counts = count_tasks(tasks)
+        if user_ids is not None:
+            counts = {user_id: counts.get(user_id, (0, 0)) for user_id in user_ids}
+        stats.delete()
+        TaskStats.objects.using(using).bulk_create(
+            [TaskStats(user_id=user_id, total=total, completed=completed) for user_id, (total, completed) in counts.items()],
+            batch_size=1000,
+        )
+
+
+"""
+Crea la fila de contadores de un usuario que no la tiene, desde sus tareas.
+
+- Bloquea al usuario antes de contar: dos primeras escrituras concurrentes no
+  calculan cada una su propia fila, la segunda espera y encuentra la fila de
+  la primera.
+- Devuelve (fila, creada).
+"""
+def ensure_task_stats(user_id, using='default'):
+    with transaction.atomic(using=using):
+        lock_users([user_id], using=using)
+        stats = TaskStats.objects.using(using).filter(user_id=user_id).first()
+        # ? Otra transacción la creó mientras se esperaba el bloqueo
+        if stats is not None:
+            return stats, False
+        total, completed = count_tasks(Task.objects.using(using).filter(user_id=user_id)).get(user_id, (0, 0))
+        return TaskStats.objects.using(using).create(user_id=user_id, total=total, completed=completed), True
+
+
+"""
+Suma una diferencia a los contadores de un usuario.
+
+- UPDATE ... SET total = total + n: atómico, sin leer la fila.
+- Si el usuario todavía no tiene fila se crea desde sus tareas (ya incluye el
+  cambio, se ejecuta en la misma transacción); si otra transacción la creó
+  antes, se suma la diferencia.
+"""
+def apply_task_delta(user_id, total=0, completed=0, using='default'):
+    # ? Sin cambios
+    if not total and not completed:
+        return
+
+    def update():
+        return TaskStats.objects.using(using).filter(user_id=user_id).update(
+            total=F('total') + total,
+            completed=F('completed') + completed,
+            updated_at=timezone.now(),  # update() no aplica auto_now
+        )
+
+    # ? Sin fila de contadores
+    if not update():
+        _, created = ensure_task_stats(user_id, using=using)
+        if not created:
+            update()
+
+
+"""
+Ajusta los contadores tras escrituras por lote (bulk_create / bulk_update no
+envían señales).
+
+- created=True: tareas nuevas. created=False: tareas actualizadas, se compara
+  completed con el valor cargado de la base de datos (Task.from_db), leído con
+  las filas bloqueadas (select_for_update) en la misma transacción.
+"""
+def apply_bulk_task_delta(tasks, created=False, using='default'):
+    deltas = {}
+    for task in tasks:
+        total, completed = deltas.get(task.user_id, (0, 0))
+        if created:
+            deltas[task.user_id] = (total + 1, completed + int(task.completed))
+        else:
+            loaded = getattr(task, '_loaded_values', {}).get('completed', task.completed)
+            deltas[task.user_id] = (total, completed + int(task.completed) - int(loaded))
+    for user_id, (total, completed) in deltas.items():
+        apply_task_delta(user_id, total, completed, using=using)
+
+
+# Contadores de un usuario (sin fila, se calculan desde sus tareas y se guardan)
+def get_task_stats(user_id):
+    stats = TaskStats.objects.filter(user_id=user_id).first()
+    # ? Usuario anterior a los contadores
+    if stats is None:
+        stats, _ = ensure_task_stats(user_id, using=router.db_for_write(TaskStats))
+    return {'total': stats.total, 'completed': stats.completed, 'pending': stats.pending}
+
+
+"""
+Número de tareas del usuario de cada fila, para anotar listados de usuarios.
+
+- Subconsulta correlacionada por OuterRef('pk'): se evalúa solo para las filas
+  de la página, sin JOIN ni GROUP BY sobre toda la tabla de tareas (el COUNT
+  del paginador no la incluye).
+- Lee TaskStats.total (clave primaria); si el usuario no tiene fila, cuenta sus
+  tareas por el índice (user, ...).
+"""
+def tasks_count_annotation():
+    stats = TaskStats.objects.filter(user_id=OuterRef('pk')).values('total')
+    counted = (
+        Task.objects.filter(user_id=OuterRef('pk')).order_by()
+        .values('user_id').annotate(total=Count('id')).values('total')
+    )
+    return Coalesce(Subquery(stats), Subquery(counted), 0)
+
+
+"""
+Estado de las tareas de un usuario en una sola fila (validadores HTTP).
+
+- tasks_total / tasks_changed: contadores de TaskStats (cambian al crear,
+  eliminar o completar).
+- tasks_updated: última edición, leída del índice (user, updated_at).
+- fields: columnas extra del usuario (p. ej. 'email', 'profile__updated_at').
+- Devuelve un diccionario, o None si el usuario no existe.
+"""
+def get_task_state(user_id, *fields):
+    stats = TaskStats.objects.filter(user_id=OuterRef('pk'))
+    last_task = Task.objects.filter(user_id=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+    return (
+        User.objects.filter(pk=user_id)
+        .annotate(
+            tasks_total=Subquery(stats.values('total')),
+            tasks_changed=Subquery(stats.values('updated_at')),
+            tasks_updated=Subquery(last_task),
+        )
+        .values('tasks_total', 'tasks_changed', 'tasks_updated', *fields)
+        .first()
+    )
+
+
+"""
+Mixin de estadísticas para el ViewSet de tareas.
+
+- GET /tasks/stats/ - {total, completed, pending} del usuario autenticado.
+- Lee una fila por clave primaria en lugar de contar las tareas.
+"""
+class TaskStatsMixin:
+
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        return Response(get_task_stats(request.user.pk))
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from backend.routers import read_from_primary
+from .models import TaskTombstone
+
+# Configuración de sincronización
+SYNC_PAGE_SIZE = getattr(settings, 'TASK_SYNC_PAGE_SIZE', 500)
+# Margen para transacciones que aún no confirman (updated_at se asigna antes del COMMIT)
+SYNC_SAFETY_LAG = timedelta(seconds=getattr(settings, 'TASK_SYNC_SAFETY_LAG', 2))
+TOMBSTONE_RETENTION = timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+# Marca de agua <-> datetime (microsegundos desde epoch, UTC)
+def encode_watermark(value):
+    delta = value - datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    return str((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def decode_watermark(value):
+    try:
+        return datetime(1970, 1, 1, tzinfo=dt_timezone.utc) + timedelta(microseconds=int(value))
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError({'since': 'La marca de agua no es válida.'})
+
+
+"""
+Mixin de sincronización incremental para el ViewSet de tareas.
+
+- GET /tasks/changes/?since=<watermark> devuelve las tareas modificadas y los
+  ids eliminados desde la marca de agua, más la nueva marca de agua.
+- Sin ?since= devuelve todo (primera sincronización).
+- Cada página trae ~TASK_SYNC_PAGE_SIZE filas entre tareas y eliminaciones
+  (más solo si comparten la marca de tiempo del corte); con has_more=true el
+  cliente repite la petición con la nueva marca de agua.
+- La marca de agua nunca retrocede y va TASK_SYNC_SAFETY_LAG segundos por
+  detrás del reloj; las filas de ese margen pueden repetirse (idempotente).
+- Con una marca más antigua que la retención de eliminaciones responde 410 y
+  el cliente debe descargar todo de nuevo.
+- Siempre lee del primario: una réplica atrasada dejaría filas por debajo de
+  la marca de agua y el cliente no las vería nunca.
+"""
+class TaskSyncMixin:
+
+    # Eliminaciones visibles para el usuario
+    def get_tombstone_queryset(self):
+        # ? El usuario es un super usuario
+        if self.request.user.is_staff:
+            return TaskTombstone.objects.all()
+        return TaskTombstone.objects.filter(user=self.request.user)
+
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        read_from_primary()
+        now = timezone.now()
+        since = request.query_params.get('since')
+        since = decode_watermark(since) if since else None
+        upper = now - SYNC_SAFETY_LAG
+
+        # ? Marca de agua fuera de la retención de eliminaciones
+        if since is not None and since < now - TOMBSTONE_RETENTION:
+            return Response(
+                {'detail': 'La marca de agua expiró, se requiere una sincronización completa.'},
+                status=status.HTTP_410_GONE,
+            )
+
+        # ? La marca de agua del cliente ya está en el margen
+        if since is not None and since >= upper:
+            return Response({'watermark': encode_watermark(since), 'changed': [], 'deleted': [], 'has_more': False})
+
+        tasks = self.get_queryset().filter(updated_at__lte=upper)
+        deleted = self.get_tombstone_queryset().filter(deleted_at__lte=upper)
+        if since is not None:
+            tasks = tasks.filter(updated_at__gt=since)
+            deleted = deleted.filter(deleted_at__gt=since)
+        tasks = tasks.order_by('updated_at', 'id')
+
+        # Primeras SYNC_PAGE_SIZE + 1 marcas de tiempo de ambas listas (tareas y eliminaciones)
+        stamps = sorted([
+            *tasks.values_list('updated_at', flat=True)[:SYNC_PAGE_SIZE + 1],
+            *deleted.order_by('deleted_at').values_list('deleted_at', flat=True)[:SYNC_PAGE_SIZE + 1],
+        ])
+        # ? Hay más de una página, cortar en la marca de la última fila (sin partir empates)
+        has_more = len(stamps) > SYNC_PAGE_SIZE
+        if has_more:
+            upper = stamps[SYNC_PAGE_SIZE - 1]
+            tasks = tasks.filter(updated_at__lte=upper)
+            deleted = deleted.filter(deleted_at__lte=upper)
+
+        return Response({
+            'watermark': encode_watermark(upper),
+            'changed': self.get_serializer(tasks, many=True).data,
+            'deleted': sorted(set(deleted.values_list('task_id', flat=True))),
+            'has_more': has_more,
+        })
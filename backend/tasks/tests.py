@@ -1,3 +1,913 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from . import export
+from .cache import task_response_cache
+from .importer import DECODE_ERROR, import_task_file
+from .models import Task, TaskStats, TaskTombstone
+from .serializers import TaskViewSerializer
+from .stats import apply_task_delta, ensure_task_stats, rebuild_task_stats
+from .sync import encode_watermark
 
-# Create your tests here.
+
+"""
+Planes de ejecución de las consultas de la lista de tareas.
+
+- Cada combinación de filtro y orden debe usar su índice (Task.Meta.indexes)
+  sin ordenar en memoria.
+"""
+class TaskQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('plan', 'plan@example.com', 'password')
+        Task.objects.bulk_create([
+            Task(user=cls.user, title=f'Tarea {i}', description='d', completed=i % 2 == 0)
+            for i in range(50)
+        ])
+
+    # Plan de la primera página de la consulta
+    def explain(self, queryset):
+        # ? PostgreSQL con tablas pequeñas prefiere leer toda la tabla
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        return queryset[:10].explain()
+
+    def assertUsesIndex(self, queryset, index):
+        plan = self.explain(queryset)
+        self.assertIn(index, plan)
+        # ? SQLite: ordenar sin índice aparece como TEMP B-TREE
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def tasks(self, **filters):
+        return Task.objects.filter(user=self.user, **filters)
+
+    def test_default_ordering(self):
+        self.assertUsesIndex(self.tasks().order_by('-created_at', '-id'), 'task_user_created_idx')
+        self.assertUsesIndex(self.tasks().order_by('created_at', 'id'), 'task_user_created_idx')
+
+    def test_updated_ordering(self):
+        self.assertUsesIndex(self.tasks().order_by('-updated_at', '-id'), 'task_user_updated_idx')
+        self.assertUsesIndex(self.tasks().order_by('updated_at', 'id'), 'task_user_updated_idx')
+
+    def test_completed_partial_indexes(self):
+        self.assertUsesIndex(self.tasks(completed=False).order_by('-created_at', '-id'), 'task_user_open_created_idx')
+        self.assertUsesIndex(self.tasks(completed=False).order_by('-updated_at', '-id'), 'task_user_open_updated_idx')
+        self.assertUsesIndex(self.tasks(completed=True).order_by('-created_at', '-id'), 'task_user_done_created_idx')
+        self.assertUsesIndex(self.tasks(completed=True).order_by('updated_at', 'id'), 'task_user_done_updated_idx')
+
+    def test_date_ranges(self):
+        now = timezone.now()
+        self.assertUsesIndex(
+            self.tasks(created_at__gte=now - timedelta(days=1), created_at__lt=now).order_by('-created_at', '-id'),
+            'task_user_created_idx',
+        )
+        self.assertUsesIndex(
+            self.tasks(updated_at__gte=now - timedelta(days=1)).order_by('-updated_at', '-id'),
+            'task_user_updated_idx',
+        )
+        self.assertUsesIndex(
+            self.tasks(completed=False, updated_at__gte=now - timedelta(days=1)).order_by('-updated_at', '-id'),
+            'task_user_open_updated_idx',
+        )
+
+
+"""
+Filtros y orden de /api/task/tasks/.
+"""
+class TaskFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('filtros', 'filtros@example.com', 'password')
+        for i in range(4):
+            Task.objects.create(user=cls.user, title=f'Tarea {i}', description='d', completed=i < 1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, **params):
+        return self.client.get('/api/task/tasks/', params)
+
+    def test_completed_filter(self):
+        self.assertEqual(self.get(completed='true').data['count'], 1)
+        self.assertEqual(self.get(completed='false').data['count'], 3)
+        self.assertEqual(self.get(completed='quizá').status_code, 400)
+
+    def test_date_range_filter(self):
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        self.assertEqual(self.get(created_before=tomorrow).data['count'], 4)
+        self.assertEqual(self.get(updated_after=tomorrow).data['count'], 0)
+        self.assertEqual(self.get(created_after='ayer').status_code, 400)
+
+    def test_ordering(self):
+        titles = [task['title'] for task in self.get(ordering='created_at').data['results']]
+        self.assertEqual(titles, ['Tarea 0', 'Tarea 1', 'Tarea 2', 'Tarea 3'])
+        self.assertEqual(self.get(ordering='title').status_code, 400)
+
+    def test_ordering_with_cursor_pagination(self):
+        response = self.get(ordering='created_at', pagination='cursor')
+        self.assertEqual(response.data['results'][0]['title'], 'Tarea 0')
+
+
+"""
+Campos de la respuesta (?fields= / ?omit=) y listado compacto por defecto.
+"""
+class TaskSparseFieldsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('campos', 'campos@example.com', 'password')
+        cls.task = Task.objects.create(user=cls.user, title='Tarea', description='Descripción larga', completed=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_compact_list_by_default(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/task/tasks/')
+        self.assertEqual(response.data['results'], [{'id': self.task.pk, 'title': 'Tarea', 'completed': True}])
+        # La descripción no se lee de la base de datos
+        self.assertFalse(any('"description"' in query['sql'] for query in queries.captured_queries))
+
+    def test_fields_and_omit(self):
+        response = self.client.get('/api/task/tasks/', {'fields': 'id,description'})
+        self.assertEqual(response.data['results'], [{'id': self.task.pk, 'description': 'Descripción larga'}])
+        response = self.client.get(f'/api/task/tasks/{self.task.pk}/', {'omit': 'description'})
+        self.assertEqual(response.data, {'id': self.task.pk, 'title': 'Tarea', 'completed': True})
+
+    def test_unknown_field(self):
+        self.assertEqual(self.client.get('/api/task/tasks/', {'fields': 'id,user'}).status_code, 400)
+
+
+"""
+Búsqueda de texto completo (?search=): prefijos, título y descripción, orden por
+relevancia, acentos y mayúsculas, e índice (FTS5 / tsvector) al día.
+"""
+class TaskSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buscador', 'buscador@example.com', 'password')
+        # La coincidencia en el título es la más antigua: solo el ranking la pone primero
+        cls.in_title = Task.objects.create(user=cls.user, title='Informe trimestral', description='Revisar cifras')
+        cls.in_description = Task.objects.create(
+            user=cls.user, title='Reunión', description='Preparar el informe para la reunión del equipo',
+        )
+        cls.accents = Task.objects.create(user=cls.user, title='Canción ÚNICA', description='Ensayo')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, text):
+        response = self.client.get('/api/task/tasks/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.data['results']]
+
+    def test_prefix_and_description_matches(self):
+        self.assertEqual(set(self.search('inf')), {self.in_title.pk, self.in_description.pk})
+        self.assertEqual(self.search('equip'), [self.in_description.pk])
+        # Todas las palabras deben aparecer
+        self.assertEqual(self.search('informe equipo'), [self.in_description.pk])
+        self.assertEqual(self.search('informe canción'), [])
+
+    def test_title_ranks_above_description(self):
+        self.assertEqual(self.search('informe'), [self.in_title.pk, self.in_description.pk])
+
+    def test_accent_and_case_folding(self):
+        for text in ('cancion', 'CANCIÓN', 'unica', 'Única'):
+            with self.subTest(text=text):
+                self.assertEqual(self.search(text), [self.accents.pk])
+        self.assertEqual(self.search('reunion'), [self.in_description.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title.title = 'Balance anual'
+            self.in_title.save()
+        self.assertEqual(self.search('trimestral'), [])
+        self.assertEqual(self.search('balance'), [self.in_title.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(pk=self.accents.pk).update(description='Grabación')
+        self.assertEqual(self.search('grabacion'), [self.accents.pk])
+        self.assertEqual(self.search('ensayo'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_description.delete()
+        self.assertEqual(self.search('informe'), [])
+
+
+"""
+Lectura rápida de las listas de tareas (backend.fastpath): misma salida, byte a
+byte, que el ListSerializer de DRF.
+"""
+class TaskFastPathTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('rapida', 'rapida@example.com', 'password')
+        for i in range(3):
+            Task.objects.create(user=cls.user, title=f'Tarea rápida {i}', description=f'"Texto" ñ {i}', completed=i == 1)
+
+    # Salida del camino normal de DRF
+    def drf_json(self, queryset):
+        return JSONRenderer().render(serializers.ListSerializer(queryset, child=TaskViewSerializer()).data)
+
+    def test_identical_output(self):
+        queryset = Task.objects.filter(user=self.user).order_by('-created_at', '-id')
+        expected = self.drf_json(queryset)
+        self.assertEqual(JSONRenderer().render(TaskViewSerializer(queryset, many=True).data), expected)
+        self.assertEqual(JSONRenderer().render(TaskViewSerializer(list(queryset), many=True).data), expected)
+
+    def test_list_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/task/tasks/', {'fields': 'id,title,description,completed'})
+        queryset = Task.objects.filter(user=self.user).order_by('-created_at', '-id')
+        self.assertEqual(JSONRenderer().render(response.data['results']), self.drf_json(queryset))
+        self.assertEqual(client.get('/api/task/tasks/', {'search': 'rápida'}).data['count'], 3)
+
+
+"""
+Paginación por cursor (?pagination=cursor) del listado de tareas.
+"""
+class TaskCursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cursor', 'cursor@example.com', 'password')
+        for i in range(7):
+            Task.objects.create(user=cls.user, title=f'Tarea cursor {i}', description='d')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    # Recorrer todas las páginas, devuelve los ids y el número de páginas
+    def walk(self, **params):
+        ids, pages = [], 0
+        response = self.client.get('/api/task/tasks/', {'pagination': 'cursor', 'page_size': 3, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [task['id'] for task in response.data['results']]
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_in_order_without_duplicates(self):
+        ids, pages = self.walk()
+        expected = list(Task.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual((ids, pages), (expected, 3))
+        ids, _ = self.walk(ordering='created_at')
+        self.assertEqual(ids, expected[::-1])
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/task/tasks/', {'pagination': 'cursor', 'page_size': 3})
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_insert_between_pages(self):
+        first = self.client.get('/api/task/tasks/', {'pagination': 'cursor', 'page_size': 3})
+        seen = [task['id'] for task in first.data['results']]
+        # Una tarea nueva no desplaza las páginas siguientes (no hay OFFSET)
+        Task.objects.create(user=self.user, title='Nueva', description='d')
+        task_response_cache.backend.clear()
+        second = self.client.get(first.data['next'])
+        self.assertFalse(set(seen) & {task['id'] for task in second.data['results']})
+        self.assertEqual(len(second.data['results']), 3)
+
+    def test_search_rejected(self):
+        # El cursor perdería el orden por relevancia
+        response = self.client.get('/api/task/tasks/', {'search': 'cursor', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('search', response.data)
+        self.assertEqual(self.client.get('/api/task/tasks/', {'search': 'cursor'}).data['count'], 7)
+
+
+"""
+Importación de tareas (tasks.importer): filas inválidas informadas sin detener
+la importación y lotes de bulk_create.
+"""
+class TaskImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importa', 'importa@example.com', 'password')
+
+    def run_import(self, content, input_format='ndjson', **kwargs):
+        return import_task_file(io.BytesIO(content), self.user, input_format, **kwargs)
+
+    def test_valid_and_invalid_rows(self):
+        content = '\n'.join([
+            '{"title": "Uno", "description": "d"}',
+            '{"title": "Sin descripción"}',
+            'no es json',
+            '',
+            '{"title": "Dos", "description": "d", "completed": true}',
+        ]).encode()
+        report = self.run_import(content)
+        self.assertEqual((report['created'], report['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertEqual(TaskStats.objects.get(user=self.user).completed, 1)
+
+    def test_invalid_utf8(self):
+        content = b'{"title": "Uno", "description": "d"}\n{"title": "\xff\xfe", "description": "d"}\n{"title": "Tres", "description": "d"}\n'
+        report = self.run_import(content)
+        self.assertEqual((report['created'], report['failed']), (2, 1))
+        self.assertEqual(report['errors'][0], {'row': 2, 'errors': {'detail': DECODE_ERROR}})
+
+        rows = b'\xef\xbb\xbftitle,description\nUno,d\n\xffDos,d\nTres,d\n'
+        report = self.run_import(rows, 'csv')
+        self.assertEqual((report['created'], report['failed']), (2, 1))
+        self.assertEqual(report['errors'][0]['row'], 2)
+
+    def test_csv_errors_keep_accepted_rows(self):
+        rows = f'title,description\nUno,d\nDos,"{"x" * (csv.field_size_limit() + 1)}"\nTres,d\n'.encode()
+        report = self.run_import(rows, 'csv', batch_size=10)
+        self.assertEqual((report['created'], report['failed']), (2, 1))
+        self.assertIn('CSV inválido', str(report['errors'][0]['errors']))
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    def test_batch_boundaries(self):
+        content = '\n'.join(f'{{"title": "Tarea {i}", "description": "d"}}' for i in range(5)).encode()
+        batches = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            report = self.run_import(content, batch_size=2, on_batch=lambda user_id, tasks: batches.append(len(tasks)))
+            # La caché se invalida al confirmar, no dentro de la transacción del lote
+            self.assertEqual(batches, [])
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertEqual(report['created'], 5)
+        self.assertEqual(TaskStats.objects.get(user=self.user).total, 5)
+
+    def test_endpoint_reports_malformed_file(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        upload = SimpleUploadedFile('tareas.ndjson', b'{"title": "Uno", "description": "d"}\n\xff\n')
+        response = client.post('/api/task/tasks/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+
+
+"""
+Caché de respuestas de tareas (tasks.cache): aciertos e invalidación al
+confirmar las escrituras.
+"""
+class TaskCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('cache', 'cache@example.com', 'password')
+        cls.task = Task.objects.create(user=cls.user, title='Tarea', description='d')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self):
+        return self.client.get('/api/task/tasks/')
+
+    def test_hit_without_queries(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        # Solo la fila de los validadores HTTP (ETag), sin leer las tareas
+        with self.assertNumQueries(1):
+            response = self.get()
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_invalidated_after_writes(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post('/api/task/tasks/', {'title': 'Nueva', 'description': 'd'})
+        response = self.get()
+        self.assertEqual((response['X-Cache'], response.data['count']), ('MISS', 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/task/tasks/{created.data['id']}/")
+        response = self.get()
+        self.assertEqual((response['X-Cache'], response.data['count']), ('MISS', 1))
+
+    def test_version_changes_on_commit(self):
+        version = task_response_cache.get_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.task.title = 'Editada'
+                self.task.save()
+                # ? Transacción abierta: una lectura concurrente todavía ve las filas anteriores
+                self.assertEqual(task_response_cache.get_version(self.user.pk), version)
+        self.assertNotEqual(task_response_cache.get_version(self.user.pk), version)
+
+
+"""
+Eliminación por lotes (DELETE /api/task/tasks/bulk/): consultas constantes,
+registros de eliminación y contadores.
+"""
+class TaskBulkDeleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('lotes', 'lotes@example.com', 'password')
+        Task.objects.bulk_create([
+            Task(user=cls.user, title=f'Tarea {i}', description='d', completed=i % 2 == 0) for i in range(120)
+        ])
+        rebuild_task_stats([cls.user.pk])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def delete(self, ids):
+        return self.client.delete('/api/task/tasks/bulk/', {'ids': ids}, format='json')
+
+    def test_constant_queries(self):
+        ids = list(Task.objects.filter(user=self.user).order_by('id').values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as small:
+            self.delete(ids[:5])
+        # SELECT, DELETE, INSERT de registros y UPDATE de contadores (más los savepoints)
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.delete(ids[5:105])
+        self.assertEqual(response.status_code, 200)
+
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (15, 7))
+        self.assertEqual(TaskTombstone.objects.filter(user=self.user).count(), 105)
+
+    def test_missing_ids(self):
+        task = Task.objects.filter(user=self.user).first()
+        response = self.delete([task.pk, 0])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.data['results']], [204, 404])
+        self.assertEqual(TaskStats.objects.get(user=self.user).total, 119)
+
+
+"""
+Crear y actualizar por lote (POST / PUT / PATCH /api/task/tasks/bulk/).
+"""
+class TaskBulkWriteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('escritura', 'escritura@example.com', 'password')
+        cls.other = User.objects.create_user('vecino', 'vecino@example.com', 'password')
+        cls.tasks = [Task.objects.create(user=cls.user, title=f'Tarea {i}', description='d') for i in range(3)]
+        cls.foreign = Task.objects.create(user=cls.other, title='Ajena', description='d')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def send(self, method, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)('/api/task/tasks/bulk/', items, format='json')
+
+    def stats(self):
+        stats = TaskStats.objects.get(user=self.user)
+        return stats.total, stats.completed
+
+    def statuses(self, response):
+        return [result['status'] for result in response.data['results']]
+
+    def test_create_mixed_items(self):
+        version = task_response_cache.get_version(self.user.pk)
+        response = self.send('post', [
+            {'title': 'Nueva', 'description': 'd'},
+            {'title': 'Sin descripción'},
+            {'title': 'Hecha', 'description': 'd', 'completed': True},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.statuses(response), [201, 400, 201])
+        self.assertIn('description', response.data['results'][1]['errors'])
+        self.assertEqual(self.stats(), (5, 1))
+        self.assertNotEqual(task_response_cache.get_version(self.user.pk), version)
+
+        response = self.send('post', [{'title': 'Otra', 'description': 'd'}])
+        self.assertEqual(response.status_code, 201)
+
+    def test_update_mixed_items(self):
+        first, second, _ = self.tasks
+        version = task_response_cache.get_version(self.user.pk)
+        response = self.send('put', [
+            {'id': first.pk, 'title': 'Editada', 'description': 'd', 'completed': True},
+            {'id': self.foreign.pk, 'title': 'Robada', 'description': 'd'},
+            {'id': second.pk, 'title': 'x' * 101, 'description': 'd'},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.statuses(response), [200, 404, 400])
+        self.assertEqual(Task.objects.get(pk=first.pk).title, 'Editada')
+        self.assertEqual(Task.objects.get(pk=self.foreign.pk).title, 'Ajena')
+        self.assertEqual(self.stats(), (3, 1))
+        self.assertNotEqual(task_response_cache.get_version(self.user.pk), version)
+
+    def test_partial_update_counts_row_state(self):
+        task = self.tasks[0]
+        # El mismo cambio dos veces (y repetido en el lote) cuenta una sola vez
+        for _ in range(2):
+            response = self.send('patch', [{'id': task.pk, 'completed': True}, {'id': task.pk, 'completed': True}])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats(), (3, 1))
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'Tarea 0')
+        self.assertEqual(self.statuses(self.send('patch', [{'id': self.foreign.pk, 'completed': True}])), [404])
+
+    def test_write_and_counters_are_atomic(self):
+        task = self.tasks[0]
+        with patch('tasks.bulk.apply_bulk_task_delta', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.send('post', [{'title': 'Nueva', 'description': 'd'}])
+            with self.assertRaises(DatabaseError):
+                self.send('patch', [{'id': task.pk, 'title': 'Editada'}])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'Tarea 0')
+        self.assertEqual(self.stats(), (3, 0))
+
+    # delete_task_rows usa QuerySet._raw_delete: sin cascadas ni señales que se pierdan
+    def test_raw_delete_is_safe(self):
+        self.assertEqual(Task._meta.related_objects, ())
+        self.assertFalse(pre_delete.has_listeners(Task))
+        receivers = {receiver.__name__ for receiver in post_delete._live_receivers(Task)[0]}
+        self.assertEqual(receivers, {'invalidate_task_cache', 'create_task_tombstone', 'update_task_stats_on_delete'})
+
+
+"""
+Contadores de tareas (TaskStats): fila creada desde las tareas en la primera
+escritura o lectura y diferencias atómicas después.
+"""
+class TaskStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('contadores', 'contadores@example.com', 'password')
+        # Tareas anteriores a los contadores (bulk_create no envía señales)
+        Task.objects.bulk_create([
+            Task(user=cls.user, title=f'Tarea {i}', description='d', completed=i < 2) for i in range(5)
+        ])
+
+    def stats(self):
+        stats = TaskStats.objects.get(user=self.user)
+        return stats.total, stats.completed
+
+    def test_first_write_counts_existing_tasks(self):
+        Task.objects.create(user=self.user, title='Nueva', description='d', completed=True)
+        self.assertEqual(self.stats(), (6, 3))
+        task = Task.objects.filter(user=self.user, completed=False).first()
+        task.completed = True
+        task.save()
+        task.delete()
+        self.assertEqual(self.stats(), (5, 3))
+
+    def test_stale_instance_saved_twice(self):
+        task = Task.objects.filter(user=self.user, completed=False).first()
+        # Dos peticiones cargan la misma tarea antes de que la otra guarde
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.completed = second.completed = True
+        first.save()
+        second.save()
+        self.assertEqual(self.stats(), (5, 3))
+        # La vieja vuelve a pendiente: una sola resta
+        stale = Task.objects.get(pk=task.pk)
+        Task.objects.get(pk=task.pk).save()
+        stale.completed = False
+        stale.save()
+        self.assertEqual(self.stats(), (5, 2))
+
+    def test_row_created_by_concurrent_transaction(self):
+        # La fila aparece entre el UPDATE sin filas y el bloqueo: se suma la diferencia
+        stats, created = ensure_task_stats(self.user.pk)
+        self.assertEqual(((stats.total, stats.completed), created), ((5, 2), True))
+        self.assertFalse(ensure_task_stats(self.user.pk)[1])
+        apply_task_delta(self.user.pk, 1, 1)
+        self.assertEqual(self.stats(), (6, 3))
+
+    def test_read_without_row(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/task/tasks/stats/').data, {'total': 5, 'completed': 2, 'pending': 3})
+        self.assertEqual(self.stats(), (5, 2))
+
+    def test_rebuild_users_without_tasks(self):
+        other = User.objects.create_user('vacio', 'vacio@example.com', 'password')
+        rebuild_task_stats([self.user.pk, other.pk])
+        self.assertEqual(self.stats(), (5, 2))
+        self.assertEqual(TaskStats.objects.get(user=other).total, 0)
+
+
+"""
+Sincronización incremental (/tasks/changes/): tareas y eliminaciones comparten
+el tamaño de página y la marca de agua.
+"""
+@patch('tasks.sync.SYNC_PAGE_SIZE', 3)
+class TaskSyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sincronizar', 'sincronizar@example.com', 'password')
+        start = timezone.now() - timedelta(hours=1)
+        # Tareas y eliminaciones intercaladas, una por minuto
+        for i in range(4):
+            task = Task.objects.create(user=cls.user, title=f'Tarea {i}', description='d')
+            Task.objects.filter(pk=task.pk).update(updated_at=start + timedelta(minutes=2 * i))
+        TaskTombstone.objects.bulk_create([
+            TaskTombstone(task_id=1000 + i, user=cls.user) for i in range(5)
+        ])
+        for i, tombstone in enumerate(TaskTombstone.objects.order_by('id')):
+            TaskTombstone.objects.filter(pk=tombstone.pk).update(deleted_at=start + timedelta(minutes=2 * i + 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=None):
+        params = {'since': since} if since else {}
+        response = self.client.get('/api/task/tasks/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_cover_tasks_and_tombstones(self):
+        changed, deleted, pages, watermark = [], [], [], None
+        while True:
+            data = self.sync(watermark)
+            self.assertLessEqual(len(data['changed']) + len(data['deleted']), 3)
+            # La marca de agua nunca retrocede
+            self.assertGreaterEqual(int(data['watermark']), int(watermark or 0))
+            changed += [task['id'] for task in data['changed']]
+            deleted += data['deleted']
+            pages.append(data['has_more'])
+            watermark = data['watermark']
+            if not data['has_more']:
+                break
+        self.assertEqual(pages, [True, True, False])
+        self.assertEqual(sorted(changed), sorted(Task.objects.filter(user=self.user).values_list('id', flat=True)))
+        self.assertEqual(sorted(deleted), [1000, 1001, 1002, 1003, 1004])
+
+    def test_first_page_stops_at_limit(self):
+        data = self.sync()
+        # Tarea 0, eliminación 1000, tarea 1
+        self.assertEqual((len(data['changed']), data['deleted'], data['has_more']), (2, [1000], True))
+
+    def test_watermark_inside_lag(self):
+        watermark = encode_watermark(timezone.now())
+        self.assertEqual(self.sync(watermark), {'watermark': watermark, 'changed': [], 'deleted': [], 'has_more': False})
+
+    def test_expired_watermark(self):
+        response = self.client.get('/api/task/tasks/changes/', {'since': encode_watermark(timezone.now() - timedelta(days=365))})
+        self.assertEqual(response.status_code, 410)
+
+
+"""
+Exportación de tareas en streaming (/tasks/export/): NDJSON, CSV y gzip.
+"""
+class TaskExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exportar', 'exportar@example.com', 'password')
+        other = User.objects.create_user('ajeno', 'ajeno@example.com', 'password')
+        Task.objects.create(user=other, title='Ajena', description='d')
+        for i in range(5):
+            Task.objects.create(user=cls.user, title=f'Tarea, "{i}"', description=f'línea\nñ {i}', completed=i == 0)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get('/api/task/tasks/export/', params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        self.assertEqual(
+            sorted(row['id'] for row in rows),
+            sorted(Task.objects.filter(user=self.user).values_list('id', flat=True)),
+        )
+        self.assertEqual(set(rows[0]), {'id', 'title', 'description', 'completed', 'created_at', 'updated_at'})
+
+    def test_csv_quotes_and_newlines(self):
+        _, body = self.export(output='csv')
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+        self.assertEqual(len(rows), 5)
+        self.assertIn(('Tarea, "0"', 'línea\nñ 0'), [(row['title'], row['description']) for row in rows])
+
+    @patch('tasks.export.EXPORT_BUFFER_SIZE', 64)
+    def test_gzip_in_several_blocks(self):
+        _, plain = self.export()
+        response = self.client.get('/api/task/tasks/export/', {'compress': 'gzip'}, HTTP_ACCEPT_ENCODING='gzip')
+        blocks = list(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertGreater(len(blocks), 2)
+        self.assertEqual(gzip.decompress(b''.join(blocks)), plain)
+        # ? Sin Accept-Encoding no se comprime
+        response, body = self.export(compress='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(body, plain)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/api/task/tasks/export/', {'output': 'xml'}).status_code, 400)
+
+    # ASGI: cada bloque se envía al generarlo, sin leer antes toda la exportación
+    @patch('tasks.export.EXPORT_BUFFER_SIZE', 64)
+    async def test_asgi_streams_incrementally(self):
+        rows_read, sent = [], []
+        real_row_dict = export._row_dict
+
+        def row_dict(row):
+            rows_read.append(row[0])
+            return real_row_dict(row)
+
+        requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            # Después del cuerpo, el cliente no se desconecta
+            if not requests:
+                await asyncio.Event().wait()
+            return requests.pop()
+
+        async def send(message):
+            # Filas leídas al enviar cada bloque
+            if message['type'] == 'http.response.body' and message.get('body'):
+                sent.append(len(rows_read))
+
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/api/task/tasks/export/', 'raw_path': b'/api/task/tasks/export/',
+            'query_string': b'', 'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+        }
+        with patch('tasks.export._row_dict', side_effect=row_dict):
+            await ASGIHandler()(scope, receive, send)
+        self.assertEqual(sent[0], 1)
+        self.assertGreater(len(sent), 2)
+        self.assertEqual(sent, sorted(sent))
+        self.assertEqual(sent[-1], 5)
+
+
+"""
+Peticiones condicionales (ETag / Last-Modified) del listado y detalle de
+tareas y de /api/account/me/.
+"""
+class TaskConditionalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('condicional', 'condicional@example.com', 'password')
+        cls.task = Task.objects.create(user=cls.user, title='Tarea', description='d')
+        Task.objects.create(user=cls.user, title='Otra', description='d')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertNotModified(self, url, response, **params):
+        again = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((again.status_code, again.content), (304, b''))
+
+    def test_list_not_modified_until_change(self):
+        url = '/api/task/tasks/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertNotModified(url, response)
+        # Otra página u otro filtro tiene su propio ETag
+        self.assertNotEqual(self.client.get(url, {'completed': 'true'})['ETag'], response['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'{url}{self.task.pk}/', {'completed': True})
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'{url}{self.task.pk}/')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=changed['ETag']).status_code, 200)
+
+    def test_retrieve_and_me(self):
+        for url in (f'/api/task/tasks/{self.task.pk}/', '/api/account/me/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotModified(url, response)
+
+        response = self.client.get('/api/account/me/')
+        User.objects.filter(pk=self.user.pk).update(email='cambiado@example.com')
+        self.assertEqual(self.client.get('/api/account/me/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_staff_without_validators(self):
+        admin = User.objects.create_user('admin_condicional', 'ac@example.com', 'password', is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertNotIn('ETag', self.client.get('/api/task/tasks/'))
+
+
+"""
+Vistas asíncronas (/api/task/async/tasks/): mismo contrato que TaskViewSet.
+"""
+class TaskAsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('asincrono', 'asincrono@example.com', 'password')
+        cls.other = User.objects.create_user('ajeno', 'ajeno@example.com', 'password')
+        for i in range(5):
+            Task.objects.create(user=cls.user, title=f'Tarea {i}', description='Descripción', completed=i < 2)
+        cls.foreign = Task.objects.create(user=cls.other, title='Ajena', description='d')
+
+    def setUp(self):
+        task_response_cache.backend.clear()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers['Authorization'])
+
+    # Misma petición a la vista de DRF y a la async (mismo cuerpo, salvo la ruta de los enlaces)
+    def assertSameResponse(self, path, params=None):
+        sync = self.client.get(f'/api/task/tasks/{path}', params)
+        response = self.client.get(f'/api/task/async/tasks/{path}', params)
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(response.content.replace(b'/async/', b'/'), sync.content)
+        return response
+
+    def test_list_pagination_parity(self):
+        for params in (
+            {}, {'page': 2, 'page_size': 2}, {'page': 'last', 'page_size': 2}, {'page_size': 'abc'},
+            {'page_size': 0}, {'page_size': 1000}, {'fields': 'id,description'}, {'omit': 'completed'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.assertSameResponse('', params).status_code, 200)
+
+    def test_invalid_page_not_found(self):
+        for page in ('abc', 0, -1, 3, ''):
+            with self.subTest(page=page):
+                response = self.assertSameResponse('', {'page': page, 'page_size': 4})
+                self.assertEqual(response.status_code, 200 if page == '' else 404)
+
+    def test_detail_parity(self):
+        task = Task.objects.filter(user=self.user).first()
+        for params in ({}, {'fields': 'id,title'}, {'omit': 'description'}, {'fields': 'nada'}):
+            with self.subTest(params=params):
+                self.assertSameResponse(f'{task.pk}/', params)
+        self.assertEqual(self.assertSameResponse(f'{self.foreign.pk}/').status_code, 404)
+
+    async def test_create_update_delete(self):
+        url = '/api/task/async/tasks/'
+        response = await self.async_client.post(
+            url, {'title': 'Nueva', 'description': 'Creada en el bucle'},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        task = await Task.objects.aget(pk=response.json()['id'])
+        self.assertEqual((task.user_id, task.completed), (self.user.pk, False))
+
+        response = await self.async_client.post(url, {'title': 'x' * 101}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'title', 'description'})
+
+        response = await self.async_client.put(
+            f'{url}{task.pk}/', {'title': 'Editada', 'description': 'd', 'completed': True},
+            content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.json(), {'id': task.pk, 'title': 'Editada', 'description': 'd', 'completed': True})
+        response = await self.async_client.patch(
+            f'{url}{task.pk}/', {'completed': False}, content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.json()['title'], 'Editada')
+        await task.arefresh_from_db()
+        self.assertFalse(task.completed)
+
+        response = await self.async_client.delete(f'{url}{task.pk}/', headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(await Task.objects.filter(pk=task.pk).aexists())
+
+    async def test_foreign_task_and_missing_token(self):
+        url = f'/api/task/async/tasks/{self.foreign.pk}/'
+        for method in ('get', 'patch', 'delete'):
+            with self.subTest(method=method):
+                response = await getattr(self.async_client, method)(url, headers=self.headers)
+                self.assertEqual(response.status_code, 404)
+        self.assertTrue(await Task.objects.filter(pk=self.foreign.pk).aexists())
+        response = await self.async_client.get('/api/task/async/tasks/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
@@ -1,4 +1,6 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import TaskViewSet
 
 # Ruta base
@@ -15,12 +17,24 @@ Enrutador de URL para la aplicación de tareas.
   'task'.
 
 - Rutas:
-  - GET /tasks/ - Listar todas las tareas
+  - GET /tasks/ - Listar todas las tareas (?pagination=cursor para paginación por cursor)
+    Filtros: ?completed=true|false, ?created_after=, ?created_before=,
+    ?updated_after=, ?updated_before= y ?ordering=[-]created_at|[-]updated_at
   - POST /tasks/ - Crear una nueva tarea
   - GET /tasks/{id}/ - Obtener una tarea específica
   - PUT /tasks/{id}/ - Actualizar una tarea específica
   - DELETE /tasks/{id}/ - Eliminar una tarea específica
+  - POST | PUT | PATCH | DELETE /tasks/bulk/ - Operaciones por lote
+  - GET /tasks/changes/?since=<watermark> - Cambios desde la última sincronización
+  - GET /tasks/export/?output=ndjson|csv&compress=gzip - Exportación en streaming
+  - POST /tasks/import/ (multipart: file, input=ndjson|csv) - Importación por lotes
+  - GET /tasks/stats/ - Contadores del usuario (total, completadas, pendientes)
+  - GET | POST /async/tasks/ y GET | PUT | PATCH | DELETE /async/tasks/{id}/ -
+    CRUD asíncrono (ORM async, servidor ASGI)
 """
 router = DefaultRouter()
 router.register(RUTA_BASE, TaskViewSet, basename='task')
-urlpatterns = router.urls
+urlpatterns = [
+    path(f'async/{RUTA_BASE}/', async_views.task_list, name='task-async-list'),
+    path(f'async/{RUTA_BASE}/<int:pk>/', async_views.task_detail, name='task-async-detail'),
+] + router.urls
@@ -1,35 +1,61 @@
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from backend.permissions import IsOwnerTasks
-from .serializers import TaskViewSerializer
+from backend.sparse import SparseFieldsetMixin
+from .serializers import TaskViewSerializer, TASK_LIST_FIELDS, TASK_REQUIRED_COLUMNS
+from .pagination import get_task_pagination_class
+from .search import TaskSearchFilter
+from .filters import TaskFilter, TaskOrderingFilter
+from .cache import TaskCacheMixin
+from .conditional import TaskConditionalMixin
+from .fastlist import TaskFastListMixin
+from .bulk import TaskBulkMixin
+from .sync import TaskSyncMixin
+from .export import TaskExportMixin
+from .importer import TaskImportMixin
+from .stats import TaskStatsMixin
 from .models import Task
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(TaskConditionalMixin, TaskCacheMixin, TaskFastListMixin, SparseFieldsetMixin, TaskBulkMixin,
+                  TaskSyncMixin, TaskExportMixin, TaskImportMixin, TaskStatsMixin, viewsets.ModelViewSet):
     
     # Conjunto de vistas para las tareas
-    queryset = Task.objects.all().order_by('-created_at')
+    queryset = Task.objects.all().order_by('-created_at', '-id')
     serializer_class = TaskViewSerializer
     
     # Permisos
     permission_classes = [IsAuthenticated, IsOwnerTasks]  
 
+    # Campos (?fields= / ?omit=), el listado por defecto sin la descripción
+    list_fields = TASK_LIST_FIELDS
+    sparse_only_actions = ('list', 'retrieve')
+    sparse_required_columns = TASK_REQUIRED_COLUMNS
+
     # Filtros
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title']  # Filtrado por el título de la tarea
+    # Estado y fechas, orden permitido y texto completo en título y descripción
+    filter_backends = [TaskFilter, TaskOrderingFilter, TaskSearchFilter]
+
+    # Paginación, ?pagination=cursor activa el modo keyset
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = get_task_pagination_class(self.request)()
+        return self._paginator
     
     # Lista de tareas
     def get_queryset(self):
         # ? El usuario es un super usuario
         if self.request.user.is_staff:
             # Devuelvo todas las tareas
-            return Task.objects.all().order_by('-created_at')
+            return Task.objects.all().order_by('-created_at', '-id')
         # Devuelvo solo las tareas del usuario autenticado
-        return Task.objects.filter(user=self.request.user).order_by('-created_at')
+        return Task.objects.filter(user=self.request.user).order_by('-created_at', '-id')
 
     # Al crear una tarea
     def perform_create(self, serializer):
         # Asignar el usuario automáticamente a la tarea cuando se crea
         serializer.save(user=self.request.user)
+        self.invalidate_cache(self.request.user.pk)
 
     # Al actualizar una tarea
     def perform_update(self, serializer):
@@ -37,4 +63,12 @@ class TaskViewSet(viewsets.ModelViewSet):
         # if serializer.validated_data.get('completed') == True:
         #     # Lógica adicional
         #     pass
-        serializer.save()
+        task = serializer.save()
+        self.invalidate_cache(task.user_id)
+
+    # Al eliminar una tarea
+    def perform_destroy(self, instance):
+        user_id = instance.user_id
+        instance.delete()
+        self.invalidate_cache(user_id)
+